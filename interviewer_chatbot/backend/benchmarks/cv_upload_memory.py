@@ -0,0 +1,188 @@
+"""
+Peak memory of handling one CV upload, buffered versus spooled.
+
+For each generated PDF size, a fresh process handles the upload once and
+reports its peak RSS above the RSS just before the upload is handled:
+
+- ``buffered``: the previous path, ``await cv.read()`` and text extraction
+  from the bytes in memory;
+- ``spooled``: ``spool_upload`` in chunks to a temporary file, then
+  extraction from that file;
+- ``rejected``: ``spool_upload`` of the same file with CV_MAX_BYTES set
+  below its size, i.e. the cost of refusing it with a 413.
+
+The PDFs carry incompressible images so their size grows with the page
+count like a scanned CV does. Peak RSS is read from /proc, so this runs on
+Linux only.
+
+Usage (from the backend directory):
+    python benchmarks/cv_upload_memory.py --sizes-mb 1 8 32
+    python benchmarks/cv_upload_memory.py --report benchmarks/cv_upload_memory_report.md
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from tempfile import SpooledTemporaryFile
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+MODES = ("buffered", "spooled", "rejected")
+# Starlette spools multipart files to disk past this size.
+STARLETTE_SPOOL_BYTES = 1024 * 1024
+IMAGE_SIDE = 512  # ~0.75 MB of RGB noise per page
+
+
+def make_pdf(path: str, size_mb: float) -> int:
+    """
+    Write a PDF of roughly ``size_mb`` MB; returns its page count.
+    """
+    import fitz
+
+    pages = max(1, round(size_mb * 1024 * 1024 / (IMAGE_SIDE * IMAGE_SIDE * 3)))
+    doc = fitz.open()
+    for index in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Curriculum vitae, page {index + 1}")
+        pixmap = fitz.Pixmap(
+            fitz.csRGB, IMAGE_SIDE, IMAGE_SIDE, os.urandom(IMAGE_SIDE**2 * 3), False
+        )
+        page.insert_image(fitz.Rect(72, 100, 540, 568), pixmap=pixmap)
+    doc.save(path, deflate=False)
+    doc.close()
+    return pages
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise RuntimeError(f"{field} missing from /proc/self/status")
+
+
+def _reset_peak_rss() -> int:
+    """
+    Reset the peak RSS to the current RSS (Linux); returns it in KiB.
+    """
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    return _status_kb("VmRSS")
+
+
+async def _handle(mode: str, path: str) -> int:
+    """
+    Handle one upload of ``path`` the way the route would; returns the peak
+    RSS increase in KiB.
+    """
+    import fitz  # noqa: F401  (imported before the baseline)
+    from starlette.datastructures import UploadFile
+
+    from utils.cv_tools import (
+        CVRejected,
+        extract_text_from_pdf_bytes,
+        extract_text_from_pdf_file,
+        spool_upload,
+    )
+
+    # What the multipart parser hands the route: a spooled temporary file.
+    spooled = SpooledTemporaryFile(max_size=STARLETTE_SPOOL_BYTES)
+    with open(path, "rb") as f:
+        while chunk := f.read(STARLETTE_SPOOL_BYTES):
+            spooled.write(chunk)
+    spooled.seek(0)
+    upload = UploadFile(file=spooled, filename="cv.pdf")
+    baseline = _reset_peak_rss()
+
+    if mode == "buffered":
+        extract_text_from_pdf_bytes(await upload.read(), max_pages=10**6)
+    elif mode == "spooled":
+        cv_path = await spool_upload(upload, max_bytes=10**12)
+        try:
+            extract_text_from_pdf_file(cv_path, max_pages=10**6)
+        finally:
+            os.unlink(cv_path)
+    else:
+        try:
+            await spool_upload(upload, max_bytes=os.path.getsize(path) // 2)
+        except CVRejected:
+            pass
+    return _status_kb("VmHWM") - baseline
+
+
+def measure(mode: str, path: str) -> int:
+    """
+    Run ``mode`` on ``path`` in a fresh process; returns peak RSS growth (KiB).
+    """
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, path],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])["peak_kb"]
+
+
+def render_report(rows: List[Dict]) -> str:
+    lines = [
+        "# CV upload memory report",
+        "",
+        f"- Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}",
+        "- Peak RSS growth of one upload, in a fresh process per run",
+        "",
+        "| PDF size (MB) | pages | buffered (MB) | spooled (MB) | rejected (MB) |",
+        "|---:|---:|---:|---:|---:|",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['size_mb']:.1f} | {row['pages']} "
+            + " ".join(f"| {row[mode] / 1024:.1f}" for mode in MODES)
+            + " |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--report", help="Write the Markdown report to this path")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, path = args.child
+        print(json.dumps({"peak_kb": asyncio.run(_handle(mode, path))}))
+        return 0
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(workdir, f"cv-{size_mb}.pdf")
+            pages = make_pdf(path, size_mb)
+            row = {"size_mb": os.path.getsize(path) / 1024 / 1024, "pages": pages}
+            for mode in MODES:
+                row[mode] = measure(mode, path)
+            rows.append(row)
+            print(
+                f"{row['size_mb']:.1f} MB: "
+                + ", ".join(f"{mode} +{row[mode] / 1024:.1f} MB" for mode in MODES)
+            )
+
+    report = render_report(rows)
+    print(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Memory and recall of the quantized embedding store against float32.
+
+Builds a synthetic corpus of clustered unit vectors (the dimension of
+gemini-embedding-001 by default) and, for each storage format, reports the
+bytes held per 10k chunks, recall@k of the top-k results against exact
+float32 search, and the mean query latency. Python lists of floats, the
+form the embeddings arrive in, are included as the memory baseline.
+
+Usage (from the backend directory):
+    python benchmarks/embedding_store.py
+    python benchmarks/embedding_store.py --chunks 20000 --dim 768 --k 1 5 10
+    python benchmarks/embedding_store.py --report benchmarks/embedding_store_report.md
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# A CPython float object plus the list slot pointing to it; 56 bytes per list.
+PY_FLOAT_BYTES = 24 + 8
+
+
+def make_corpus(
+    chunks: int, dim: int, queries: int, seed: int = 0
+) -> Dict[str, np.ndarray]:
+    """
+    Clustered unit vectors, with queries drawn near random corpus vectors.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, chunks // 50), dim), dtype=np.float32)
+    corpus = centers[rng.integers(0, len(centers), chunks)]
+    corpus += 0.6 * rng.standard_normal((chunks, dim), dtype=np.float32)
+    targets = corpus[rng.integers(0, chunks, queries)]
+    query = targets + 0.4 * rng.standard_normal((queries, dim), dtype=np.float32)
+    for vectors in (corpus, query):
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return {"corpus": corpus, "queries": query}
+
+
+def run(chunks: int, dim: int, queries: int, ks: List[int]) -> List[Dict]:
+    from services.embedding_store import DTYPES, FLOAT32, QuantizedEmbeddingStore
+
+    data = make_corpus(chunks, dim, queries)
+    ids = [str(i) for i in range(chunks)]
+    texts = [""] * chunks
+    max_k = max(ks)
+    per_10k = 10_000 / chunks
+
+    rows = [
+        {
+            "format": "python lists",
+            "bytes_per_10k": chunks * (56 + dim * PY_FLOAT_BYTES) * per_10k,
+        }
+    ]
+    exact = None
+    for dtype in DTYPES:
+        store = QuantizedEmbeddingStore(dtype)
+        store.add(data["corpus"], texts, ids)
+        started = time.perf_counter()
+        results = [[pos for pos, _ in store.search(q, max_k)] for q in data["queries"]]
+        latency_ms = (time.perf_counter() - started) * 1000 / queries
+        if dtype == FLOAT32:
+            exact = results
+        row = {
+            "format": dtype,
+            "bytes_per_10k": store.nbytes * per_10k,
+            "latency_ms": latency_ms,
+        }
+        for k in ks:
+            row[f"recall@{k}"] = float(
+                np.mean(
+                    [
+                        len(set(got[:k]) & set(want[:k])) / k
+                        for got, want in zip(results, exact)
+                    ]
+                )
+            )
+        rows.append(row)
+    return rows
+
+
+def render_report(rows: List[Dict], chunks: int, dim: int, ks: List[int]) -> str:
+    baseline = next(r for r in rows if r["format"] == "float32")["bytes_per_10k"]
+    recall_cols = [f"recall@{k}" for k in ks]
+    lines = [
+        "# Embedding store report",
+        "",
+        f"- Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}",
+        f"- {chunks} synthetic chunks, {dim} dimensions; recall is against "
+        "exact float32 search",
+        "",
+        "| format | MB per 10k chunks | vs float32 | "
+        + " | ".join(recall_cols)
+        + " | query (ms) |",
+        "|---|---:|---:|" + "---:|" * len(recall_cols) + "---:|",
+    ]
+    for row in rows:
+        recalls = " | ".join(
+            f"{row[col]:.3f}" if col in row else "-" for col in recall_cols
+        )
+        latency = f"{row['latency_ms']:.2f}" if "latency_ms" in row else "-"
+        lines.append(
+            f"| {row['format']} | {row['bytes_per_10k'] / 1024 / 1024:.1f} "
+            f"| {row['bytes_per_10k'] / baseline:.2f}x | {recalls} | {latency} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--report", help="Write the Markdown report to this path")
+    args = parser.parse_args()
+
+    rows = run(args.chunks, args.dim, args.queries, args.k)
+    report = render_report(rows, args.chunks, args.dim, args.k)
+    print(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Import-time profile of the backend.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter, parses the
+per-module timings written to stderr and compares the total against the cold
+start budget. Exits non-zero when the budget is exceeded so it can gate CI.
+
+Usage (from the backend directory):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --report benchmarks/import_time_report.md
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget, in milliseconds, for importing the ASGI app (`import main`).
+IMPORT_BUDGET_MS = 800
+
+# Modules that must not be imported while loading the app; they are created
+# lazily by the first request or by the background warm-up.
+DEFERRED_MODULES = (
+    "google.generativeai",
+    "langchain_google_genai",
+    "chromadb",
+    "tavily",
+    "psycopg",
+    "fitz",
+    "langgraph.checkpoint.postgres",
+    "langgraph.checkpoint.sqlite",
+)
+
+
+def profile_imports(target: str = "main") -> List[Tuple[str, int, int]]:
+    """
+    Import ``target`` in a subprocess with ``-X importtime``.
+
+    Returns:
+        List[Tuple[str, int, int]]: (module, self_us, cumulative_us) per import.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "WARM_START": "false"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def render_report(rows: List[Tuple[str, int, int]], top: int) -> str:
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+    loaded = {name.strip() for name, _, _ in rows}
+    eager = [m for m in DEFERRED_MODULES if m in loaded]
+    slowest = sorted(rows, key=lambda r: r[2], reverse=True)[:top]
+
+    lines = [
+        "# Backend import-time report",
+        "",
+        f"- Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}",
+        f"- Python: {sys.version.split()[0]}",
+        f"- Total `import main`: **{total_ms:.1f} ms** (budget {IMPORT_BUDGET_MS} ms)",
+        f"- Status: {'within budget' if total_ms <= IMPORT_BUDGET_MS else 'OVER BUDGET'}",
+        f"- Eagerly imported heavy modules: {', '.join(eager) if eager else 'none'}",
+        "",
+        f"## Top {top} imports by cumulative time",
+        "",
+        "| module | self (ms) | cumulative (ms) |",
+        "|---|---:|---:|",
+    ]
+    for name, self_us, cumulative_us in slowest:
+        lines.append(
+            f"| `{name.strip()}` | {self_us / 1000:.1f} | {cumulative_us / 1000:.1f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--report", help="Write the Markdown report to this path")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.target)
+    report = render_report(rows, args.top)
+    print(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report)
+
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+    loaded = {name.strip() for name, _, _ in rows}
+    if total_ms > IMPORT_BUDGET_MS or any(m in loaded for m in DEFERRED_MODULES):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+"""
+Throughput of the API as the number of worker processes grows.
+
+For each worker count, starts ``serve.py`` on a local port, drives it with a
+fixed number of concurrent clients for a fixed duration and records requests
+per second and latency percentiles. The ``interview`` scenario plays whole
+interviews (start, then answers until completion) and needs the real
+environment (API keys, and PostgreSQL for more than one worker); ``ping``
+only exercises the HTTP stack.
+
+Usage (from the backend directory):
+    python benchmarks/worker_scaling.py --workers 1 2 4
+    python benchmarks/worker_scaling.py --scenario ping --concurrency 64
+    python benchmarks/worker_scaling.py --report benchmarks/worker_scaling_report.md
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ANSWERS = (
+    "I designed the service around a queue so slow consumers never blocked the API.",
+    "We measured p95 latency before and after, and it dropped by about forty percent.",
+    "I would shard by tenant first, then revisit once one shard became hot.",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, timeout: float = 60.0) -> subprocess.Popen:
+    """
+    Start ``serve.py`` with ``workers`` processes and wait until it answers.
+
+    Raises:
+        RuntimeError: If the server exits or does not come up in time.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "WEB_CONCURRENCY": str(workers)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(
+                f"Server with {workers} worker(s) exited:\n{proc.stderr.read()[-2000:]}"
+            )
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    stop_server(proc)
+    raise RuntimeError(f"Server with {workers} worker(s) did not start in {timeout}s")
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+async def _ping(client: httpx.AsyncClient, record) -> None:
+    await record(client.get("/"))
+
+
+async def _interview(client: httpx.AsyncClient, record) -> None:
+    response = await record(
+        client.post(
+            "/start_interview",
+            data={"job_title": "Backend Engineer", "question_type": "broad_followup"},
+        )
+    )
+    if response is None:
+        return
+    thread_id = response.json()["thread_id"]
+    for answer in ANSWERS:
+        response = await record(
+            client.post(
+                "/continue_interview",
+                json={"user_response": answer, "thread_id": thread_id},
+            )
+        )
+        if response is None or response.json().get("status") == "completed":
+            return
+
+
+SCENARIOS = {"ping": _ping, "interview": _interview}
+
+
+async def run_load(
+    base_url: str, scenario: str, concurrency: int, duration: float
+) -> Dict[str, float]:
+    """
+    Run ``concurrency`` clients looping over ``scenario`` for ``duration`` s.
+
+    Returns:
+        Dict[str, float]: requests, errors, rps, p50_ms and p95_ms.
+    """
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def record(request) -> Optional[httpx.Response]:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            response = await request
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors += 1
+            return None
+        latencies.append(time.perf_counter() - started)
+        return response
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        while time.monotonic() < deadline:
+            await SCENARIOS[scenario](client, record)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=120, limits=limits
+    ) as client:
+        started = time.monotonic()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    ordered = sorted(latencies) or [0.0]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[int(0.95 * (len(ordered) - 1))] * 1000,
+    }
+
+
+def render_report(
+    results: Dict[int, Dict[str, float]],
+    scenario: str,
+    concurrency: int,
+    duration: float,
+) -> str:
+    baseline = results.get(min(results))["rps"] if results else 0.0
+    lines = [
+        "# Worker scaling report",
+        "",
+        f"- Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}",
+        f"- Scenario: `{scenario}`, {concurrency} concurrent clients, {duration:.0f} s per run",
+        f"- CPUs: {os.cpu_count()}",
+        "",
+        "| workers | requests | errors | req/s | speedup | p50 (ms) | p95 (ms) |",
+        "|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for workers, r in sorted(results.items()):
+        speedup = r["rps"] / baseline if baseline else 0.0
+        lines.append(
+            f"| {workers} | {r['requests']} | {r['errors']} | {r['rps']:.1f} "
+            f"| {speedup:.2f}x | {r['p50_ms']:.0f} | {r['p95_ms']:.0f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="interview")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--report", help="Write the Markdown report to this path")
+    args = parser.parse_args()
+
+    results = {}
+    for workers in args.workers:
+        port = _free_port()
+        proc = start_server(workers, port)
+        try:
+            results[workers] = asyncio.run(
+                run_load(
+                    f"http://127.0.0.1:{port}",
+                    args.scenario,
+                    args.concurrency,
+                    args.duration,
+                )
+            )
+        finally:
+            stop_server(proc)
+        print(f"{workers} worker(s): {results[workers]['rps']:.1f} req/s")
+
+    report = render_report(results, args.scenario, args.concurrency, args.duration)
+    print(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
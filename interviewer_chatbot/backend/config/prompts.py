@@ -28,6 +28,58 @@ def get_setup_prompt(
     return build_prompt("an expert interviewer", context, body)
 
 
+def get_opening_questions_prompt(topic: str, question_type: str, count: int) -> str:
+    """
+    Returns the prompt for a bank of interchangeable opening questions, used
+    when there is no candidate background to tailor the first question to.
+    """
+    scope = (
+        "focused on the core skills of the role"
+        if question_type.startswith("narrow")
+        else "covering the role broadly"
+    )
+    body = f"""
+        You are conducting a technical interview for a {topic} position.
+
+        Write {count} different opening questions, {scope}, that each assess
+        basic knowledge and experience. They will be used interchangeably, so
+        vary the angle and do not number them.
+        Return JSON only. Schema:
+        {{
+            "questions": ["..."]
+        }}
+    """
+    return build_prompt("an expert interviewer", "", body)
+
+
+def get_question_plan_prompt(
+    topic: str, question_type: str, context: str, count: int
+) -> str:
+    """
+    Returns the prompt for a whole upfront question plan (non-follow-up styles).
+    """
+    scope = (
+        "focused, in-depth questions on the core skills of the role"
+        if question_type.startswith("narrow")
+        else "questions covering a broad range of the role's skills"
+    )
+    body = f"""
+        You are conducting a technical interview for a {topic} position.
+
+        Candidate Background:
+        {context or "Not provided"}
+
+        Plan the whole interview up front: write exactly {count} {scope},
+        ordered from opening question to hardest. Questions must stand alone,
+        because they will not depend on the candidate's answers.
+        Return JSON only. Schema:
+        {{
+            "questions": ["..."]
+        }}
+    """
+    return build_prompt("an expert interviewer", "", body)
+
+
 def get_question_generation_prompt(
     content_text: str, topic: str, step: int, tool_used: str, context: str
 ) -> str:
@@ -114,3 +166,23 @@ def get_final_evaluation_prompt(transcript: str) -> str:
     """
 
     return build_prompt("an expert interviewer", "", body)
+
+
+def get_summary_prompt(previous_summary: str, turns: str) -> str:
+    """
+    Folds older interview turns into the running conversation summary.
+    """
+    body = f"""
+        Update the running summary of a technical interview.
+        Current summary:
+        {safe_text(previous_summary) or "(none yet)"}
+
+        Turns to add:
+        {safe_text(turns, 6000)}
+
+        Rewrite the summary to include the new turns. Keep the topics covered,
+        technologies and projects the candidate mentioned, claims worth
+        probing, and notable gaps. Use at most 150 words. Return plain text only.
+    """
+
+    return build_prompt("an expert interviewer taking notes", "", body)
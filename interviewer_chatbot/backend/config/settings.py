@@ -3,6 +3,26 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _parse_mapping(value: str) -> dict:
+    """
+    Parse "key=value,key2=value2" environment values into a dict.
+    """
+    mapping = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            key, val = item.split("=", 1)
+            mapping[key.strip()] = val.strip()
+    return mapping
+
+
+def _parse_list(value: str) -> list:
+    """
+    Parse "a,b,c" environment values into a list of non-empty items.
+    """
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
 GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 DB_URI = os.getenv(
@@ -13,11 +33,115 @@ CHROMA_API_KEY = os.getenv("CHROMA_API_KEY")
 CHROMA_TENANT = os.getenv("CHROMA_TENANT")
 CHROMA_DATABASE = os.getenv("CHROMA_DATABASE")
 
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+CHECKPOINT_SQLITE_PATH = os.getenv("CHECKPOINT_SQLITE_PATH", "checkpoints.sqlite")
+WARM_START = os.getenv("WARM_START", "true").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+BLOCKING_POOL_SIZE = int(os.getenv("BLOCKING_POOL_SIZE", "64"))
+# Same variable uvicorn reads for its default --workers.
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+SESSION_LEASE_SECONDS = float(os.getenv("SESSION_LEASE_SECONDS", "30"))
+SESSION_LOCK_WAIT = float(os.getenv("SESSION_LOCK_WAIT", "120"))
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_LEVELS = _parse_mapping(os.getenv("LOG_LEVELS", ""))
+LOG_SAMPLE_RATES = _parse_mapping(os.getenv("LOG_SAMPLE_RATES", ""))
+
+SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+SLACK_TIMEOUT = float(os.getenv("SLACK_TIMEOUT", "5"))
+OUTBOX_DB_PATH = os.getenv("OUTBOX_DB_PATH", "outbox.sqlite")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "10"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "local").lower()
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "rate_limits.sqlite")
+
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "15"))
+CHROMA_TIMEOUT = float(os.getenv("CHROMA_TIMEOUT", "15"))
+TAVILY_TIMEOUT = float(os.getenv("TAVILY_TIMEOUT", "15"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+RESILIENCE_POOL_SIZE = int(os.getenv("RESILIENCE_POOL_SIZE", "32"))
+
+LEXICAL_PREFILTER = os.getenv("LEXICAL_PREFILTER", "true").lower() == "true"
+LEXICAL_MIN_TERMS = int(os.getenv("LEXICAL_MIN_TERMS", "3"))
+LEXICAL_MIN_COVERAGE = float(os.getenv("LEXICAL_MIN_COVERAGE", "0.35"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "2"))
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "6"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+LOCAL_DENSE_SEARCH = os.getenv("LOCAL_DENSE_SEARCH", "true").lower() == "true"
+EMBEDDING_STORE_DTYPE = os.getenv("EMBEDDING_STORE_DTYPE", "int8").lower()
+
+MEMORY_KEEP_TURNS = int(os.getenv("MEMORY_KEEP_TURNS", "3"))
+MEMORY_SEED_CHARS = int(os.getenv("MEMORY_SEED_CHARS", "1000"))
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "4"))
+
+RETENTION_ENABLED = os.getenv("RETENTION_ENABLED", "true").lower() == "true"
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", "3600"))
+RETENTION_ABANDONED_DAYS = float(os.getenv("RETENTION_ABANDONED_DAYS", "7"))
+RETENTION_COMPLETED_DAYS = float(os.getenv("RETENTION_COMPLETED_DAYS", "0"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "100"))
+
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "512"))
+SESSION_CACHE_IDLE_SECONDS = float(os.getenv("SESSION_CACHE_IDLE_SECONDS", "900"))
+SESSION_CACHE_MAX_PENDING = int(os.getenv("SESSION_CACHE_MAX_PENDING", "256"))
+SESSION_CACHE_RETRY_SECONDS = float(os.getenv("SESSION_CACHE_RETRY_SECONDS", "120"))
+SESSION_CACHE_FLUSH_TIMEOUT = float(os.getenv("SESSION_CACHE_FLUSH_TIMEOUT", "10"))
+
+RESCORE_CONCURRENCY = int(os.getenv("RESCORE_CONCURRENCY", "8"))
+
+CV_MAX_BYTES = int(os.getenv("CV_MAX_BYTES", str(5 * 1024 * 1024)))
+CV_MAX_PAGES = int(os.getenv("CV_MAX_PAGES", "20"))
+
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true"
+QUESTION_BANK_SIZE = int(os.getenv("QUESTION_BANK_SIZE", "8"))
+QUESTION_BANK_MAX_KEYS = int(os.getenv("QUESTION_BANK_MAX_KEYS", "256"))
+QUESTION_BANK_REFRESH_INTERVAL = float(
+    os.getenv("QUESTION_BANK_REFRESH_INTERVAL", "86400")
+)
+QUESTION_BANK_WAIT = float(os.getenv("QUESTION_BANK_WAIT", "20"))
+QUESTION_BANK_TOPICS = _parse_list(os.getenv("QUESTION_BANK_TOPICS"))
+QUESTION_BANK_TYPES = _parse_list(
+    os.getenv("QUESTION_BANK_TYPES", "broad_followup,narrow_followup")
+)
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "256"))
+
 gemini_model = os.getenv("GEMINI_MODEL")
 gemini_embedding_model = os.getenv(
     "GEMINI_EMBEDDING_MODEL", "models/gemini-embedding-001"
 )
 
+
+def _model_route(task: str, max_output_tokens: int, temperature: float) -> dict:
+    """
+    Model and generation config for one task, overridable through
+    GEMINI_<TASK>_MODEL, GEMINI_<TASK>_MAX_TOKENS and GEMINI_<TASK>_TEMPERATURE.
+    """
+    prefix = f"GEMINI_{task.upper()}"
+    return {
+        "model": os.getenv(f"{prefix}_MODEL") or gemini_model,
+        "max_output_tokens": int(
+            os.getenv(f"{prefix}_MAX_TOKENS", str(max_output_tokens))
+        ),
+        "temperature": float(os.getenv(f"{prefix}_TEMPERATURE", str(temperature))),
+    }
+
+
+# Routing table: which model and generation config each LLM task uses.
+MODEL_ROUTES = {
+    "setup_question": _model_route("setup_question", 512, 0.7),
+    "question_plan": _model_route("question_plan", 1024, 0.7),
+    "followup_question": _model_route("followup_question", 512, 0.7),
+    "item_evaluation": _model_route("item_evaluation", 512, 0.2),
+    "final_evaluation": _model_route("final_evaluation", 2048, 0.2),
+    "conversation_summary": _model_route("conversation_summary", 400, 0.2),
+}
+
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY not found in environment variables!")
 if not TAVILY_API_KEY:
@@ -30,10 +154,72 @@ class Settings:
         self.tavily_api_key = TAVILY_API_KEY
         self.gemini_model = gemini_model
         self.gemini_embedding_model = gemini_embedding_model
+        self.model_routes = MODEL_ROUTES
         self.database_url = DB_URI
         self.chroma_api_key = CHROMA_API_KEY
         self.chroma_tenant = CHROMA_TENANT
         self.chroma_database = CHROMA_DATABASE
+        self.db_connect_timeout = DB_CONNECT_TIMEOUT
+        self.checkpoint_sqlite_path = CHECKPOINT_SQLITE_PATH
+        self.warm_start = WARM_START
+        self.db_pool_size = DB_POOL_SIZE
+        self.blocking_pool_size = BLOCKING_POOL_SIZE
+        self.workers = WORKERS
+        self.session_lease_seconds = SESSION_LEASE_SECONDS
+        self.session_lock_wait = SESSION_LOCK_WAIT
+        self.log_level = LOG_LEVEL
+        self.log_format = LOG_FORMAT
+        self.log_levels = LOG_LEVELS
+        self.log_sample_rates = LOG_SAMPLE_RATES
+        self.slack_webhook_url = SLACK_WEBHOOK_URL
+        self.slack_timeout = SLACK_TIMEOUT
+        self.outbox_db_path = OUTBOX_DB_PATH
+        self.outbox_batch_size = OUTBOX_BATCH_SIZE
+        self.outbox_max_attempts = OUTBOX_MAX_ATTEMPTS
+        self.outbox_poll_interval = OUTBOX_POLL_INTERVAL
+        self.gemini_rpm = GEMINI_RPM
+        self.gemini_tpm = GEMINI_TPM
+        self.rate_limit_backend = RATE_LIMIT_BACKEND
+        self.rate_limit_db_path = RATE_LIMIT_DB_PATH
+        self.gemini_timeout = GEMINI_TIMEOUT
+        self.embedding_timeout = EMBEDDING_TIMEOUT
+        self.chroma_timeout = CHROMA_TIMEOUT
+        self.tavily_timeout = TAVILY_TIMEOUT
+        self.circuit_failure_threshold = CIRCUIT_FAILURE_THRESHOLD
+        self.circuit_reset_timeout = CIRCUIT_RESET_TIMEOUT
+        self.resilience_pool_size = RESILIENCE_POOL_SIZE
+        self.lexical_prefilter = LEXICAL_PREFILTER
+        self.lexical_min_terms = LEXICAL_MIN_TERMS
+        self.lexical_min_coverage = LEXICAL_MIN_COVERAGE
+        self.retrieval_top_k = RETRIEVAL_TOP_K
+        self.retrieval_candidates = RETRIEVAL_CANDIDATES
+        self.rrf_k = RRF_K
+        self.local_dense_search = LOCAL_DENSE_SEARCH
+        self.embedding_store_dtype = EMBEDDING_STORE_DTYPE
+        self.memory_keep_turns = MEMORY_KEEP_TURNS
+        self.memory_seed_chars = MEMORY_SEED_CHARS
+        self.eval_workers = EVAL_WORKERS
+        self.retention_enabled = RETENTION_ENABLED
+        self.retention_interval = RETENTION_INTERVAL
+        self.retention_abandoned_days = RETENTION_ABANDONED_DAYS
+        self.retention_completed_days = RETENTION_COMPLETED_DAYS
+        self.retention_batch_size = RETENTION_BATCH_SIZE
+        self.session_cache_size = SESSION_CACHE_SIZE
+        self.session_cache_idle_seconds = SESSION_CACHE_IDLE_SECONDS
+        self.session_cache_max_pending = SESSION_CACHE_MAX_PENDING
+        self.session_cache_retry_seconds = SESSION_CACHE_RETRY_SECONDS
+        self.session_cache_flush_timeout = SESSION_CACHE_FLUSH_TIMEOUT
+        self.rescore_concurrency = RESCORE_CONCURRENCY
+        self.cv_max_bytes = CV_MAX_BYTES
+        self.cv_max_pages = CV_MAX_PAGES
+        self.question_bank_enabled = QUESTION_BANK_ENABLED
+        self.question_bank_size = QUESTION_BANK_SIZE
+        self.question_bank_max_keys = QUESTION_BANK_MAX_KEYS
+        self.question_bank_refresh_interval = QUESTION_BANK_REFRESH_INTERVAL
+        self.question_bank_wait = QUESTION_BANK_WAIT
+        self.question_bank_topics = QUESTION_BANK_TOPICS
+        self.question_bank_types = QUESTION_BANK_TYPES
+        self.report_cache_size = REPORT_CACHE_SIZE
 
 
 settings = Settings()
@@ -0,0 +1,389 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from config.settings import settings
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+
+class CheckpointBacklogFull(RuntimeError):
+    """
+    Raised instead of queueing a write when a thread already has
+    ``max_pending`` writes waiting for the backing saver.
+    """
+
+
+class _HotSession:
+    """
+    Latest checkpoint of one thread, kept serialized so every reader gets
+    its own copy (nodes may mutate the state they are given).
+    """
+
+    __slots__ = ("config", "checkpoint", "metadata", "parent_config", "writes")
+
+    def __init__(self, config, checkpoint, metadata, parent_config):
+        self.config = config
+        self.checkpoint = checkpoint
+        self.metadata = metadata
+        self.parent_config = parent_config
+        self.writes: Dict[tuple, tuple] = {}
+
+
+class HotSessionSaver(BaseCheckpointSaver):
+    """
+    Write-behind cache in front of an async checkpoint saver.
+
+    The latest checkpoint of recently used threads is held in an LRU bounded
+    by ``max_sessions`` and evicted after ``idle_seconds``; reads of the
+    latest state are answered from memory. Writes update the cache and are
+    flushed to the backing saver by a per-thread background task, in order
+    and retried with backoff, so the backing store always holds a
+    consistent prefix of each thread's history. After a crash, sessions
+    resume from the backing saver at the last flushed checkpoint.
+
+    While the backing saver is down, memory stays bounded: a thread holds at
+    most ``max_pending`` queued writes (further writes raise
+    ``CheckpointBacklogFull``), and a write still failing after
+    ``retry_seconds`` abandons the thread's queue and cached session, so
+    reads fall back to the last flushed checkpoint.
+
+    Reads the cache cannot answer (history, a cold thread) first wait, up to
+    ``flush_timeout``, for that thread's pending writes. Only valid while
+    one process serves all turns of a thread (a single worker).
+    """
+
+    def __init__(
+        self,
+        backing: BaseCheckpointSaver,
+        max_sessions: int = settings.session_cache_size,
+        idle_seconds: float = settings.session_cache_idle_seconds,
+        retry_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_pending: int = settings.session_cache_max_pending,
+        retry_seconds: float = settings.session_cache_retry_seconds,
+        flush_timeout: float = settings.session_cache_flush_timeout,
+    ):
+        super().__init__(serde=backing.serde)
+        self.backing = backing
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.max_pending = max_pending
+        self.retry_seconds = retry_seconds
+        self.flush_timeout = flush_timeout
+        self._sessions: "OrderedDict[str, tuple[float, _HotSession]]" = OrderedDict()
+        self._pending: Dict[str, Deque[Callable[[], Awaitable[Any]]]] = {}
+        self._flushers: Dict[str, asyncio.Task] = {}
+
+    @property
+    def config_specs(self) -> list:
+        return self.backing.config_specs
+
+    def get_next_version(self, current, channel):
+        return self.backing.get_next_version(current, channel)
+
+    def _copy(self, value: Any) -> Any:
+        return self.serde.loads_typed(self.serde.dumps_typed(value))
+
+    def _touch(self, thread_id: str, session: _HotSession) -> None:
+        now = time.monotonic()
+        self._sessions[thread_id] = (now, session)
+        self._sessions.move_to_end(thread_id)
+        while self._sessions:
+            oldest, (last_used, _) = next(iter(self._sessions.items()))
+            if (
+                len(self._sessions) <= self.max_sessions
+                and now - last_used <= self.idle_seconds
+            ):
+                break
+            del self._sessions[oldest]
+            metrics.counter("session_cache_evictions_total").inc()
+        metrics.gauge("session_cache_sessions").set(len(self._sessions))
+
+    def _check_backlog(self, thread_id: str) -> None:
+        if len(self._pending.get(thread_id, ())) >= self.max_pending:
+            metrics.counter("session_cache_backlog_full_total").inc()
+            raise CheckpointBacklogFull(
+                f"{self.max_pending} checkpoint writes of '{thread_id}' are "
+                "waiting for the checkpointer"
+            )
+
+    def _enqueue(self, thread_id: str, op: Callable[[], Awaitable[Any]]) -> None:
+        self._pending.setdefault(thread_id, deque()).append(op)
+        metrics.gauge("session_cache_pending_writes").inc()
+        if thread_id not in self._flushers:
+            self._flushers[thread_id] = asyncio.create_task(self._drain(thread_id))
+
+    async def _drain(self, thread_id: str) -> None:
+        pending = self._pending[thread_id]
+        try:
+            while pending:
+                attempt = 0
+                started = time.monotonic()
+                while True:
+                    try:
+                        await pending[0]()
+                        break
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        attempt += 1
+                        metrics.counter("session_cache_flush_failures_total").inc()
+                        if time.monotonic() - started >= self.retry_seconds:
+                            self._abandon(thread_id, e)
+                            return
+                        delay = min(
+                            self.max_backoff, self.retry_backoff * 2 ** (attempt - 1)
+                        )
+                        logger.warning(
+                            "Checkpoint flush for '%s' failed (%s); retrying in %.1fs",
+                            thread_id,
+                            e,
+                            delay,
+                        )
+                        await asyncio.sleep(delay)
+                pending.popleft()
+                metrics.gauge("session_cache_pending_writes").dec()
+        finally:
+            self._flushers.pop(thread_id, None)
+            if not pending:
+                self._pending.pop(thread_id, None)
+
+    def _abandon(self, thread_id: str, error: Exception) -> None:
+        """
+        Give up on a thread whose oldest write kept failing: its later
+        writes cannot be applied out of order, so they are dropped with the
+        cached session and the thread resumes from the backing saver.
+        """
+        dropped = self._pending.pop(thread_id, ())
+        self._sessions.pop(thread_id, None)
+        metrics.gauge("session_cache_pending_writes").dec(len(dropped))
+        metrics.counter("session_cache_flush_abandoned_total").inc()
+        logger.error(
+            "Gave up flushing %d checkpoint write(s) of '%s' after %.0fs: %s",
+            len(dropped),
+            thread_id,
+            self.retry_seconds,
+            error,
+        )
+
+    async def flush(
+        self, thread_id: Optional[str] = None, timeout: Optional[float] = None
+    ) -> None:
+        """
+        Wait until pending writes (of one thread, or all) reach the backing
+        saver.
+
+        Raises:
+            TimeoutError: If they have not after ``timeout`` seconds
+                (default ``flush_timeout``); the writes keep being retried.
+        """
+        timeout = self.flush_timeout if timeout is None else timeout
+        flushers = [
+            flusher
+            for tid in ([thread_id] if thread_id else list(self._flushers))
+            if (flusher := self._flushers.get(tid)) is not None
+        ]
+        if not flushers:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.gather(*flushers)), timeout)
+        except asyncio.TimeoutError:
+            metrics.counter("session_cache_flush_timeouts_total").inc()
+            raise TimeoutError(
+                f"Checkpoint writes not flushed within {timeout:g}s"
+            ) from None
+
+    async def discard(self, thread_id: str) -> None:
+        """
+        Drop a thread from the cache, cancelling writes not yet flushed.
+        """
+        self._sessions.pop(thread_id, None)
+        flusher = self._flushers.pop(thread_id, None)
+        if flusher is not None:
+            flusher.cancel()
+            try:
+                await flusher
+            except asyncio.CancelledError:
+                pass
+        dropped = self._pending.pop(thread_id, ())
+        metrics.gauge("session_cache_pending_writes").dec(len(dropped))
+
+    def latest_checkpoint_id(self, thread_id: str) -> Optional[str]:
+        """
+        Id of the cached latest checkpoint of a thread, or None if the
+        thread is not cached.
+        """
+        cached = self._sessions.get(thread_id)
+        return cached[1].config["configurable"]["checkpoint_id"] if cached else None
+
+    def has_pending(self, thread_id: str) -> bool:
+        """
+        Whether writes of a thread are still waiting for the backing saver.
+        """
+        return bool(self._pending.get(thread_id))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        cached = self._sessions.get(thread_id) if checkpoint_ns == "" else None
+        if cached is not None:
+            session = cached[1]
+            if checkpoint_id in (None, session.config["configurable"]["checkpoint_id"]):
+                self._touch(thread_id, session)
+                metrics.counter("session_cache_requests_total", result="hit").inc()
+                return CheckpointTuple(
+                    config=session.config,
+                    checkpoint=self.serde.loads_typed(session.checkpoint),
+                    metadata=self.serde.loads_typed(session.metadata),
+                    parent_config=session.parent_config,
+                    pending_writes=[
+                        (task_id, channel, self.serde.loads_typed(value))
+                        for task_id, channel, value in session.writes.values()
+                    ],
+                )
+
+        metrics.counter("session_cache_requests_total", result="miss").inc()
+        await self.flush(thread_id)
+        found = await self.backing.aget_tuple(config)
+        if found is not None and checkpoint_ns == "" and checkpoint_id is None:
+            session = _HotSession(
+                found.config,
+                self.serde.dumps_typed(found.checkpoint),
+                self.serde.dumps_typed(found.metadata),
+                found.parent_config,
+            )
+            for task_id, channel, value in found.pending_writes or []:
+                session.writes[(task_id, len(session.writes))] = (
+                    task_id,
+                    channel,
+                    self.serde.dumps_typed(value),
+                )
+            self._touch(thread_id, session)
+        return found
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config is not None:
+            await self.flush(config["configurable"]["thread_id"])
+        else:
+            await self.flush()
+        async for item in self.backing.alist(
+            config, filter=filter, before=before, limit=limit
+        ):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        next_config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+        self._check_backlog(thread_id)
+        # The caller keeps using these objects; flush and cache private copies.
+        checkpoint_blob = self.serde.dumps_typed(checkpoint)
+        frozen = (
+            dict(config),
+            self.serde.loads_typed(checkpoint_blob),
+            self._copy(metadata),
+            dict(new_versions),
+        )
+        self._enqueue(thread_id, lambda: self.backing.aput(*frozen))
+
+        if checkpoint_ns == "":
+            parent_id = config["configurable"].get("checkpoint_id")
+            self._touch(
+                thread_id,
+                _HotSession(
+                    next_config,
+                    checkpoint_blob,
+                    self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+                    (
+                        {
+                            "configurable": {
+                                "thread_id": thread_id,
+                                "checkpoint_ns": checkpoint_ns,
+                                "checkpoint_id": parent_id,
+                            }
+                        }
+                        if parent_id
+                        else None
+                    ),
+                ),
+            )
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes,
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        self._check_backlog(thread_id)
+        frozen = [(channel, self._copy(value)) for channel, value in writes]
+        self._enqueue(
+            thread_id,
+            lambda: self.backing.aput_writes(config, frozen, task_id, task_path),
+        )
+
+        cached = self._sessions.get(thread_id)
+        if cached is None or config["configurable"].get("checkpoint_ns", ""):
+            return
+        session = cached[1]
+        if session.config["configurable"]["checkpoint_id"] != get_checkpoint_id(config):
+            return
+        for idx, (channel, value) in enumerate(writes):
+            key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+            if key[1] >= 0 and key in session.writes:
+                continue
+            session.writes[key] = (task_id, channel, self.serde.dumps_typed(value))
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        # Not every pinned saver implements adelete_thread (the Postgres one
+        # does not); the retention store has the SQL for each of them.
+        from services.checkpoint_retention import retention_store
+
+        await self.discard(thread_id)
+        store = await retention_store.get()
+        if store is not None:
+            await store.delete_thread(thread_id)
+        else:
+            await self.backing.adelete_thread(thread_id)
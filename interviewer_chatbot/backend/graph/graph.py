@@ -1,10 +1,13 @@
-from langgraph.graph import StateGraph, END
+import inspect
+
+from langgraph.constants import END
 from graph.state import InterviewState
 from graph.nodes import (
     setup_node,
     get_answer_node,
     evaluate_question_node,
     generate_question_node,
+    planned_question_node,
     final_evaluation_node,
     display_results_node,
     retrieval_decision_node,
@@ -12,10 +15,8 @@ from graph.nodes import (
     tavily_search_node,
 )
 from utils.logger import setup_logger
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.checkpoint.sqlite import SqliteSaver
-import psycopg
-from langgraph.checkpoint.postgres import PostgresSaver
+from utils.concurrency import run_blocking
+from utils.lazy import AsyncLazyResource, LazyResource
 from config.settings import settings
 
 logger = setup_logger(__name__)
@@ -26,6 +27,7 @@ RETRIEVAL_DECISION_NODE = "retrieval_decision"
 RETRIEVAL_NODE = "retrieval"
 TAVILY_SEARCH_NODE = "tavily_search"
 GENERATE_QUESTION_NODE = "generate_question"
+PLANNED_QUESTION_NODE = "planned_question"
 EVALUATE_QUESTION_NODE = "evaluate_question"
 FINAL_EVALUATION_NODE = "final_evaluation"
 DISPLAY_RESULTS_NODE = "display_results"
@@ -44,6 +46,22 @@ def should_retrieve(state: InterviewState) -> str:
     return RETRIEVAL_NODE if state["needs_retrieval"] else TAVILY_SEARCH_NODE
 
 
+def should_use_plan(state: InterviewState) -> str:
+    """
+    Skip retrieval and generation when setup_node planned every question.
+
+    Args:
+        state (InterviewState): Current interview state.
+
+    Returns:
+        str: PLANNED_QUESTION_NODE if a question plan exists,
+             RETRIEVAL_DECISION_NODE otherwise.
+    """
+    return (
+        PLANNED_QUESTION_NODE if state.get("question_plan") else RETRIEVAL_DECISION_NODE
+    )
+
+
 def should_continue(state: InterviewState) -> str:
     """
     Determine whether the interview should continue, end, or move to evaluation.
@@ -95,6 +113,41 @@ def should_start_or_wait(state: InterviewState) -> str:
     return END if state.get("waiting_for_user", False) else GET_ANSWER_NODE
 
 
+def _ensure_local_fallback_allowed() -> None:
+    """
+    SQLite and in-memory checkpoints are private to one process. With several
+    workers, consecutive turns of an interview land on workers that cannot
+    see each other's threads, so refuse to fall back.
+    """
+    if settings.workers > 1:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={settings.workers} requires the shared PostgreSQL "
+            "checkpointer (DATABASE_URL), which is unavailable; refusing to fall "
+            "back to a per-process checkpointer."
+        )
+
+
+def verify_shared_checkpointer() -> None:
+    """
+    Fail fast, before workers are started, if multi-worker mode is requested
+    without a reachable PostgreSQL checkpointer.
+
+    Raises:
+        RuntimeError: If PostgreSQL cannot be reached in multi-worker mode.
+    """
+    if settings.workers <= 1:
+        return
+    try:
+        import psycopg
+
+        psycopg.connect(
+            settings.database_url, connect_timeout=settings.db_connect_timeout
+        ).close()
+    except Exception as e:
+        logger.error("❌ PostgreSQL checkpointer unavailable: %s", e)
+        _ensure_local_fallback_allowed()
+
+
 def get_postgres_checkpointer():
     """
     Create PostgreSQL checkpointer with fallback to SQLite and then Memory.
@@ -103,8 +156,12 @@ def get_postgres_checkpointer():
         Checkpoint saver instance (PostgresSaver, SqliteSaver, or MemorySaver)
     """
     try:
+        import psycopg
+        from langgraph.checkpoint.postgres import PostgresSaver
 
-        conn = psycopg.connect(settings.database_url)
+        conn = psycopg.connect(
+            settings.database_url, connect_timeout=settings.db_connect_timeout
+        )
         checkpointer = PostgresSaver(conn)
 
         checkpointer.setup()
@@ -120,23 +177,175 @@ def get_postgres_checkpointer():
     except Exception as e:
         logger.warning("⚠️ PostgreSQL setup failed: %s", e)
 
+    _ensure_local_fallback_allowed()
+
     try:
         import sqlite3
+        from langgraph.checkpoint.sqlite import SqliteSaver
 
-        conn = sqlite3.connect("checkpoints.sqlite", check_same_thread=False)
+        conn = sqlite3.connect(settings.checkpoint_sqlite_path, check_same_thread=False)
         checkpointer = SqliteSaver(conn)
-        logger.info("✅ Using SQLite checkpointer (PostgreSQL fallback)")
+        logger.warning(
+            "⚠️ Using SQLite checkpointer at '%s' (PostgreSQL fallback)",
+            settings.checkpoint_sqlite_path,
+        )
         return checkpointer
     except Exception as e:
         logger.warning("⚠️ SQLite saver failed: %s", e)
 
-    logger.info("✅ Using in-memory checkpointer (final fallback)")
+    from langgraph.checkpoint.memory import MemorySaver
+
+    logger.warning("⚠️ Using in-memory checkpointer (final fallback)")
     return MemorySaver()
 
 
-def create_interview_graph() -> StateGraph:
+def _close_checkpointer(checkpointer) -> None:
+    conn = getattr(checkpointer, "conn", None)
+    if conn is not None:
+        conn.close()
+
+
+checkpointer = LazyResource(
+    "checkpointer", get_postgres_checkpointer, closer=_close_checkpointer
+)
+
+
+async def get_async_checkpointer():
     """
-    Create and compile the interview state graph with PostgreSQL checkpoints.
+    Async counterpart of get_postgres_checkpointer for ainvoke/aget_state,
+    with the same PostgreSQL -> SQLite -> Memory fallback chain.
+
+    Returns:
+        Checkpoint saver instance (AsyncPostgresSaver, AsyncSqliteSaver, or
+        MemorySaver)
+    """
+    try:
+        from psycopg import AsyncConnection
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+        # Fail fast when the server is down; the pool would keep retrying.
+        probe = await AsyncConnection.connect(
+            settings.database_url, connect_timeout=settings.db_connect_timeout
+        )
+        await probe.close()
+
+        pool = AsyncConnectionPool(
+            settings.database_url,
+            min_size=1,
+            max_size=settings.db_pool_size,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": 0,
+                "row_factory": dict_row,
+                "connect_timeout": settings.db_connect_timeout,
+            },
+            open=False,
+        )
+        try:
+            await pool.open(wait=True, timeout=settings.db_connect_timeout)
+            checkpointer = AsyncPostgresSaver(pool)
+            await checkpointer.setup()
+        except BaseException:
+            await pool.close()
+            raise
+
+        logger.info("✅ Using async PostgreSQL checkpointer")
+        return checkpointer
+
+    except ImportError as e:
+        logger.warning("⚠️ PostgreSQL checkpoint package not available: %s", e)
+    except Exception as e:
+        logger.warning("⚠️ Cannot use PostgreSQL database: %s", e)
+        logger.warning("⚠️ Make sure PostgreSQL is running and database exists")
+
+    _ensure_local_fallback_allowed()
+
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        conn = await aiosqlite.connect(settings.checkpoint_sqlite_path)
+        checkpointer = AsyncSqliteSaver(conn)
+        try:
+            await checkpointer.setup()
+        except BaseException:
+            await conn.close()
+            raise
+        logger.warning(
+            "⚠️ Using async SQLite checkpointer at '%s' (PostgreSQL fallback)",
+            settings.checkpoint_sqlite_path,
+        )
+        return checkpointer
+    except Exception as e:
+        logger.warning("⚠️ Async SQLite saver failed: %s", e)
+
+    from langgraph.checkpoint.memory import MemorySaver
+
+    logger.warning("⚠️ Using in-memory checkpointer (final fallback)")
+    return MemorySaver()
+
+
+async def _close_async_checkpointer(checkpointer) -> None:
+    target = getattr(checkpointer, "conn", None)
+    if target is not None:
+        await target.close()
+
+
+async_checkpointer = AsyncLazyResource(
+    "async checkpointer", get_async_checkpointer, closer=_close_async_checkpointer
+)
+
+
+async def get_hot_sessions():
+    """
+    Wrap the async checkpointer in the write-behind session cache, or return
+    None when it is disabled. Several workers never share it: each would
+    serve turns from its own stale copy of a session.
+    """
+    if settings.session_cache_size <= 0 or settings.workers > 1:
+        return None
+    from graph.checkpoint_cache import HotSessionSaver
+
+    return HotSessionSaver(await async_checkpointer.get())
+
+
+async def _flush_hot_sessions(cache) -> None:
+    if cache is not None:
+        await cache.flush()
+
+
+# Registered after the checkpointer, so it is flushed before that closes.
+hot_sessions = AsyncLazyResource(
+    "hot session cache", get_hot_sessions, closer=_flush_hot_sessions
+)
+
+
+def _node(fn, blocking: bool = True):
+    """
+    Wrap a node so it serves both invoke and ainvoke.
+
+    Under ainvoke, blocking nodes (network I/O through the sync SDK clients)
+    run on the sized blocking pool and never on the event loop; non-blocking
+    nodes run inline.
+    """
+    from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+    takes_config = "config" in inspect.signature(fn).parameters
+
+    async def afn(state, config: RunnableConfig):
+        args = (state, config) if takes_config else (state,)
+        if blocking:
+            return await run_blocking(fn, *args)
+        return fn(*args)
+
+    return RunnableLambda(fn, afunc=afn, name=fn.__name__)
+
+
+def build_interview_graph(saver):
+    """
+    Create and compile the interview state graph with the given checkpointer.
 
     The graph orchestrates the multi-step interview process, including:
         - Setup and initialization.
@@ -144,24 +353,31 @@ def create_interview_graph() -> StateGraph:
         - Generating and evaluating interview questions.
         - Producing final evaluations and displaying results.
 
-    The flow includes checkpointing support using PostgreSQL (preferred),
-    with fallbacks to SQLite and in-memory storage.
+    Every node works under both invoke and ainvoke (see _node).
+
+    Args:
+        saver: Sync or async checkpoint saver.
 
     Returns:
-        StateGraph: Compiled interview graph ready for execution.
+        CompiledStateGraph: Compiled interview graph ready for execution.
     """
+    from langgraph.graph import StateGraph
+
     logger.info("Initializing interview graph with RAG + Tavily search flow...")
     builder = StateGraph(InterviewState)
 
-    builder.add_node(SETUP_NODE, setup_node)
-    builder.add_node(GET_ANSWER_NODE, get_answer_node)
-    builder.add_node(RETRIEVAL_DECISION_NODE, retrieval_decision_node)
-    builder.add_node(RETRIEVAL_NODE, retrieval_node)
-    builder.add_node(TAVILY_SEARCH_NODE, tavily_search_node)
-    builder.add_node(GENERATE_QUESTION_NODE, generate_question_node)
-    builder.add_node(EVALUATE_QUESTION_NODE, evaluate_question_node)
-    builder.add_node(FINAL_EVALUATION_NODE, final_evaluation_node)
-    builder.add_node(DISPLAY_RESULTS_NODE, display_results_node)
+    builder.add_node(SETUP_NODE, _node(setup_node))
+    builder.add_node(GET_ANSWER_NODE, _node(get_answer_node))
+    builder.add_node(RETRIEVAL_DECISION_NODE, _node(retrieval_decision_node))
+    builder.add_node(RETRIEVAL_NODE, _node(retrieval_node))
+    builder.add_node(TAVILY_SEARCH_NODE, _node(tavily_search_node))
+    builder.add_node(GENERATE_QUESTION_NODE, _node(generate_question_node))
+    builder.add_node(
+        PLANNED_QUESTION_NODE, _node(planned_question_node, blocking=False)
+    )
+    builder.add_node(EVALUATE_QUESTION_NODE, _node(evaluate_question_node))
+    builder.add_node(FINAL_EVALUATION_NODE, _node(final_evaluation_node))
+    builder.add_node(DISPLAY_RESULTS_NODE, _node(display_results_node))
 
     builder.set_entry_point(SETUP_NODE)
 
@@ -171,7 +387,14 @@ def create_interview_graph() -> StateGraph:
         {GET_ANSWER_NODE: GET_ANSWER_NODE, END: END},
     )
 
-    builder.add_edge(GET_ANSWER_NODE, RETRIEVAL_DECISION_NODE)
+    builder.add_conditional_edges(
+        GET_ANSWER_NODE,
+        should_use_plan,
+        {
+            PLANNED_QUESTION_NODE: PLANNED_QUESTION_NODE,
+            RETRIEVAL_DECISION_NODE: RETRIEVAL_DECISION_NODE,
+        },
+    )
 
     builder.add_conditional_edges(
         RETRIEVAL_DECISION_NODE,
@@ -193,14 +416,62 @@ def create_interview_graph() -> StateGraph:
         },
     )
 
+    builder.add_conditional_edges(
+        PLANNED_QUESTION_NODE,
+        should_continue,
+        {
+            GET_ANSWER_NODE: GET_ANSWER_NODE,
+            EVALUATE_QUESTION_NODE: EVALUATE_QUESTION_NODE,
+            FINAL_EVALUATION_NODE: FINAL_EVALUATION_NODE,
+            END: END,
+        },
+    )
+
     builder.add_edge(EVALUATE_QUESTION_NODE, FINAL_EVALUATION_NODE)
     builder.add_edge(FINAL_EVALUATION_NODE, DISPLAY_RESULTS_NODE)
     builder.add_edge(DISPLAY_RESULTS_NODE, END)
 
-    checkpointer = get_postgres_checkpointer()
+    compiled = builder.compile(checkpointer=saver)
 
-    logger.info("✅ Interview graph successfully compiled with PostgreSQL checkpoints.")
-    return builder.compile(checkpointer=checkpointer)
+    logger.info("✅ Interview graph successfully compiled with checkpoints.")
+    return compiled
 
 
-compiled_graph = create_interview_graph()
+def create_interview_graph():
+    """
+    Compile the interview graph over the sync checkpointer (scripts and
+    jobs that call invoke/get_state).
+    """
+    return build_interview_graph(checkpointer.get())
+
+
+async def create_async_interview_graph():
+    """
+    Compile the interview graph over the async checkpointer used by the API,
+    behind the hot session cache when it is enabled.
+    """
+    return build_interview_graph(
+        await hot_sessions.get() or await async_checkpointer.get()
+    )
+
+
+compiled_graph = LazyResource("interview graph", create_interview_graph)
+async_compiled_graph = AsyncLazyResource(
+    "async interview graph", create_async_interview_graph
+)
+
+
+def get_compiled_graph():
+    """
+    Return the compiled interview graph, building it (and connecting the
+    checkpointer) on first use rather than at import time.
+    """
+    return compiled_graph.get()
+
+
+async def aget_compiled_graph():
+    """
+    Return the graph the API serves with ainvoke/aget_state, compiled over
+    the async checkpointer on first use.
+    """
+    return await async_compiled_graph.get()
@@ -1,43 +1,96 @@
 import json
+import logging
 import os
-from typing import Any, Dict, Mapping, List
+from typing import Any, Dict, Mapping, List, Optional
+
+from langchain_core.runnables import RunnableConfig
 
 from utils.logger import setup_logger
 from utils.generation import _safe_generate
 from services.tavily_client import tavily_service
-from services.gemini_client import gemini_client
-from models.embedding_model import embeddings
-from models.final_evaluation import FinalEvaluation
+from services.gemini_client import (
+    TASK_FINAL_EVALUATION,
+    TASK_FOLLOWUP_QUESTION,
+    TASK_QUESTION_PLAN,
+    TASK_SETUP_QUESTION,
+    gemini_client,
+)
+from services.rate_limiter import PRIORITY_BACKGROUND
+from models.final_evaluation import FinalEvaluation, fallback_final_evaluation
+from models.question_plan import QuestionPlan
 from config.prompts import (
     get_setup_prompt,
+    get_question_plan_prompt,
     get_question_generation_prompt,
-    get_evaluation_prompt,
     get_final_evaluation_prompt,
 )
 from utils.sanitizer import sanitize_state
-from utils.generation import safe_parse_json
 import textwrap
-from services.vectorstore_service import load_vectorstore
+from services.vectorstore_service import (
+    get_lexical_index,
+    hybrid_search,
+    query_collection,
+)
+from services.lexical_index import AMBIGUOUS, RETRIEVE, record_decision
+from services.conversation_memory import conversation_context
+from services.question_bank import question_bank
+from services.turn_evaluator import evaluate_turn, turn_evaluator
+from config.settings import settings
+from utils.metrics import metrics
 
 logger = setup_logger(__name__)
 
 
+def _lexical_decision(query: str, user_id: str):
+    """
+    Settle clear-cut answers against the local BM25 index of the CV.
+
+    Returns:
+        Optional[Tuple[bool, float]]: (needs_retrieval, 1 - term coverage), or
+        None when the answer is ambiguous and needs the embedding check.
+    """
+    if not settings.lexical_prefilter:
+        return None
+    try:
+        index = get_lexical_index(user_id)
+    except Exception as e:
+        logger.warning("Lexical index unavailable for '%s': %s", user_id, e)
+        return None
+    if index is None:
+        return None
+
+    verdict, coverage = index.classify(query)
+    if verdict == AMBIGUOUS:
+        return None
+    record_decision(f"lexical_{verdict}")
+    logger.info(
+        "Decide retrieval (lexical) -> coverage: %.2f, verdict: %s", coverage, verdict
+    )
+    return verdict == RETRIEVE, round(1.0 - coverage, 4)
+
+
 def decide_retrieval(query: str, user_id: str = "default_user") -> (bool, float):
     """
-    Decide if retrieval is needed based on Chroma Cloud distances.
+    Decide if retrieval is needed.
+
+    Clear cases are answered locally from the CV's BM25 index (strong term
+    overlap -> retrieve, none -> web search); only ambiguous answers pay for
+    an embedding call and a Chroma Cloud distance check.
 
     Returns:
         Tuple[needs_retrieval: bool, min_distance: float]
     """
+    decision = _lexical_decision(query, user_id)
+    if decision is not None:
+        return decision
+
+    record_decision("embedding")
     try:
-        collection = load_vectorstore(user_id)
-        if not collection:
+        results = query_collection(user_id, query, n_results=3)
+        if not results:
             logger.info("No collection for user '%s', forcing retrieval.", user_id)
             return True, 1.0
 
-        query_emb = embeddings.embed_query(query)
-        results = collection.query(query_embeddings=[query_emb], n_results=3)
-
         distances = results.get("distances", [[]])[0]
 
         if not distances:
@@ -61,6 +114,36 @@ def decide_retrieval(query: str, user_id: str = "default_user") -> (bool, float)
         return True, 1.0
 
 
+# Question styles whose next question does not depend on the last answer.
+PLANNED_QUESTION_TYPES = {"broad_nonfollowup", "narrow_nonfollowup"}
+
+
+def _plan_questions(
+    topic: str, question_type: str, context: str, count: int
+) -> List[str]:
+    """
+    Generate the whole question plan in one call.
+
+    Returns:
+        List[str]: ``count`` questions, or an empty list if the model did not
+        return a usable plan (the interview then uses the per-turn flow).
+    """
+    plan = gemini_client.generate_structured(
+        get_question_plan_prompt(topic, question_type, context, count),
+        QuestionPlan,
+        task=TASK_QUESTION_PLAN,
+    )
+    questions = [q.strip() for q in plan.questions if q.strip()] if plan else []
+    if len(questions) < count:
+        logger.warning(
+            "Question plan returned %d of %d questions; using per-turn generation",
+            len(questions),
+            count,
+        )
+        return []
+    return questions[:count]
+
+
 def setup_node(state: Mapping[str, Any]) -> Dict[str, Any]:
     state = dict(state)
     if state.get("step", 0) > 0:
@@ -73,20 +156,37 @@ def setup_node(state: Mapping[str, Any]) -> Dict[str, Any]:
     retrieved_context = ""
 
     try:
-        collection = load_vectorstore(user_id)
-        if collection:
-            query_emb = embeddings.embed_query(topic)
-            results = collection.query(query_embeddings=[query_emb], n_results=3)
+        results = query_collection(user_id, topic, n_results=3)
+        if results:
             docs = results.get("documents", [[]])[0]
             retrieved_context = "\n\n".join(docs)
-            logger.info("Retrieved setup context for topic: %s", topic)
+            logger.info("Retrieved setup context (%d chars)", len(retrieved_context))
     except Exception as e:
         logger.error("Setup retrieval failed for user '%s': %s", user_id, e)
 
-    prompt = get_setup_prompt(topic, question_type, retrieved_context, "RAG")
-    first_question = _safe_generate(
-        prompt, "Tell me about your experience with this technology."
-    )
+    max_steps = state.get("max_steps", 3)
+    question_plan = []
+    if question_type in PLANNED_QUESTION_TYPES:
+        question_plan = _plan_questions(
+            topic, question_type, retrieved_context, max_steps
+        )
+
+    banked = None
+    if not question_plan and not retrieved_context and settings.question_bank_enabled:
+        # Without CV context the prompt depends only on topic and type.
+        banked = question_bank.opening_question(topic, question_type)
+
+    if question_plan:
+        first_question = question_plan[0]
+    elif banked:
+        first_question = banked
+    else:
+        prompt = get_setup_prompt(topic, question_type, retrieved_context, "RAG")
+        first_question = _safe_generate(
+            prompt,
+            "Tell me about your experience with this technology.",
+            task=TASK_SETUP_QUESTION,
+        )
 
     new_state = {
         **state,
@@ -102,23 +202,35 @@ def setup_node(state: Mapping[str, Any]) -> Dict[str, Any]:
         "answers": [],
         "feedback": [],
         "current_question": first_question,
-        "max_steps": state.get("max_steps", 3),
+        "max_steps": max_steps,
         "waiting_for_user": True,
         "needs_retrieval": False,
         "retrieved_context": retrieved_context,
         "similarity_score": 0.0,
         "tavily_snippets": [],
+        "conversation_summary": "",
+        "summarized_turns": 0,
+        "turn_feedback": [],
+        "question_plan": question_plan,
     }
 
     return sanitize_state(new_state)
 
 
-def get_answer_node(state: Mapping[str, Any]) -> Dict[str, Any]:
+def _thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def get_answer_node(
+    state: Mapping[str, Any], config: Optional[RunnableConfig] = None
+) -> Dict[str, Any]:
     """
-    Update state with the user's answer to the current question.
+    Update state with the user's answer to the current question and start
+    evaluating it in the background while the next question is prepared.
 
     Args:
         state (Mapping[str, Any]): Current state.
+        config (Optional[RunnableConfig]): Run config carrying the thread_id.
 
     Returns:
         Dict[str, Any]: Updated state including new messages and content.
@@ -145,6 +257,10 @@ def get_answer_node(state: Mapping[str, Any]) -> Dict[str, Any]:
         "answers": state.get("answers", []) + [answer],
         "content": content_list,
     }
+
+    thread_id = _thread_id(config)
+    if thread_id:
+        turn_evaluator.submit(thread_id, len(new_state["answers"]) - 1, new_state)
     return sanitize_state(new_state)
 
 
@@ -170,7 +286,8 @@ def retrieval_decision_node(state: Mapping[str, Any]) -> Dict[str, Any]:
 
 def retrieval_node(state: Mapping[str, Any]) -> Dict[str, Any]:
     """
-    Retrieve relevant documents from Chroma Cloud collection for the user.
+    Retrieve the most relevant CV chunks for the answer with hybrid
+    (BM25 + Chroma Cloud) search fused by reciprocal rank.
     """
     logger.info("✅ Running retrieval_node")
     state = dict(state)
@@ -182,22 +299,18 @@ def retrieval_node(state: Mapping[str, Any]) -> Dict[str, Any]:
     query = state.get("current_answer", state.get("topic", ""))
 
     try:
-        collection = load_vectorstore(user_id)
-        if collection:
-            query_emb = embeddings.embed_query(query)
-            results = collection.query(query_embeddings=[query_emb], n_results=3)
-
-            docs = results.get("documents", [[]])[0]
-            retrieved_context = "\n\n".join(docs) if docs else None
-
-            logger.info(
-                "Retrieved %d docs for query '%s' (user: %s)",
-                len(docs),
-                query,
-                user_id,
-            )
-
-            return sanitize_state({**state, "retrieved_context": retrieved_context})
+        docs = hybrid_search(user_id, query)
+        retrieved_context = "\n\n".join(docs) if docs else None
+        metrics.histogram("retrieved_context_chars").observe(
+            len(retrieved_context or "")
+        )
+        logger.info(
+            "Retrieved %d docs for %d-char query (user: %s)",
+            len(docs),
+            len(query),
+            user_id,
+        )
+        return sanitize_state({**state, "retrieved_context": retrieved_context})
 
     except Exception as e:
         logger.error("Retrieval failed for user '%s': %s", user_id, e, exc_info=True)
@@ -260,7 +373,6 @@ def generate_question_node(state: Mapping[str, Any]) -> Dict[str, Any]:
         return sanitize_state(state)
 
     topic = state.get("topic", "")
-    content_list = state.get("content", [])
     context_text = []
 
     if state.get("needs_retrieval") and state.get("retrieved_context"):
@@ -272,7 +384,7 @@ def generate_question_node(state: Mapping[str, Any]) -> Dict[str, Any]:
     else:
         context_sources = ["None"]
 
-    full_content = "\n".join(content_list + context_text)
+    full_content = "\n".join([conversation_context(state)] + context_text)
     context_str = "\n".join(context_text)
 
     prompt = get_question_generation_prompt(
@@ -284,7 +396,10 @@ def generate_question_node(state: Mapping[str, Any]) -> Dict[str, Any]:
     )
     try:
         question = _safe_generate(
-            prompt, f"Tell me more about your experience with {topic}."
+            prompt,
+            f"Tell me more about your experience with {topic}.",
+            task=TASK_FOLLOWUP_QUESTION,
+            stream=True,
         )
     except Exception as e:
         logger.error("Question generation failed: %s", e)
@@ -305,7 +420,55 @@ def generate_question_node(state: Mapping[str, Any]) -> Dict[str, Any]:
     return sanitize_state(new_state)
 
 
-def evaluate_question_node(state: Mapping[str, Any]) -> Dict[str, Any]:
+def planned_question_node(state: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Ask the next question from the plan made by setup_node. No retrieval,
+    search or model call is needed, so the turn is only a checkpoint update.
+
+    Args:
+        state (Mapping[str, Any]): Current state.
+
+    Returns:
+        Dict[str, Any]: Updated state with the next planned question.
+    """
+    logger.info("✅ Running planned_question_node")
+
+    state = dict(state)
+    step = state.get("step", 0)
+    plan = state.get("question_plan") or []
+    if step >= state.get("max_steps", 3) or step >= len(plan):
+        return sanitize_state(state)
+
+    question = plan[step]
+    new_state = {
+        **state,
+        "current_question": question,
+        "messages": list(state.get("messages", []))
+        + [{"role": "assistant", "content": question}],
+        "waiting_for_user": True,
+        "step": step + 1,
+    }
+    return sanitize_state(new_state)
+
+
+def evaluate_question_node(
+    state: Mapping[str, Any], config: Optional[RunnableConfig] = None
+) -> Dict[str, Any]:
+    """
+    Collect per-turn evaluations.
+
+    Turns are normally evaluated in the background as they are answered:
+    results already persisted in ``turn_feedback`` are reused, evaluations
+    still running in this process are awaited, and anything missing (e.g.
+    after a restart) is computed here.
+
+    Args:
+        state (Mapping[str, Any]): Current state.
+        config (Optional[RunnableConfig]): Run config carrying the thread_id.
+
+    Returns:
+        Dict[str, Any]: Updated state with the feedback list.
+    """
     logger.info("✅ Running evaluate_question_node")
 
     state = dict(state)
@@ -313,58 +476,37 @@ def evaluate_question_node(state: Mapping[str, Any]) -> Dict[str, Any]:
     if not questions or not answers:
         return sanitize_state(state)
 
-    full_content = "\n".join(state.get("content", []))
-    transcript = "\n".join([f"Q: {q}\nA: {a}" for q, a in zip(questions, answers)])
-    messages_text = "\n".join([m.get("content", "") for m in state.get("messages", [])])
-
+    thread_id = _thread_id(config)
+    persisted = list(state.get("turn_feedback") or [])
     feedback_list = []
 
-    for question, answer in zip(questions, answers):
-        try:
-            q_raw = gemini_client.generate_content(
-                get_evaluation_prompt(
-                    kind="question",
-                    full_messages=messages_text,
-                    full_content=full_content,
-                    transcript=transcript,
-                    last_question=question,
-                    last_answer=answer,
-                )
-            )
-            q_parsed = safe_parse_json(q_raw)
-
-            a_raw = gemini_client.generate_content(
-                get_evaluation_prompt(
-                    kind="answer",
-                    full_messages=messages_text,
-                    full_content=full_content,
-                    transcript=transcript,
-                    last_question=question,
-                    last_answer=answer,
-                )
-            )
-            a_parsed = safe_parse_json(a_raw)
-
-        except Exception as e:
-            logger.error("Evaluation failed: %s", e)
-            q_parsed = {"rating": 6, "feedback": "Good effort."}
-            a_parsed = {"rating": 6, "feedback": "Good effort."}
-
-        feedback_list.append(
-            {"question_feedback": q_parsed, "answer_feedback": a_parsed}
-        )
-    logger.info(f"✅ Collected {len(feedback_list)} feedback items so far.")
+    for index in range(min(len(questions), len(answers))):
+        item = persisted[index] if index < len(persisted) else None
+        source = "persisted"
+        if item is None and thread_id:
+            item = turn_evaluator.collect(thread_id, index)
+            source = "background"
+        if item is None:
+            item = evaluate_turn(state, index)
+            source = "inline"
+        metrics.counter("turn_evaluations_collected_total", source=source).inc()
+        feedback_list.append(item)
+    if thread_id:
+        turn_evaluator.discard(thread_id)
+    logger.info("✅ Collected %d feedback items so far.", len(feedback_list))
 
     feedback_text = "\n\n".join(
         f"Q Feedback: {item['question_feedback'].get('feedback', '')}\n"
         f"A Feedback: {item['answer_feedback'].get('feedback', '')}"
         for item in feedback_list
     )
-    logger.debug(f"Feedback text generated:\n{feedback_text}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Feedback text generated (%d chars)", len(feedback_text))
 
     new_state = {
         **state,
         "feedback": feedback_list,
+        "turn_feedback": feedback_list,
         "feedback_text": feedback_text.strip(),
         "step": state.get("step", 0) + 1,
     }
@@ -394,24 +536,16 @@ def final_evaluation_node(state: Mapping[str, Any]) -> Dict[str, Any]:
         )
 
     final_prompt = get_final_evaluation_prompt(transcript)
-    try:
-        raw_final = gemini_client.generate_content(final_prompt)
-        parsed_final = safe_parse_json(raw_final)
-    except Exception as e:
-        logger.error("Final eval parse failed: %s", e)
-        parsed_final = {}
-
-    final_eval = FinalEvaluation(
-        overall_quality=int(parsed_final.get("overall_quality", 7)),
-        strengths=parsed_final.get("strengths", ["Good technical depth"]),
-        areas_for_improvement=parsed_final.get(
-            "areas_for_improvement", ["Elaborate examples"]
-        ),
-        recommendation=parsed_final.get(
-            "recommendation", "Recommended with reservations."
-        ),
-        final_feedback=parsed_final.get("final_feedback", "Solid overall performance."),
+    final_eval = gemini_client.generate_structured(
+        final_prompt,
+        FinalEvaluation,
+        priority=PRIORITY_BACKGROUND,
+        task=TASK_FINAL_EVALUATION,
     )
+    if final_eval is None:
+        logger.warning("Final evaluation unavailable; using default summary.")
+        metrics.counter("final_evaluation_fallbacks_total").inc()
+        return {**state, "final_evaluation": fallback_final_evaluation()}
 
     return {**state, "final_evaluation": final_eval.model_dump()}
 
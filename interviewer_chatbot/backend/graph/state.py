@@ -24,3 +24,8 @@ class InterviewState(TypedDict):
     tavily_snippets: List[str]
     waiting_for_user: bool
     feedback_text: str
+    conversation_summary: str
+    summarized_turns: int
+    turn_feedback: List[Optional[Dict]]
+    question_plan: List[str]
+    last_request_key: Optional[str]
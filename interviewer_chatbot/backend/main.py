@@ -1,11 +1,115 @@
-from fastapi import FastAPI
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+
+from config.settings import settings
+from graph.graph import aget_compiled_graph
+from models.gemini_model import get_gemini_model
+from models.embedding_model import get_embeddings
+from services.tavily_client import get_tavily_client
+from services.vectorstore_service import get_chroma_client
+from services.slack_outbox import outbox_worker
+from services.checkpoint_retention import retention_job, retention_store
+from services.question_bank import question_bank
 from routes.interview import router as interview_router
+from utils.body_limit import BodySizeLimit
+from utils.concurrency import get_blocking_pool
+from utils.lazy import aclose_all_resources, awarm_up, close_all_resources, warm_up
+from utils.logger import log_context, setup_logger, shutdown_logging
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm external clients in the background, run the Slack outbox worker,
+    the checkpoint retention job and the opening-question bank, and release
+    everything on shutdown.
+
+    Startup never waits on a dependency: if warm-up is slow or fails, the
+    first request that needs the resource creates it instead. Blocking work
+    (sync SDK calls inside graph nodes, PDF parsing) runs on the sized
+    blocking pool, which also serves as the loop's default executor.
+
+    The exception is multi-worker mode: each worker connects its shared
+    PostgreSQL checkpointer before serving and refuses to start without it.
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(get_blocking_pool())
+    warm_task = None
+    if settings.workers > 1:
+        await aget_compiled_graph()
+        if settings.rate_limit_backend == "local":
+            logger.warning(
+                "⚠️ %d workers with RATE_LIMIT_BACKEND=local: each worker "
+                "enforces the full Gemini budget; use 'sqlite' to share it.",
+                settings.workers,
+            )
+    if settings.warm_start:
+        warm_task = asyncio.create_task(
+            awarm_up(aget_compiled_graph, retention_store.get)
+        )
+        loop.run_in_executor(
+            None,
+            warm_up,
+            get_gemini_model,
+            get_embeddings,
+            get_tavily_client,
+            get_chroma_client,
+        )
+    outbox_worker.start()
+    if settings.retention_enabled:
+        retention_job.start()
+    if settings.question_bank_enabled:
+        question_bank.start()
+    yield
+    if warm_task is not None:
+        warm_task.cancel()
+    await retention_job.stop()
+    await question_bank.stop()
+    outbox_worker.stop()
+    await aclose_all_resources()
+    close_all_resources()
+    shutdown_logging()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(interview_router)
 
+# Room for the form fields next to the CV itself.
+FORM_OVERHEAD_BYTES = 64 * 1024
+app.add_middleware(
+    BodySizeLimit,
+    max_bytes=settings.cv_max_bytes + FORM_OVERHEAD_BYTES,
+    paths=("/start_interview",),
+)
+
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """
+    Tag every log record emitted while serving a request with its request_id.
+    """
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    with log_context(request_id=request_id):
+        response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 
 @app.get("/")
 async def root():
     return {"message": "Interview API is running 🚀"}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    In-process metrics (rate limiter queue depth and wait times, ...).
+    """
+    return metrics.snapshot()
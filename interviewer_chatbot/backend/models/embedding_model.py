@@ -1,4 +1,18 @@
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from config.settings import settings
+from utils.lazy import LazyResource
 
-embeddings = GoogleGenerativeAIEmbeddings(model=settings.gemini_embedding_model)
+
+def _create_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return GoogleGenerativeAIEmbeddings(model=settings.gemini_embedding_model)
+
+
+embeddings = LazyResource("Gemini embeddings", _create_embeddings)
+
+
+def get_embeddings():
+    """
+    Return the shared embeddings client, creating it on first use.
+    """
+    return embeddings.get()
@@ -1,20 +1,33 @@
-from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import Any, Dict, List
 
+from pydantic import BaseModel, Field
 
-@dataclass
-class FinalEvaluation:
-    overall_quality: int
+
+class FinalEvaluation(BaseModel):
+    """
+    Pydantic model for the end-of-interview evaluation; also used to build
+    the response schema the model is constrained to. Every field is
+    required, so a partial reply fails validation instead of being padded
+    with defaults.
+    """
+
+    overall_quality: int = Field(..., ge=0, le=10)
     strengths: List[str]
     areas_for_improvement: List[str]
     recommendation: str
     final_feedback: str
 
-    def model_dump(self) -> Dict[str, Any]:
-        return {
-            "overall_quality": self.overall_quality,
-            "strengths": self.strengths,
-            "areas_for_improvement": self.areas_for_improvement,
-            "recommendation": self.recommendation,
-            "final_feedback": self.final_feedback,
-        }
+
+def fallback_final_evaluation() -> Dict[str, Any]:
+    """
+    The evaluation used when none could be obtained; flagged like the
+    turn-level fallback feedback so reports and re-scoring can tell.
+    """
+    return {
+        "overall_quality": 7,
+        "strengths": ["Good technical depth"],
+        "areas_for_improvement": ["Elaborate examples"],
+        "recommendation": "Recommended with reservations.",
+        "final_feedback": "Solid overall performance.",
+        "fallback": True,
+    }
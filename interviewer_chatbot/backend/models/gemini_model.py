@@ -1,6 +1,51 @@
-import google.generativeai as genai
+import threading
+from typing import Dict, Optional
+
 from config.settings import settings
+from utils.lazy import LazyResource, register_after_fork
+
+
+def _configure_genai():
+    import google.generativeai as genai
+
+    genai.configure(api_key=settings.gemini_api_key)
+    return genai
+
+
+def _create_gemini_model():
+    return genai_sdk.get().GenerativeModel(settings.gemini_model)
+
+
+genai_sdk = LazyResource("Gemini SDK", _configure_genai)
+gemini_model = LazyResource("Gemini model", _create_gemini_model)
+
+_routed_models: Dict[str, object] = {}
+_routed_lock = threading.Lock()
+
+
+def _reset_routed_models() -> None:
+    global _routed_lock
+    _routed_lock = threading.Lock()
+    _routed_models.clear()
+
+
+register_after_fork(_reset_routed_models)
+
 
-genai.configure(api_key=settings.gemini_api_key)
+def get_gemini_model(model_name: Optional[str] = None):
+    """
+    Return a shared Gemini model, configuring the SDK on first use.
 
-GeminiModel = genai.GenerativeModel(settings.gemini_model)
+    Args:
+        model_name (Optional[str]): Model to use; defaults to GEMINI_MODEL.
+    """
+    if not model_name or model_name == settings.gemini_model:
+        return gemini_model.get()
+    model = _routed_models.get(model_name)
+    if model is None:
+        with _routed_lock:
+            model = _routed_models.get(model_name)
+            if model is None:
+                model = genai_sdk.get().GenerativeModel(model_name)
+                _routed_models[model_name] = model
+    return model
@@ -0,0 +1,11 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class QuestionPlan(BaseModel):
+    """
+    Pydantic model for the upfront question plan of non-follow-up interviews.
+    """
+
+    questions: List[str]
@@ -1,13 +1,97 @@
-from fastapi import APIRouter, Form, File, UploadFile, HTTPException
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Form,
+    Header,
+    File,
+    UploadFile,
+    HTTPException,
+    Query,
+)
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
+import os
 import uuid
-from typing import Optional
+from typing import Any, Callable, Dict, Literal, Mapping, Optional
 
-from utils.cv_tools import extract_text_from_pdf_bytes, chunk_cv_text
+from utils.cv_tools import (
+    CVRejected,
+    chunk_cv_text,
+    extract_text_from_pdf_file,
+    spool_upload,
+)
 from services.vectorstore_service import create_vectorstore, delete_vectorstore
-from graph.graph import compiled_graph
+from services.conversation_memory import needs_summary_update, summarize_older_turns
+from services.turn_evaluator import turn_evaluator
+from services.checkpoint_retention import (
+    ACTIVE,
+    COMPLETED,
+    latest_checkpoint_id,
+    record_session,
+)
+from services.interview_report import (
+    MARKDOWN,
+    MEDIA_TYPES,
+    etag_matches,
+    interview_reports,
+)
+from graph.graph import GENERATE_QUESTION_NODE, aget_compiled_graph
+from utils.concurrency import run_blocking
+from utils.logger import bind_log_context, setup_logger
+from utils.metrics import metrics
+from utils.session_locks import SessionLockUnavailable, session_locks
+from utils.single_flight import SingleFlight
 
 router = APIRouter(tags=["Interview"])
+logger = setup_logger(__name__)
+
+# Duplicate submissions of an answer share the turn already in flight.
+continue_flights = SingleFlight("continue_interview")
+
+Emit = Callable[[Dict[str, Any]], None]
+
+# Streamed turns keep running if the client goes away; hold their tasks.
+_stream_tasks: set = set()
+
+
+async def refresh_conversation_summary(thread_id: str) -> None:
+    """
+    Fold turns that left the verbatim window into the rolling summary.
+
+    Runs as a background task after the response has been sent. The summary
+    is generated outside the thread's session lock, so the next turn never
+    waits for it; only the checkpoint update holds the lock, and it is
+    dropped if a turn or another summary landed in the meantime (the next
+    refresh picks the turns up again).
+    """
+    bind_log_context(thread_id=thread_id)
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        compiled_graph = await aget_compiled_graph()
+        snapshot = await compiled_graph.aget_state(config)
+        state = dict(snapshot.values) if snapshot else {}
+        if not state.get("waiting_for_user") or not needs_summary_update(state):
+            return
+        updates = await run_blocking(summarize_older_turns, state)
+        if not updates:
+            return
+
+        async with session_locks.hold(thread_id):
+            snapshot = await compiled_graph.aget_state(config)
+            current = dict(snapshot.values) if snapshot else {}
+            if not current.get("waiting_for_user") or any(
+                current.get(key, 0) != state.get(key, 0)
+                for key in ("step", "summarized_turns")
+            ):
+                logger.info("Conversation changed while summarizing; skipped")
+                return
+            await compiled_graph.aupdate_state(
+                config, updates, as_node=GENERATE_QUESTION_NODE
+            )
+    except Exception as e:
+        logger.error("Conversation summary update failed: %s", e, exc_info=True)
 
 
 class ContinueRequest(BaseModel):
@@ -15,6 +99,48 @@ class ContinueRequest(BaseModel):
 
     user_response: str
     thread_id: str
+    idempotency_key: Optional[str] = None
+
+
+async def persist_turn_evaluations(thread_id: str) -> None:
+    """
+    Wait for this thread's background answer evaluations and store them in
+    ``turn_feedback`` so final evaluation only has to collect them.
+
+    The wait happens outside the session lock; only the checkpoint update
+    holds it.
+    """
+    bind_log_context(thread_id=thread_id)
+    pending = turn_evaluator.pending(thread_id)
+    if not pending:
+        return
+    await asyncio.gather(
+        *(asyncio.wrap_future(future) for future in pending), return_exceptions=True
+    )
+
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        async with session_locks.hold(thread_id):
+            finished = turn_evaluator.pop_finished(thread_id)
+            if not finished:
+                return
+            compiled_graph = await aget_compiled_graph()
+            snapshot = await compiled_graph.aget_state(config)
+            state = dict(snapshot.values) if snapshot else {}
+            if not state.get("waiting_for_user"):
+                return
+            turn_feedback = list(state.get("turn_feedback") or [])
+            for index, result in finished.items():
+                turn_feedback.extend([None] * (index + 1 - len(turn_feedback)))
+                turn_feedback[index] = result
+            await compiled_graph.aupdate_state(
+                config,
+                {"turn_feedback": turn_feedback},
+                as_node=GENERATE_QUESTION_NODE,
+            )
+            logger.info("Stored %d background evaluation(s)", len(finished))
+    except Exception as e:
+        logger.error("Persisting turn evaluations failed: %s", e, exc_info=True)
 
 
 @router.post("/start_interview")
@@ -35,19 +161,24 @@ async def start_interview(
         dict: The initial interview question and session details.
 
     Raises:
-        HTTPException: If interview initialization fails.
+        HTTPException: 413 if the CV is over CV_MAX_BYTES or CV_MAX_PAGES,
+            415 if it is not a PDF, 500 if interview initialization fails.
     """
     thread_id = str(uuid.uuid4())
+    bind_log_context(thread_id=thread_id)
     config = {"configurable": {"thread_id": thread_id}}
     user_id = "user123"
     cv_text = ""
 
     try:
         if cv:
-            cv_bytes = await cv.read()
-            cv_text = extract_text_from_pdf_bytes(cv_bytes)
-            document = chunk_cv_text(cv_text, user_id=user_id)
-            create_vectorstore(document, user_id=user_id)
+            cv_path = await spool_upload(cv)
+            try:
+                cv_text = await run_blocking(extract_text_from_pdf_file, cv_path)
+            finally:
+                os.unlink(cv_path)
+            document = await run_blocking(chunk_cv_text, cv_text, user_id=user_id)
+            await run_blocking(create_vectorstore, document, user_id=user_id)
 
         initial_state = {
             "topic": job_title,
@@ -70,7 +201,9 @@ async def start_interview(
             "user_id": user_id,
         }
 
-        final_state = compiled_graph.invoke(initial_state, config=config)
+        compiled_graph = await aget_compiled_graph()
+        final_state = await compiled_graph.ainvoke(initial_state, config=config)
+        await record_session(thread_id, ACTIVE)
 
         return {
             "thread_id": thread_id,
@@ -80,17 +213,34 @@ async def start_interview(
             "max_steps": final_state["max_steps"],
         }
 
+    except CVRejected as e:
+        metrics.counter("cv_uploads_rejected_total", status=str(e.status_code)).inc()
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start interview: {e}")
 
 
 @router.post("/continue_interview")
-async def continue_interview(req: ContinueRequest):
+async def continue_interview(
+    req: ContinueRequest,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None),
+):
     """
     Continue an existing interview session by providing a user's response.
 
+    The turn runs under the thread's session lock; once the next question
+    has been sent, the answer's background evaluation is persisted and
+    older turns are summarized.
+
+    With an idempotency key (body field or ``Idempotency-Key`` header), a
+    duplicate submission never runs the turn twice: while the original is in
+    flight it attaches to it, and afterwards it gets the stored response.
+
     Args:
         req (ContinueRequest): The user's response and associated thread ID.
+        background_tasks (BackgroundTasks): Work scheduled after the response.
+        idempotency_key (Optional[str]): Key identifying this submission.
 
     Returns:
         dict: The next interview question or final evaluation.
@@ -98,10 +248,194 @@ async def continue_interview(req: ContinueRequest):
     Raises:
         HTTPException: If continuation or state retrieval fails.
     """
+    bind_log_context(thread_id=req.thread_id)
+    key = req.idempotency_key or idempotency_key
+    if not key:
+        return await _locked_turn(req, None, background_tasks)
+    return await continue_flights.do(
+        (req.thread_id, key), lambda: _locked_turn(req, key, background_tasks)
+    )
+
+
+@router.post("/continue_interview/stream")
+async def continue_interview_stream(
+    req: ContinueRequest,
+    background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None),
+):
+    """
+    Same turn as /continue_interview, streamed as NDJSON while it runs.
+
+    Events, one JSON object per line:
+        {"event": "progress", "node": ...} when a graph node finishes;
+        {"event": "delta", "text": ...} for each chunk of the next question;
+        {"event": "result", "response": ...} with the /continue_interview body;
+        {"event": "error", "status": ..., "detail": ...} instead of a result.
+
+    Deltas are a preview: if a generation attempt is retried its text is
+    streamed again, and the ``result`` message is authoritative. A duplicate
+    submission attached to a turn in flight, or replayed, gets only the
+    result.
+    """
+    bind_log_context(thread_id=req.thread_id)
+    key = req.idempotency_key or idempotency_key
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def run() -> None:
+        try:
+            if key:
+                response = await continue_flights.do(
+                    (req.thread_id, key),
+                    lambda: _locked_turn(req, key, background_tasks, events.put_nowait),
+                )
+            else:
+                response = await _locked_turn(
+                    req, None, background_tasks, events.put_nowait
+                )
+            events.put_nowait({"event": "result", "response": response})
+        except HTTPException as e:
+            events.put_nowait(
+                {"event": "error", "status": e.status_code, "detail": e.detail}
+            )
+        except Exception as e:
+            # Lock or pool failures outside the turn itself; nobody awaits
+            # this task, so report them on the stream instead of raising.
+            logger.error("Streamed turn failed: %s", e, exc_info=True)
+            events.put_nowait(
+                {
+                    "event": "error",
+                    "status": 500,
+                    "detail": f"Failed to continue interview: {e}",
+                }
+            )
+        finally:
+            events.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+
+    async def body():
+        while (event := await events.get()) is not None:
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(
+        body(), media_type="application/x-ndjson", background=background_tasks
+    )
+
+
+@router.get("/interviews/{thread_id}/report")
+async def interview_report(
+    thread_id: str,
+    fmt: Literal["markdown", "json"] = Query(MARKDOWN, alias="format"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Report of a finished interview, rendered from its latest checkpoint.
+
+    The rendering is cached per checkpoint and served with an ETag; a
+    request whose If-None-Match matches gets a 304 without a body. The
+    match is checked against the cached report of the thread's latest
+    checkpoint id before the checkpoint itself is loaded.
+
+    Args:
+        thread_id (str): Interview thread.
+        fmt (str): ``markdown`` (default) or ``json``, from ``?format=``.
+        if_none_match (Optional[str]): ETag(s) the client already holds.
+
+    Returns:
+        Response: The report, or 304 Not Modified.
+    """
+    bind_log_context(thread_id=thread_id)
+    headers = {"Cache-Control": "private, no-cache"}
+    if if_none_match:
+        try:
+            cached = interview_reports.peek(
+                thread_id, await latest_checkpoint_id(thread_id)
+            )
+        except Exception as e:
+            logger.warning("Report revalidation lookup failed: %s", e)
+            cached = None
+        if cached is not None and etag_matches(if_none_match, cached.etags[fmt]):
+            metrics.counter("interview_report_not_modified_total").inc()
+            return Response(
+                status_code=304, headers={**headers, "ETag": cached.etags[fmt]}
+            )
+
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        compiled_graph = await aget_compiled_graph()
+        snapshot = await compiled_graph.aget_state(config)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load interview: {e}")
+
+    state = dict(snapshot.values) if snapshot else {}
+    if not state:
+        raise HTTPException(status_code=404, detail="No interview for this thread.")
+    if not state.get("final_evaluation"):
+        raise HTTPException(status_code=409, detail="Interview is not finished yet.")
+
+    rendered = interview_reports.get(
+        thread_id,
+        snapshot.config.get("configurable", {}).get("checkpoint_id"),
+        state,
+        snapshot.created_at,
+    )
+    etag = rendered.etags[fmt]
+    headers["ETag"] = etag
+    if etag_matches(if_none_match, etag):
+        metrics.counter("interview_report_not_modified_total").inc()
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=rendered.bodies[fmt], media_type=MEDIA_TYPES[fmt], headers=headers
+    )
+
+
+async def _locked_turn(
+    req: ContinueRequest,
+    key: Optional[str],
+    background_tasks: BackgroundTasks,
+    emit: Optional[Emit] = None,
+) -> dict:
     config = {"configurable": {"thread_id": req.thread_id}}
+    try:
+        async with session_locks.hold(req.thread_id):
+            return await _continue_turn(req, key, config, background_tasks, emit)
+    except SessionLockUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
+
+async def _run_graph(compiled_graph, state: dict, config: dict, emit: Optional[Emit]):
+    """
+    Run the turn, forwarding node completions and question chunks to
+    ``emit`` when the caller streams.
+    """
+    if emit is None:
+        return await compiled_graph.ainvoke(state, config=config)
+    final_state = None
+    async for mode, chunk in compiled_graph.astream(
+        state, config=config, stream_mode=["values", "updates", "custom"]
+    ):
+        if mode == "values":
+            final_state = chunk
+        elif mode == "updates":
+            for node in chunk:
+                emit({"event": "progress", "node": node})
+        elif "delta" in chunk:
+            emit({"event": "delta", "text": chunk["delta"]})
+    return final_state
+
+
+async def _continue_turn(
+    req: ContinueRequest,
+    key: Optional[str],
+    config: dict,
+    background_tasks: BackgroundTasks,
+    emit: Optional[Emit] = None,
+) -> dict:
     try:
-        existing_state = compiled_graph.get_state(config)
+        compiled_graph = await aget_compiled_graph()
+        existing_state = await compiled_graph.aget_state(config)
         if not existing_state:
             raise HTTPException(
                 status_code=400, detail="No ongoing interview for this thread."
@@ -112,61 +446,96 @@ async def continue_interview(req: ContinueRequest):
         else:
             state_dict = dict(existing_state)
 
+        if (
+            key
+            and state_dict.get("last_request_key") == key
+            and _turn_finished(state_dict)
+        ):
+            metrics.counter("continue_interview_replays_total").inc()
+            logger.info("Replaying stored response for a duplicate submission")
+            return _turn_response(req, state_dict)
+
+        # The key travels with the turn's input, so it is checkpointed with
+        # the turn itself and a finished turn always carries its key.
         state_dict["user_response"] = req.user_response
         state_dict["waiting_for_user"] = False
+        state_dict["last_request_key"] = key
 
-        final_state = compiled_graph.invoke(state_dict, config=config)
-        messages = final_state.get("messages", [])
+        final_state = await _run_graph(compiled_graph, state_dict, config, emit)
+        response = _turn_response(req, final_state)
+        if response.get("final_evaluation"):
+            user_id = final_state.get("user_id", "default_user")
+            await run_blocking(delete_vectorstore, user_id)
+        elif response["status"] == "question":
+            background_tasks.add_task(persist_turn_evaluations, req.thread_id)
+            if needs_summary_update(final_state):
+                background_tasks.add_task(refresh_conversation_summary, req.thread_id)
+        await record_session(
+            req.thread_id, COMPLETED if response["status"] == "completed" else ACTIVE
+        )
+        return response
 
-        if messages and messages[-1].get("role") == "system":
-            return {
-                "thread_id": req.thread_id,
-                "status": "completed",
-                "message": messages[-1]["content"],
-                "current_step": final_state.get("step", 1),
-                "max_steps": final_state.get("max_steps", 3),
-            }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to continue interview: {e}"
+        )
 
-        if final_state.get("feedback"):
-            user_id = final_state.get("user_id", "default_user")
-            delete_vectorstore(user_id)
 
-            return {
-                "thread_id": req.thread_id,
-                "status": "completed",
-                "message": final_state["feedback"],
-                "current_step": final_state.get("step", 1),
-                "feedback_list": final_state["feedback"],
-                "final_evaluation": final_state["final_evaluation"],
-                "max_steps": final_state.get("max_steps", 3),
-            }
+def _turn_finished(state: Mapping[str, Any]) -> bool:
+    """
+    Whether the checkpointed state is the end of a turn (the next question
+    is waiting for an answer, or the interview is over) rather than a turn
+    cut short part way.
+    """
+    return bool(state.get("waiting_for_user") or state.get("final_evaluation"))
 
-        for msg in reversed(messages):
-            if msg.get("role") == "assistant":
-                return {
-                    "thread_id": req.thread_id,
-                    "status": "question",
-                    "message": msg["content"],
-                    "current_step": final_state.get("step", 1),
-                    "max_steps": final_state.get("max_steps", 3),
-                }
 
-        if messages:
+def _turn_response(req: ContinueRequest, final_state: Mapping[str, Any]) -> dict:
+    """
+    The /continue_interview body for the state a turn ended in; replays
+    rebuild it from the checkpoint the same way.
+    """
+    messages = final_state.get("messages", [])
+
+    if messages and messages[-1].get("role") == "system":
+        return {
+            "thread_id": req.thread_id,
+            "status": "completed",
+            "message": messages[-1]["content"],
+            "current_step": final_state.get("step", 1),
+            "max_steps": final_state.get("max_steps", 3),
+        }
+
+    if final_state.get("feedback"):
+        return {
+            "thread_id": req.thread_id,
+            "status": "completed",
+            "message": final_state["feedback"],
+            "current_step": final_state.get("step", 1),
+            "feedback_list": final_state["feedback"],
+            "final_evaluation": final_state["final_evaluation"],
+            "max_steps": final_state.get("max_steps", 3),
+        }
+
+    for msg in reversed(messages):
+        if msg.get("role") == "assistant":
             return {
                 "thread_id": req.thread_id,
-                "status": "unknown",
-                "message": messages[-1]["content"],
+                "status": "question",
+                "message": msg["content"],
                 "current_step": final_state.get("step", 1),
                 "max_steps": final_state.get("max_steps", 3),
             }
 
-        raise HTTPException(
-            status_code=500, detail="No response generated from the graph."
-        )
+    if messages:
+        return {
+            "thread_id": req.thread_id,
+            "status": "unknown",
+            "message": messages[-1]["content"],
+            "current_step": final_state.get("step", 1),
+            "max_steps": final_state.get("max_steps", 3),
+        }
 
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to continue interview: {e}"
-        )
+    raise HTTPException(status_code=500, detail="No response generated from the graph.")
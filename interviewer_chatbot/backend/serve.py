@@ -0,0 +1,51 @@
+"""
+Serve the API with one or more uvicorn worker processes.
+
+The worker count comes from WEB_CONCURRENCY (or --workers). Several workers
+share interview sessions only through the PostgreSQL checkpointer, so in
+that mode it is checked before any worker starts and the server refuses to
+run without it.
+
+Usage (from the backend directory):
+    python serve.py
+    WEB_CONCURRENCY=4 python serve.py --port 8000
+"""
+
+import argparse
+import os
+import sys
+
+import uvicorn
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.workers:
+        # Settings (and every worker process) read the count from here.
+        os.environ["WEB_CONCURRENCY"] = str(args.workers)
+
+    from config.settings import settings
+    from graph.graph import verify_shared_checkpointer
+
+    try:
+        verify_shared_checkpointer()
+    except RuntimeError as e:
+        print(f"Refusing to start: {e}", file=sys.stderr)
+        return 1
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=settings.workers,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
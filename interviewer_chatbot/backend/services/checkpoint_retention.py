@@ -0,0 +1,566 @@
+"""
+Checkpoint retention: compact completed threads to their latest checkpoint
+and expire abandoned ones, for the PostgreSQL and SQLite savers.
+
+Usage (from the backend directory), e.g. from cron:
+    python -m services.checkpoint_retention
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from graph.graph import async_checkpointer, hot_sessions
+from utils.lazy import AsyncLazyResource
+from utils.logger import setup_logger
+from utils.metrics import metrics
+from utils.session_locks import session_locks
+
+logger = setup_logger(__name__)
+
+ACTIVE, COMPLETED, UNKNOWN = "active", "completed", "unknown"
+
+# Advisory lock key electing the single worker that runs a compaction pass.
+RETENTION_LOCK_KEY = 4_112_024_041
+
+DAY = 86400.0
+
+
+class PostgresRetentionStore:
+    """
+    Registry and retention queries for the PostgreSQL checkpointer tables.
+
+    ``interview_sessions`` records each thread's status and last activity.
+    Threads that predate it are registered as ``unknown``: they are
+    compacted but never expired.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS interview_sessions (
+            thread_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            created_at DOUBLE PRECISION NOT NULL,
+            updated_at DOUBLE PRECISION NOT NULL,
+            compacted_at DOUBLE PRECISION
+        )""",
+        """CREATE INDEX IF NOT EXISTS idx_interview_sessions_status
+            ON interview_sessions (status, updated_at)""",
+    )
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def setup(self) -> None:
+        now = time.time()
+        async with self.pool.connection() as conn:
+            for statement in self.SCHEMA:
+                await conn.execute(statement)
+            await conn.execute(
+                """INSERT INTO interview_sessions
+                    (thread_id, status, created_at, updated_at)
+                SELECT DISTINCT thread_id, %s, %s, %s FROM checkpoints
+                ON CONFLICT (thread_id) DO NOTHING""",
+                (UNKNOWN, now, now),
+            )
+
+    async def record(self, thread_id: str, status: str) -> None:
+        now = time.time()
+        async with self.pool.connection() as conn:
+            await conn.execute(
+                """INSERT INTO interview_sessions
+                    (thread_id, status, created_at, updated_at)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (thread_id) DO UPDATE
+                SET status = EXCLUDED.status, updated_at = EXCLUDED.updated_at""",
+                (thread_id, status, now, now),
+            )
+
+    async def _thread_ids(self, query: str, params: tuple) -> List[str]:
+        async with self.pool.connection() as conn:
+            cursor = await conn.execute(query, params)
+            return [row["thread_id"] for row in await cursor.fetchall()]
+
+    async def due_for_compaction(self, limit: int) -> List[str]:
+        return await self._thread_ids(
+            """SELECT thread_id FROM interview_sessions
+            WHERE status IN (%s, %s)
+              AND (compacted_at IS NULL OR compacted_at < updated_at)
+            ORDER BY updated_at LIMIT %s""",
+            (COMPLETED, UNKNOWN, limit),
+        )
+
+    async def due_for_expiry(
+        self, abandoned_before: float, completed_before: float, limit: int
+    ) -> List[str]:
+        return await self._thread_ids(
+            """SELECT thread_id FROM interview_sessions
+            WHERE (status = %s AND updated_at < %s)
+               OR (status = %s AND updated_at < %s)
+            ORDER BY updated_at LIMIT %s""",
+            (ACTIVE, abandoned_before, COMPLETED, completed_before, limit),
+        )
+
+    async def list_threads(
+        self, statuses: List[str], after: str, limit: int
+    ) -> List[str]:
+        return await self._thread_ids(
+            """SELECT thread_id FROM interview_sessions
+            WHERE status = ANY(%s) AND thread_id > %s
+            ORDER BY thread_id LIMIT %s""",
+            (list(statuses), after, limit),
+        )
+
+    async def compact(self, thread_id: str) -> int:
+        async with self.pool.connection() as conn, conn.transaction():
+            cursor = await conn.execute(
+                """DELETE FROM checkpoints c
+                WHERE c.thread_id = %s AND c.checkpoint_id < (
+                    SELECT max(l.checkpoint_id) FROM checkpoints l
+                    WHERE l.thread_id = c.thread_id
+                      AND l.checkpoint_ns = c.checkpoint_ns
+                )""",
+                (thread_id,),
+            )
+            removed = cursor.rowcount
+            await conn.execute(
+                """DELETE FROM checkpoint_writes w
+                WHERE w.thread_id = %s AND NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = w.thread_id
+                      AND c.checkpoint_ns = w.checkpoint_ns
+                      AND c.checkpoint_id = w.checkpoint_id
+                )""",
+                (thread_id,),
+            )
+            await conn.execute(
+                """DELETE FROM checkpoint_blobs b
+                WHERE b.thread_id = %s AND NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = b.thread_id
+                      AND c.checkpoint_ns = b.checkpoint_ns
+                      AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+                )""",
+                (thread_id,),
+            )
+            await conn.execute(
+                "UPDATE checkpoints SET parent_checkpoint_id = NULL WHERE thread_id = %s",
+                (thread_id,),
+            )
+            await conn.execute(
+                "UPDATE interview_sessions SET compacted_at = %s WHERE thread_id = %s",
+                (time.time(), thread_id),
+            )
+        return removed
+
+    async def latest_checkpoint_id(self, thread_id: str) -> Optional[str]:
+        async with self.pool.connection() as conn:
+            cursor = await conn.execute(
+                """SELECT max(checkpoint_id) AS checkpoint_id FROM checkpoints
+                WHERE thread_id = %s AND checkpoint_ns = ''""",
+                (thread_id,),
+            )
+            row = await cursor.fetchone()
+        return row["checkpoint_id"] if row else None
+
+    async def delete_thread(self, thread_id: str) -> None:
+        async with self.pool.connection() as conn, conn.transaction():
+            for table in (
+                "checkpoint_writes",
+                "checkpoint_blobs",
+                "checkpoints",
+                "interview_sessions",
+            ):
+                await conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = %s", (thread_id,)
+                )
+
+    @asynccontextmanager
+    async def exclusive(self):
+        """
+        Yield whether this process won the cluster-wide retention lock.
+        """
+        async with self.pool.connection() as conn:
+            cursor = await conn.execute(
+                "SELECT pg_try_advisory_lock(%s) AS acquired", (RETENTION_LOCK_KEY,)
+            )
+            acquired = (await cursor.fetchone())["acquired"]
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    await conn.execute(
+                        "SELECT pg_advisory_unlock(%s)", (RETENTION_LOCK_KEY,)
+                    )
+
+
+class SqliteRetentionStore:
+    """
+    Registry and retention queries for the SQLite checkpointer tables.
+
+    Statements share the saver's connection and lock, so they never
+    interleave with a checkpoint write.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS interview_sessions (
+        thread_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        compacted_at REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_interview_sessions_status
+        ON interview_sessions (status, updated_at);
+    """
+
+    def __init__(self, saver):
+        self.saver = saver
+        self.conn = saver.conn
+
+    async def _execute(self, *statements) -> List[int]:
+        """
+        Run the statements in one transaction; returns their row counts.
+        """
+        counts = []
+        async with self.saver.lock:
+            try:
+                for query, params in statements:
+                    cursor = await self.conn.execute(query, params)
+                    counts.append(cursor.rowcount)
+                await self.conn.commit()
+            except BaseException:
+                await self.conn.rollback()
+                raise
+        return counts
+
+    async def setup(self) -> None:
+        now = time.time()
+        async with self.saver.lock:
+            await self.conn.executescript(self.SCHEMA)
+            await self.conn.execute(
+                """INSERT OR IGNORE INTO interview_sessions
+                    (thread_id, status, created_at, updated_at)
+                SELECT DISTINCT thread_id, ?, ?, ? FROM checkpoints""",
+                (UNKNOWN, now, now),
+            )
+            await self.conn.commit()
+
+    async def record(self, thread_id: str, status: str) -> None:
+        now = time.time()
+        await self._execute(
+            (
+                """INSERT INTO interview_sessions
+                    (thread_id, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (thread_id) DO UPDATE
+                SET status = excluded.status, updated_at = excluded.updated_at""",
+                (thread_id, status, now, now),
+            )
+        )
+
+    async def _thread_ids(self, query: str, params: tuple) -> List[str]:
+        async with self.saver.lock:
+            cursor = await self.conn.execute(query, params)
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def due_for_compaction(self, limit: int) -> List[str]:
+        return await self._thread_ids(
+            """SELECT thread_id FROM interview_sessions
+            WHERE status IN (?, ?)
+              AND (compacted_at IS NULL OR compacted_at < updated_at)
+            ORDER BY updated_at LIMIT ?""",
+            (COMPLETED, UNKNOWN, limit),
+        )
+
+    async def due_for_expiry(
+        self, abandoned_before: float, completed_before: float, limit: int
+    ) -> List[str]:
+        return await self._thread_ids(
+            """SELECT thread_id FROM interview_sessions
+            WHERE (status = ? AND updated_at < ?)
+               OR (status = ? AND updated_at < ?)
+            ORDER BY updated_at LIMIT ?""",
+            (ACTIVE, abandoned_before, COMPLETED, completed_before, limit),
+        )
+
+    async def list_threads(
+        self, statuses: List[str], after: str, limit: int
+    ) -> List[str]:
+        placeholders = ", ".join("?" for _ in statuses)
+        return await self._thread_ids(
+            f"""SELECT thread_id FROM interview_sessions
+            WHERE status IN ({placeholders}) AND thread_id > ?
+            ORDER BY thread_id LIMIT ?""",
+            (*statuses, after, limit),
+        )
+
+    async def compact(self, thread_id: str) -> int:
+        counts = await self._execute(
+            (
+                """DELETE FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_id < (
+                    SELECT max(l.checkpoint_id) FROM checkpoints l
+                    WHERE l.thread_id = checkpoints.thread_id
+                      AND l.checkpoint_ns = checkpoints.checkpoint_ns
+                )""",
+                (thread_id,),
+            ),
+            (
+                """DELETE FROM writes
+                WHERE thread_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id
+                      AND c.checkpoint_ns = writes.checkpoint_ns
+                      AND c.checkpoint_id = writes.checkpoint_id
+                )""",
+                (thread_id,),
+            ),
+            (
+                "UPDATE checkpoints SET parent_checkpoint_id = NULL WHERE thread_id = ?",
+                (thread_id,),
+            ),
+            (
+                "UPDATE interview_sessions SET compacted_at = ? WHERE thread_id = ?",
+                (time.time(), thread_id),
+            ),
+        )
+        return counts[0]
+
+    async def latest_checkpoint_id(self, thread_id: str) -> Optional[str]:
+        async with self.saver.lock:
+            cursor = await self.conn.execute(
+                """SELECT max(checkpoint_id) FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns = ''""",
+                (thread_id,),
+            )
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def delete_thread(self, thread_id: str) -> None:
+        await self._execute(
+            *(
+                (f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                for table in ("writes", "checkpoints", "interview_sessions")
+            )
+        )
+
+    @asynccontextmanager
+    async def exclusive(self):
+        # A SQLite checkpointer implies a single worker process.
+        yield True
+
+
+async def _create_store():
+    """
+    Pick the store matching the async checkpointer; None for MemorySaver,
+    whose threads disappear with the process anyway.
+    """
+    saver = await async_checkpointer.get()
+    try:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+        if isinstance(saver, AsyncPostgresSaver):
+            store = PostgresRetentionStore(saver.conn)
+            await store.setup()
+            return store
+    except ImportError:
+        pass
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        if isinstance(saver, AsyncSqliteSaver):
+            store = SqliteRetentionStore(saver)
+            await store.setup()
+            return store
+    except ImportError:
+        pass
+    logger.info("Checkpoint retention disabled for %s", type(saver).__name__)
+    return None
+
+
+retention_store = AsyncLazyResource("checkpoint retention store", _create_store)
+
+
+async def record_session(thread_id: str, status: str) -> None:
+    """
+    Register a thread's status and last activity for the retention policy.
+
+    Failures are logged, never raised: bookkeeping must not fail a turn.
+    """
+    try:
+        store = await retention_store.get()
+        if store is not None:
+            await store.record(thread_id, status)
+    except Exception as e:
+        logger.warning("Could not record session '%s': %s", thread_id, e)
+
+
+async def _sync_hot_session(thread_id: str, drop: bool) -> None:
+    # The stores below bypass the saver, so the write-behind cache must not
+    # hold unflushed writes (or a copy of a deleted thread) meanwhile.
+    if not hot_sessions.initialized:
+        return
+    cache = await hot_sessions.get()
+    if cache is None:
+        return
+    if drop:
+        await cache.discard(thread_id)
+    else:
+        await cache.flush(thread_id)
+
+
+async def latest_checkpoint_id(thread_id: str) -> Optional[str]:
+    """
+    Id of a thread's latest checkpoint, read without loading the checkpoint.
+
+    The write-behind cache is asked first, since it may be ahead of the
+    store. Returns None when the id cannot be read cheaply (an in-memory
+    saver, or writes still waiting to be flushed).
+    """
+    if hot_sessions.initialized:
+        cache = await hot_sessions.get()
+        if cache is not None:
+            checkpoint_id = cache.latest_checkpoint_id(thread_id)
+            if checkpoint_id is not None or cache.has_pending(thread_id):
+                return checkpoint_id
+    store = await retention_store.get()
+    if store is None:
+        return None
+    return await store.latest_checkpoint_id(thread_id)
+
+
+async def delete_thread(thread_id: str) -> None:
+    """
+    Delete every checkpoint, pending write and registry row of a thread.
+    """
+    store = await retention_store.get()
+    if store is None:
+        return
+    async with session_locks.hold(thread_id):
+        await _sync_hot_session(thread_id, drop=True)
+        await store.delete_thread(thread_id)
+    logger.info("Deleted checkpoints of thread '%s'", thread_id)
+
+
+async def run_retention(
+    batch_size: int = settings.retention_batch_size,
+    now: Optional[float] = None,
+) -> Dict[str, int]:
+    """
+    Apply the retention policy once, in batches, until nothing is due.
+
+    Each thread is processed under its session lock. A batch that hit any
+    error ends the pass; the next pass retries it.
+
+    Returns:
+        Dict[str, int]: Threads compacted and expired, checkpoints removed.
+    """
+    stats = {"compacted": 0, "expired": 0, "checkpoints_removed": 0}
+    store = await retention_store.get()
+    if store is None:
+        return stats
+
+    now = time.time() if now is None else now
+    abandoned_before = now - settings.retention_abandoned_days * DAY
+    completed_before = (
+        now - settings.retention_completed_days * DAY
+        if settings.retention_completed_days > 0
+        else float("-inf")
+    )
+
+    async with store.exclusive() as acquired:
+        if not acquired:
+            logger.info("Retention pass already running in another worker")
+            return stats
+
+        while True:
+            thread_ids = await store.due_for_expiry(
+                abandoned_before, completed_before, batch_size
+            )
+            failed = False
+            for thread_id in thread_ids:
+                try:
+                    async with session_locks.hold(thread_id):
+                        await _sync_hot_session(thread_id, drop=True)
+                        await store.delete_thread(thread_id)
+                    stats["expired"] += 1
+                except Exception as e:
+                    failed = True
+                    logger.warning("Expiring thread '%s' failed: %s", thread_id, e)
+            if failed or len(thread_ids) < batch_size:
+                break
+
+        while True:
+            thread_ids = await store.due_for_compaction(batch_size)
+            failed = False
+            for thread_id in thread_ids:
+                try:
+                    async with session_locks.hold(thread_id):
+                        await _sync_hot_session(thread_id, drop=False)
+                        stats["checkpoints_removed"] += await store.compact(thread_id)
+                    stats["compacted"] += 1
+                except Exception as e:
+                    failed = True
+                    logger.warning("Compacting thread '%s' failed: %s", thread_id, e)
+            if failed or len(thread_ids) < batch_size:
+                break
+
+    for action, count in stats.items():
+        metrics.counter("checkpoint_retention_total", action=action).inc(count)
+    logger.info(
+        "Retention pass: %d compacted (%d checkpoints removed), %d expired",
+        stats["compacted"],
+        stats["checkpoints_removed"],
+        stats["expired"],
+    )
+    return stats
+
+
+class RetentionJob:
+    """
+    Runs the retention policy every RETENTION_INTERVAL seconds on the event
+    loop, alongside the API.
+    """
+
+    def __init__(self, interval: float = settings.retention_interval):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_retention()
+            except Exception as e:
+                logger.error("Retention pass failed: %s", e, exc_info=True)
+
+
+retention_job = RetentionJob()
+
+
+async def _main() -> None:
+    from utils.lazy import aclose_all_resources
+
+    try:
+        print(await run_retention())
+    finally:
+        await aclose_all_resources()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,90 @@
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from config.prompts import get_summary_prompt
+from config.settings import settings
+from services.gemini_client import TASK_CONVERSATION_SUMMARY, gemini_client
+from services.rate_limiter import PRIORITY_BACKGROUND
+from utils.generation import safe_text
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _turns(state: Mapping[str, Any]) -> List[Tuple[str, str]]:
+    return list(zip(state.get("questions", []), state.get("answers", [])))
+
+
+def _format_turns(turns: List[Tuple[str, str]]) -> str:
+    return "\n".join(f"Q: {q}\nA: {a}" for q, a in turns)
+
+
+def conversation_context(
+    state: Mapping[str, Any], keep_turns: int = settings.memory_keep_turns
+) -> str:
+    """
+    Bounded conversation history for question prompts.
+
+    Combines the CV seed placed in ``content`` by setup_node (truncated), the
+    rolling summary of older turns, and every turn not yet folded into the
+    summary (normally the last ``keep_turns``) verbatim.
+
+    Args:
+        state (Mapping[str, Any]): Current interview state.
+        keep_turns (int): Turns always kept verbatim.
+
+    Returns:
+        str: Text for the "Conversation so far" section of the prompt.
+    """
+    parts = []
+    content = state.get("content") or []
+    if content and content[0] != "No content":
+        parts.append(safe_text(content[0], settings.memory_seed_chars))
+
+    turns = _turns(state)
+    summarized = min(state.get("summarized_turns", 0), max(0, len(turns) - keep_turns))
+    summary = state.get("conversation_summary")
+    if summary and summarized:
+        parts.append(f"Summary of earlier turns: {summary}")
+    parts.append(_format_turns(turns[summarized:]))
+    return "\n".join(part for part in parts if part)
+
+
+def needs_summary_update(
+    state: Mapping[str, Any], keep_turns: int = settings.memory_keep_turns
+) -> bool:
+    """
+    Whether turns older than the verbatim window are missing from the summary.
+    Planned interviews never build prompts from the history, so they skip it.
+    """
+    if state.get("question_plan"):
+        return False
+    return len(_turns(state)) - keep_turns > state.get("summarized_turns", 0)
+
+
+def summarize_older_turns(
+    state: Mapping[str, Any], keep_turns: int = settings.memory_keep_turns
+) -> Optional[Dict[str, Any]]:
+    """
+    Fold the turns that left the verbatim window into the running summary.
+
+    Returns:
+        Optional[Dict[str, Any]]: State updates with the new summary and the
+        number of turns it covers, or None if nothing changed (or the model
+        call failed, in which case the turns simply stay verbatim).
+    """
+    turns = _turns(state)
+    start = state.get("summarized_turns", 0)
+    end = len(turns) - keep_turns
+    if end <= start:
+        return None
+
+    prompt = get_summary_prompt(
+        state.get("conversation_summary", ""), _format_turns(turns[start:end])
+    )
+    summary = gemini_client.generate_content(
+        prompt, priority=PRIORITY_BACKGROUND, task=TASK_CONVERSATION_SUMMARY
+    )
+    if not summary:
+        return None
+    logger.info("Summarized turns %d-%d (%d chars)", start + 1, end, len(summary))
+    return {"conversation_summary": summary, "summarized_turns": end}
@@ -0,0 +1,167 @@
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+FLOAT32, FLOAT16, INT8 = "float32", "float16", "int8"
+DTYPES = (FLOAT32, FLOAT16, INT8)
+
+# Rows dequantized at a time while scoring; bounds the float32 scratch space.
+SEARCH_BLOCK_ROWS = 1024
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class QuantizedEmbeddingStore:
+    """
+    Dense vectors of one corpus in a single contiguous NumPy array, searched
+    by cosine similarity without keeping a float32 copy.
+
+    Vectors are L2-normalized, then stored as float16, or as int8 with one
+    float32 scale per vector (symmetric, ``max(|x|) / 127``). Search scores
+    blocks of ``SEARCH_BLOCK_ROWS`` rows at a time, so its scratch space does
+    not grow with the corpus.
+    """
+
+    def __init__(self, dtype: str = settings.embedding_store_dtype):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown embedding store dtype '{dtype}'")
+        self.dtype = dtype
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        # Ingest id of the collection the store was built from.
+        self.version: Optional[str] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes held by the vectors and their scales.
+        """
+        if self._vectors is None:
+            return 0
+        scales = self._scales.nbytes if self._scales is not None else 0
+        return self._vectors.nbytes + scales
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.dtype == INT8:
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            quantized = np.rint(vectors / scales[:, None]).astype(np.int8)
+            return quantized, scales.astype(np.float32)
+        return vectors.astype(self.dtype), None
+
+    def add(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        texts: Sequence[str],
+        ids: Sequence[str],
+    ) -> None:
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("Expected one embedding per id")
+        quantized, scales = self._quantize(vectors)
+        if self._vectors is None:
+            self._vectors, self._scales = quantized, scales
+        else:
+            self._vectors = np.concatenate([self._vectors, quantized])
+            if scales is not None:
+                self._scales = np.concatenate([self._scales, scales])
+        self.ids.extend(ids)
+        self.texts.extend(texts)
+
+    def scores(self, query: Sequence[float]) -> np.ndarray:
+        """
+        Cosine similarity of ``query`` to every stored vector.
+        """
+        if self._vectors is None:
+            return np.empty(0, dtype=np.float32)
+        q = _normalize(np.asarray(query, dtype=np.float32))
+        out = np.empty(len(self._vectors), dtype=np.float32)
+        for start in range(0, len(self._vectors), SEARCH_BLOCK_ROWS):
+            block = self._vectors[start : start + SEARCH_BLOCK_ROWS]
+            out[start : start + len(block)] = block.astype(np.float32) @ q
+        if self._scales is not None:
+            out *= self._scales
+        return out
+
+    def search(self, query: Sequence[float], k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Rank stored vectors for ``query``.
+
+        Returns:
+            List[Tuple[int, float]]: Up to ``k`` (position, cosine score)
+            pairs, best first.
+        """
+        scores = self.scores(query)
+        if not len(scores):
+            return []
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(pos), float(scores[pos])) for pos in top]
+
+
+class EmbeddingStoreRegistry:
+    """
+    Per-user quantized embedding stores, built when the CV is ingested.
+    """
+
+    def __init__(self):
+        self._stores: Dict[str, QuantizedEmbeddingStore] = {}
+        self._lock = threading.Lock()
+
+    def build(
+        self,
+        user_id: str,
+        embeddings: Sequence[Sequence[float]],
+        texts: List[str],
+        ids: List[str],
+        version: Optional[str] = None,
+    ) -> QuantizedEmbeddingStore:
+        store = QuantizedEmbeddingStore()
+        store.version = version
+        if len(ids):
+            store.add(embeddings, texts, ids)
+        with self._lock:
+            self._stores[user_id] = store
+            total = sum(s.nbytes for s in self._stores.values())
+        metrics.gauge("embedding_store_bytes").set(total)
+        logger.info(
+            "Built %s embedding store for '%s' (%d chunks, %d bytes)",
+            store.dtype,
+            user_id,
+            len(store),
+            store.nbytes,
+        )
+        return store
+
+    def get(self, user_id: str) -> Optional[QuantizedEmbeddingStore]:
+        return self._stores.get(user_id)
+
+    def drop(self, user_id: str) -> None:
+        with self._lock:
+            self._stores.pop(user_id, None)
+            total = sum(s.nbytes for s in self._stores.values())
+        metrics.gauge("embedding_store_bytes").set(total)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stores.clear()
+        metrics.gauge("embedding_store_bytes").set(0)
+
+
+embedding_stores = EmbeddingStoreRegistry()
@@ -1,13 +1,60 @@
 import time
-import json
-import re
-from typing import Type
-from pydantic import BaseModel, Field, ValidationError
-from models.gemini_model import GeminiModel
+from typing import Callable, Optional, Type, TypeVar
+from pydantic import BaseModel, Field
+from models.gemini_model import get_gemini_model
+from services.rate_limiter import (
+    PRIORITY_INTERACTIVE,
+    estimate_tokens,
+    gemini_rate_limiter,
+)
+from config.settings import settings
+from services.resilience import CircuitOpenError, get_dependency
 from utils.logger import setup_logger
+from utils.metrics import metrics
+from utils.structured_output import parse_model, response_schema_for
 
 logger = setup_logger(__name__)
 
+# Errors that will fail the same way on every attempt.
+NON_RETRYABLE_ERRORS = {
+    "InvalidArgument",
+    "PermissionDenied",
+    "Unauthenticated",
+    "NotFound",
+}
+
+
+# Keys of settings.model_routes.
+TASK_SETUP_QUESTION = "setup_question"
+TASK_QUESTION_PLAN = "question_plan"
+TASK_FOLLOWUP_QUESTION = "followup_question"
+TASK_ITEM_EVALUATION = "item_evaluation"
+TASK_FINAL_EVALUATION = "final_evaluation"
+TASK_CONVERSATION_SUMMARY = "conversation_summary"
+
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def _is_retryable(error: Exception) -> bool:
+    return type(error).__name__ not in NON_RETRYABLE_ERRORS
+
+
+def _stream_response(response, on_text: Callable[[str], None]):
+    """
+    Drain a streamed response, passing each text chunk to ``on_text``; the
+    drained response then carries the full text and usage like a unary one.
+    """
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # A chunk without text parts (e.g. only finish metadata).
+            continue
+        if text:
+            on_text(text)
+    return response
+
 
 class QuestionFeedback(BaseModel):
     """
@@ -18,8 +65,8 @@ class QuestionFeedback(BaseModel):
         feedback (str): Descriptive feedback for the question.
     """
 
-    rating: int = Field(0, ge=0, le=10)
-    feedback: str = "No feedback"
+    rating: int = Field(..., ge=0, le=10)
+    feedback: str
 
 
 class AnswerFeedback(BaseModel):
@@ -31,79 +78,166 @@ class AnswerFeedback(BaseModel):
         feedback (str): Descriptive feedback for the answer.
     """
 
-    rating: int = Field(0, ge=0, le=10)
-    feedback: str = "No feedback"
+    rating: int = Field(..., ge=0, le=10)
+    feedback: str
 
 
 class GeminiClient:
     """
     Wrapper class for interacting with the Gemini LLM API.
-    Provides retry mechanism and JSON validation using Pydantic models.
+    Provides retry mechanism and schema-constrained JSON generation
+    validated with Pydantic models.
     """
 
-    def __init__(self):
+    @property
+    def model(self):
         """
-        Initializes the GeminiClient with a GeminiModel instance.
+        The shared Gemini model, created on first use.
         """
-        self.model = GeminiModel
+        return get_gemini_model()
 
-    def generate_content(self, prompt: str, retries: int = 3, delay: int = 5) -> str:
+    @staticmethod
+    def route(task: Optional[str]) -> dict:
+        """
+        Model and generation config for a task (the default model when the
+        task is unknown or not given).
+        """
+        route = settings.model_routes.get(task) if task else None
+        return route or {"model": settings.gemini_model}
+
+    def generate_content(
+        self,
+        prompt: str,
+        retries: int = 3,
+        priority: int = PRIORITY_INTERACTIVE,
+        task: Optional[str] = None,
+        response_model: Optional[Type[BaseModel]] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
         """
         Generates text content from Gemini LLM for a given prompt.
 
+        Every attempt first takes capacity from the shared rate limiter, so
+        bursts queue locally (interactive calls first) instead of hitting 429s.
+        Attempts run under the "gemini" resilience policy: adaptive deadline,
+        jittered exponential backoff and a circuit breaker that fails fast
+        while Gemini is unhealthy. Each model and task has its own deadline;
+        tasks on the same model share a breaker.
+
         Args:
             prompt (str): The input prompt to send to Gemini LLM.
-            retries (int, optional): Number of retry attempts if API fails. Default is 3.
-            delay (int, optional): Delay in seconds between retries. Default is 5.
+            retries (int, optional): Number of attempts if API fails. Default is 3.
+            priority (int, optional): Rate limiter priority; lower is served first.
+            task (str, optional): Routing key in settings.model_routes that
+                selects the model and generation config.
+            response_model (Type[BaseModel], optional): Request JSON mode
+                constrained to this model's schema.
+            on_text (Callable[[str], None], optional): Stream the response and
+                pass it each text chunk as it arrives. A retried attempt
+                streams again from the start; the return value is the text of
+                the attempt that succeeded.
 
         Returns:
-            str: The generated text from the model, or empty string on failure.
+            str: The generated text from the model, or empty string on failure
+            (callers substitute their fallback).
         """
-        for attempt in range(retries):
-            try:
-                response = self.model.generate_content(prompt)
-                logger.info(
-                    f"Generated content for prompt (length {len(prompt)} chars)"
-                )
-                return response.text.strip() if response.text else ""
-            except Exception as e:
-                logger.exception(f"Gemini API error (attempt {attempt+1}/{retries})")
-                if attempt < retries - 1:
-                    time.sleep(delay)
-                else:
-                    logger.error("Gemini API failed after maximum retries")
-                    return ""
-
-    def safe_parse_json(
-        self, response_text: str, model: Type[BaseModel] = QuestionFeedback
-    ) -> dict:
+        route = self.route(task)
+        model_name = route["model"]
+        model = get_gemini_model(model_name)
+        generation_config = {
+            key: route[key]
+            for key in ("max_output_tokens", "temperature")
+            if key in route
+        }
+        if response_model is not None:
+            generation_config["response_mime_type"] = "application/json"
+            generation_config["response_schema"] = response_schema_for(response_model)
+        estimated = estimate_tokens(prompt, route.get("max_output_tokens", 512))
+        labels = {"model": model_name or "default", "task": task or "default"}
+        started = time.monotonic()
+        try:
+            response = get_dependency(
+                "gemini", f"{labels['model']}:{labels['task']}"
+            ).call(
+                # retry=None: the policy above owns retries, not api_core.
+                lambda timeout: self._call_model(
+                    model,
+                    prompt,
+                    generation_config or None,
+                    {"timeout": timeout, "retry": None},
+                    on_text,
+                ),
+                retries=retries - 1,
+                before_attempt=lambda: gemini_rate_limiter.acquire(
+                    estimated, priority=priority
+                ),
+                retry_if=_is_retryable,
+            )
+            usage = getattr(response, "usage_metadata", None)
+            total_tokens = getattr(usage, "total_token_count", None)
+            gemini_rate_limiter.settle(estimated, total_tokens)
+            metrics.counter("gemini_requests_total", **labels).inc()
+            metrics.histogram("gemini_latency_seconds", **labels).observe(
+                time.monotonic() - started
+            )
+            if total_tokens:
+                metrics.counter("gemini_tokens_total", **labels).inc(total_tokens)
+            logger.info(
+                "Generated content with %s for %s (prompt %d chars)",
+                labels["model"],
+                labels["task"],
+                len(prompt),
+            )
+            return response.text.strip() if response.text else ""
+        except CircuitOpenError:
+            metrics.counter("gemini_failures_total", **labels).inc()
+            logger.warning("Gemini circuit open; using fallback")
+            return ""
+        except Exception:
+            metrics.counter("gemini_failures_total", **labels).inc()
+            logger.exception("Gemini API failed after maximum retries")
+            return ""
+
+    @staticmethod
+    def _call_model(model, prompt, generation_config, request_options, on_text):
+        if on_text is None:
+            return model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                request_options=request_options,
+            )
+        response = model.generate_content(
+            prompt,
+            generation_config=generation_config,
+            request_options=request_options,
+            stream=True,
+        )
+        return _stream_response(response, on_text)
+
+    def generate_structured(
+        self,
+        prompt: str,
+        response_model: Type[T],
+        priority: int = PRIORITY_INTERACTIVE,
+        task: Optional[str] = None,
+    ) -> Optional[T]:
         """
-        Safely parses a JSON string response from Gemini LLM and validates it using a Pydantic model.
-        Returns a default model dictionary if parsing or validation fails.
+        Generates JSON constrained to ``response_model`` and validates it.
 
         Args:
-            response_text (str): The raw JSON string returned by Gemini LLM.
-            model (Type[BaseModel], optional): Pydantic model class to validate JSON. Default is QuestionFeedback.
+            prompt (str): The input prompt to send to Gemini LLM.
+            response_model (Type[T]): Pydantic model for schema and validation.
+            priority (int, optional): Rate limiter priority; lower is served first.
+            task (str, optional): Routing key in settings.model_routes.
 
         Returns:
-            dict: Validated dictionary according to the Pydantic model.
+            Optional[T]: The validated model, or None if the call or parsing
+            failed (counted in llm_json_parse_total).
         """
-        if not response_text or not response_text.strip():
-            logger.warning("Empty response received; returning default model")
-            return model().dict()
-
-        # Extract JSON substring from the response
-        match = re.search(r"\{.*\}", response_text, re.DOTALL)
-        if match:
-            try:
-                data = json.loads(match.group(0))
-                validated = model(**data)
-                return validated.dict()
-            except (json.JSONDecodeError, ValidationError) as e:
-                logger.error(f"Failed to parse/validate JSON: {e}")
-                return model().dict()
-        logger.warning("No JSON found in response; returning default model")
-        return model().dict()
+        raw = self.generate_content(
+            prompt, priority=priority, task=task, response_model=response_model
+        )
+        return parse_model(raw, response_model)
 
 
 gemini_client = GeminiClient()
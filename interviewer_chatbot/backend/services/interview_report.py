@@ -0,0 +1,210 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from config.settings import settings
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+MARKDOWN, JSON = "markdown", "json"
+MEDIA_TYPES = {
+    MARKDOWN: "text/markdown; charset=utf-8",
+    JSON: "application/json",
+}
+
+QUESTION_STYLES = {
+    "broad_followup": "Broad, follow-up",
+    "narrow_followup": "Narrow, follow-up",
+    "broad_nonfollowup": "Broad, non-follow-up",
+    "narrow_nonfollowup": "Narrow, non-follow-up",
+}
+
+ReportKey = Tuple[str, Optional[str]]
+
+
+def build_report(state: Mapping[str, Any], created_at: Optional[str] = None) -> Dict:
+    """
+    The report of a finished interview as plain data.
+
+    Args:
+        state (Mapping[str, Any]): Checkpointed interview state.
+        created_at (Optional[str]): Timestamp of the checkpoint it was read from.
+
+    Returns:
+        Dict: Topic, question style, one entry per answered question with
+        its feedback, and the final evaluation.
+    """
+    questions = state.get("questions", [])
+    answers = state.get("answers", [])
+    feedback_list = state.get("feedback", [])
+    turns = []
+    for i, (question, answer) in enumerate(zip(questions, answers)):
+        fb = feedback_list[i] if i < len(feedback_list) else {}
+        turns.append(
+            {
+                "question": question,
+                "answer": answer,
+                "question_feedback": fb.get("question_feedback", {}),
+                "answer_feedback": fb.get("answer_feedback", {}),
+            }
+        )
+    return {
+        "topic": state.get("topic", ""),
+        "question_type": state.get("question_type", ""),
+        "completed_at": created_at,
+        "turns": turns,
+        "final_evaluation": state.get("final_evaluation") or {},
+    }
+
+
+def _feedback_markdown(turn: Dict) -> str:
+    qf = turn.get("question_feedback") or {}
+    af = turn.get("answer_feedback") or {}
+    text = f"**Question Rating:** {qf.get('rating', 'N/A')}\n"
+    qf_dict = qf.get("feedback", {})
+    if isinstance(qf_dict, dict):
+        for k, v in qf_dict.items():
+            text += f"- **{k.title()}**: {v}\n"
+    else:
+        text += f"{qf_dict}\n"
+    text += "\n"
+    text += f"**Your Answer Rating:** {af.get('rating', 'N/A')}\n"
+    text += f"{af.get('feedback', 'No feedback')}\n\n"
+    return text
+
+
+def render_markdown(report: Dict) -> str:
+    """
+    Render a report from ``build_report`` as the Markdown shown and
+    downloaded by the frontend.
+    """
+    style = QUESTION_STYLES.get(report["question_type"], report["question_type"])
+    text = "# Final Interview Report\n\n"
+    text += f"**Position:** {report['topic']}\n"
+    text += f"**Question Style:** {style or 'N/A'}\n"
+    if report["completed_at"]:
+        text += f"**Date:** {report['completed_at'][:10]}\n"
+    text += "\n---\n\n"
+
+    text += "## Interview Transcript & Feedback\n\n"
+    for i, turn in enumerate(report["turns"], 1):
+        text += f"### Question {i}\n"
+        text += f"**Q:** {turn['question']}\n\n"
+        text += f"**A:** {turn['answer']}\n\n"
+        text += _feedback_markdown(turn)
+        text += "---\n\n"
+
+    final = report["final_evaluation"]
+    text += "## Final Evaluation\n\n"
+    if final.get("fallback"):
+        text += "_The evaluation could not be generated; these are default values._\n\n"
+    text += f"**Overall Quality:** {final.get('overall_quality', 'N/A')}\n\n"
+    text += "**Strengths:**\n"
+    for s in final.get("strengths", []):
+        text += f"- {s}\n"
+    text += "\n"
+    text += "**Areas for Improvement:**\n"
+    for a in final.get("areas_for_improvement", []):
+        text += f"- {a}\n"
+    text += "\n"
+    text += f"**Recommendation:** {final.get('recommendation', 'N/A')}\n\n"
+    text += f"**Final Feedback:**\n\n{final.get('final_feedback', 'N/A')}\n"
+    return text
+
+
+class RenderedReport:
+    """
+    Both representations of one report, encoded once, with their ETags.
+    """
+
+    __slots__ = ("bodies", "etags")
+
+    def __init__(self, report: Dict):
+        self.bodies = {
+            JSON: json.dumps(report, ensure_ascii=False, default=str).encode(),
+            MARKDOWN: render_markdown(report).encode(),
+        }
+        self.etags = {
+            fmt: '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+            for fmt, body in self.bodies.items()
+        }
+
+
+class ReportCache:
+    """
+    Rendered reports keyed by (thread id, checkpoint id), least recently
+    used first out.
+
+    A report is rendered the first time its checkpoint is asked for; later
+    views and downloads of the same checkpoint reuse the bytes and ETag. A
+    new checkpoint on the thread is a new key, so a stale report is never
+    served.
+    """
+
+    def __init__(self, max_entries: int = settings.report_cache_size):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[ReportKey, RenderedReport]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(
+        self, thread_id: str, checkpoint_id: Optional[str]
+    ) -> Optional[RenderedReport]:
+        """
+        The rendered report of a checkpoint if it is cached; never renders.
+        """
+        with self._lock:
+            return self._entries.get((thread_id, checkpoint_id))
+
+    def get(
+        self,
+        thread_id: str,
+        checkpoint_id: Optional[str],
+        state: Mapping[str, Any],
+        created_at: Optional[str] = None,
+    ) -> RenderedReport:
+        key = (thread_id, checkpoint_id)
+        with self._lock:
+            rendered = self._entries.get(key)
+            if rendered is not None:
+                self._entries.move_to_end(key)
+        if rendered is not None:
+            metrics.counter("interview_report_cache_total", result="hit").inc()
+            return rendered
+
+        metrics.counter("interview_report_cache_total", result="miss").inc()
+        rendered = RenderedReport(build_report(state, created_at))
+        if checkpoint_id is None or self.max_entries <= 0:
+            return rendered
+        with self._lock:
+            self._entries[key] = rendered
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rendered
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches ``etag`` (weak comparison, as
+    RFC 9110 requires for If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+interview_reports = ReportCache()
@@ -0,0 +1,189 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.settings import settings
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# Keeps technology names intact: "c++", "c#", "node.js", "scikit-learn".
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing done
+    down during each few for from further had has have having he her here hers
+    him his how i if in into is it its itself just let like me more most my no
+    nor not now of off on once only or other our out over own really same she
+    should so some such than that the their them then there these they this
+    those through to too under until up use used using very was we well were
+    what when where which while who whom why will with would yes you your
+    """.split())
+
+RETRIEVE, SEARCH, AMBIGUOUS = "retrieve", "search", "ambiguous"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase ``text`` and split it into index terms, dropping stopwords.
+    """
+    return [
+        token
+        for token in TOKEN_PATTERN.findall((text or "").lower())
+        if token not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 inverted index over a small set of chunks (one CV).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: List[int] = []
+        self._avg_length = 0.0
+        # Ingest id of the collection the index was built from.
+        self.version: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add_documents(self, texts: Iterable[str], ids: Iterable[str]) -> None:
+        for doc_id, text in zip(ids, texts):
+            position = len(self.ids)
+            terms = tokenize(text)
+            self.ids.append(doc_id)
+            self.texts.append(text)
+            self._lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                self._postings.setdefault(term, {})[position] = count
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self.ids else 0.0
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self.ids) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Rank chunks for ``query``.
+
+        Returns:
+            List[Tuple[int, float]]: Up to ``k`` (chunk position, score) pairs,
+            best first; chunks sharing no term with the query are left out.
+        """
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for position, tf in postings.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self._lengths[position] / self._avg_length
+                )
+                scores[position] = scores.get(position, 0.0) + idf * tf * (
+                    self.k1 + 1
+                ) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def coverage(self, query: str) -> Tuple[int, float]:
+        """
+        How much of the query vocabulary the CV contains.
+
+        Returns:
+            Tuple[int, float]: Number of distinct query terms found in the index
+            and that number as a fraction of all distinct query terms.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return 0, 0.0
+        matched = sum(1 for term in terms if term in self._postings)
+        return matched, matched / len(terms)
+
+    def classify(
+        self,
+        query: str,
+        min_terms: int = settings.lexical_min_terms,
+        min_coverage: float = settings.lexical_min_coverage,
+    ) -> Tuple[str, float]:
+        """
+        Decide retrieval lexically when the answer is clear-cut.
+
+        Returns:
+            Tuple[str, float]: RETRIEVE when enough query terms appear in the
+            CV, SEARCH when none do, otherwise AMBIGUOUS; plus the coverage.
+        """
+        matched, coverage = self.coverage(query)
+        if matched == 0:
+            return SEARCH, coverage
+        if matched >= min_terms and coverage >= min_coverage:
+            return RETRIEVE, coverage
+        return AMBIGUOUS, coverage
+
+
+class LexicalIndexStore:
+    """
+    Per-user BM25 indexes, built when the CV is ingested.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, BM25Index] = {}
+        self._lock = threading.Lock()
+
+    def build(
+        self,
+        user_id: str,
+        texts: List[str],
+        ids: List[str],
+        version: Optional[str] = None,
+    ) -> BM25Index:
+        index = BM25Index()
+        index.version = version
+        index.add_documents(texts, ids)
+        with self._lock:
+            self._indexes[user_id] = index
+        logger.info("Built lexical index for '%s' (%d chunks)", user_id, len(index))
+        return index
+
+    def get(self, user_id: str) -> Optional[BM25Index]:
+        return self._indexes.get(user_id)
+
+    def drop(self, user_id: str) -> None:
+        with self._lock:
+            self._indexes.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+def record_decision(path: str) -> None:
+    """
+    Count a retrieval decision by the path that made it and update the share
+    of decisions that skipped the embedding call.
+
+    Args:
+        path (str): "lexical_retrieve", "lexical_search" or "embedding".
+    """
+    metrics.counter("retrieval_decisions_total", path=path).inc()
+    total = avoided = 0.0
+    for name in ("lexical_retrieve", "lexical_search", "embedding"):
+        count = metrics.counter("retrieval_decisions_total", path=name).value
+        total += count
+        if name != "embedding":
+            avoided += count
+    metrics.gauge("retrieval_embedding_avoided_ratio").set(
+        round(avoided / total, 4) if total else 0.0
+    )
+
+
+lexical_indexes = LexicalIndexStore()
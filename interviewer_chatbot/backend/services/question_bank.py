@@ -0,0 +1,233 @@
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from config.prompts import get_opening_questions_prompt
+from config.settings import settings
+from models.question_plan import QuestionPlan
+from services.gemini_client import TASK_SETUP_QUESTION, gemini_client
+from services.lexical_index import tokenize
+from services.rate_limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from utils.lazy import LazyResource
+from utils.logger import setup_logger
+from utils.metrics import metrics
+from utils.single_flight import SingleFlight
+
+logger = setup_logger(__name__)
+
+BankKey = Tuple[str, str]
+
+# Bank fills get their own threads: the callers waiting on a fill already
+# hold blocking-pool threads, so a fill must not queue behind them.
+_executor = LazyResource(
+    "question bank pool",
+    lambda: ThreadPoolExecutor(max_workers=2, thread_name_prefix="question-bank"),
+    closer=lambda pool: pool.shutdown(wait=False, cancel_futures=True),
+)
+
+
+def bank_key(topic: str, question_type: str) -> BankKey:
+    """
+    Normalize a job title so "Senior Python Developer " and "senior
+    python developer" share one bank.
+    """
+    return " ".join(tokenize(topic)), (question_type or "").strip().lower()
+
+
+class _BankEntry:
+    __slots__ = ("topic", "questions", "refreshed_at")
+
+    def __init__(self, topic: str, questions: List[str]):
+        self.topic = topic
+        self.questions = questions
+        self.refreshed_at = time.monotonic()
+
+
+class QuestionBank:
+    """
+    Pre-generated opening questions per (normalized topic, question type).
+
+    ``setup_node`` samples a banked question instead of calling Gemini when
+    there is no CV context to tailor the question to. A miss fills the bank
+    with one call whose result every concurrent miss on that key shares.
+    Configured topics are warmed at startup, and every bank is regenerated
+    at background priority once per refresh interval. Keys beyond
+    ``max_keys`` are evicted least recently used first.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.question_bank_size,
+        max_keys: int = settings.question_bank_max_keys,
+        refresh_interval: float = settings.question_bank_refresh_interval,
+    ):
+        self.size = size
+        self.max_keys = max_keys
+        self.refresh_interval = refresh_interval
+        self._entries: "OrderedDict[BankKey, _BankEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight("question_bank")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sample(self, topic: str, question_type: str) -> Optional[str]:
+        """
+        A random banked opening question, or None if the key has no bank.
+        """
+        key = bank_key(topic, question_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return random.choice(entry.questions)
+
+    def _store(self, key: BankKey, topic: str, questions: List[str]) -> None:
+        with self._lock:
+            self._entries[key] = _BankEntry(topic, questions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        metrics.gauge("question_bank_keys").set(len(self._entries))
+
+    def _generate(self, topic: str, question_type: str, priority: int) -> List[str]:
+        plan = gemini_client.generate_structured(
+            get_opening_questions_prompt(topic, question_type, self.size),
+            QuestionPlan,
+            priority=priority,
+            task=TASK_SETUP_QUESTION,
+        )
+        return [q.strip() for q in plan.questions if q.strip()] if plan else []
+
+    async def fill(
+        self, topic: str, question_type: str, priority: int = PRIORITY_BACKGROUND
+    ) -> bool:
+        """
+        Generate the bank for a key, sharing the call with concurrent fills
+        of the same key.
+
+        Returns:
+            bool: Whether the key now has a bank.
+        """
+        key = bank_key(topic, question_type)
+
+        async def generate() -> bool:
+            loop = asyncio.get_running_loop()
+            questions = await loop.run_in_executor(
+                _executor.get(), self._generate, topic, question_type, priority
+            )
+            if not questions:
+                logger.warning("Question bank for %s came back empty", key)
+                return False
+            self._store(key, topic, questions)
+            logger.info("Banked %d opening questions for %s", len(questions), key)
+            return True
+
+        return await self._flights.do(key, generate)
+
+    def opening_question(
+        self,
+        topic: str,
+        question_type: str,
+        wait: float = settings.question_bank_wait,
+    ) -> Optional[str]:
+        """
+        Sample an opening question from a worker thread, filling the bank on
+        a miss.
+
+        Returns None (the caller then generates the question itself) when the
+        bank is disabled, not running on an event loop, or the fill failed
+        or took longer than ``wait`` seconds.
+        """
+        question = self.sample(topic, question_type)
+        if question is not None:
+            metrics.counter("question_bank_requests_total", result="hit").inc()
+            return question
+
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            metrics.counter("question_bank_requests_total", result="bypass").inc()
+            return None
+        metrics.counter("question_bank_requests_total", result="miss").inc()
+        future = asyncio.run_coroutine_threadsafe(
+            self.fill(topic, question_type, PRIORITY_INTERACTIVE), loop
+        )
+        try:
+            future.result(timeout=wait)
+        except Exception as e:
+            logger.warning("Question bank fill for '%s' failed: %s", topic, e)
+            return None
+        return self.sample(topic, question_type)
+
+    async def refresh(self, older_than: Optional[float] = None) -> int:
+        """
+        Regenerate banks last refreshed more than ``older_than`` seconds ago;
+        a bank whose refresh fails keeps its questions.
+
+        Returns:
+            int: Banks refreshed.
+        """
+        older_than = self.refresh_interval if older_than is None else older_than
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                (entry.topic, key[1])
+                for key, entry in self._entries.items()
+                if now - entry.refreshed_at >= older_than
+            ]
+        refreshed = 0
+        for topic, question_type in due:
+            try:
+                refreshed += await self.fill(topic, question_type)
+            except Exception as e:
+                logger.warning("Refreshing question bank '%s' failed: %s", topic, e)
+        metrics.counter("question_bank_refreshes_total").inc(refreshed)
+        return refreshed
+
+    async def warm(self) -> None:
+        """
+        Fill the banks of QUESTION_BANK_TOPICS x QUESTION_BANK_TYPES.
+        """
+        for topic in settings.question_bank_topics:
+            for question_type in settings.question_bank_types:
+                try:
+                    await self.fill(topic, question_type)
+                except Exception as e:
+                    logger.warning("Warming question bank '%s' failed: %s", topic, e)
+
+    def start(self) -> None:
+        """
+        Bind the bank to the running loop, warm it and schedule refreshes.
+        """
+        self._loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        await self.warm()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("Question bank refresh failed: %s", e, exc_info=True)
+
+
+question_bank = QuestionBank()
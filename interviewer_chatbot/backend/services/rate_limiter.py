@@ -0,0 +1,289 @@
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config.settings import settings
+from utils.lazy import LazyResource, register_after_fork
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a caller waited longer than its timeout for capacity."""
+
+
+def estimate_tokens(prompt: str, expected_output_tokens: int = 512) -> int:
+    """
+    Rough token estimate for a Gemini call (about 4 characters per token).
+    """
+    return len(prompt) // 4 + expected_output_tokens
+
+
+class LocalBucketStore:
+    """
+    Requests-per-minute and tokens-per-minute buckets held in process memory.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.capacity = {
+            "requests": float(requests_per_minute),
+            "tokens": float(tokens_per_minute),
+        }
+        self._levels = dict(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        for name, capacity in self.capacity.items():
+            self._levels[name] = min(
+                capacity, self._levels[name] + elapsed * capacity / 60
+            )
+
+    def try_consume(self, tokens: float) -> float:
+        """
+        Take one request and ``tokens`` tokens if both buckets allow it.
+
+        Returns:
+            float: 0.0 if consumed, otherwise seconds until enough capacity refills.
+        """
+        wanted = {"requests": 1.0, "tokens": float(tokens)}
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = _wait_time(self._levels, self.capacity, wanted)
+            if wait == 0.0:
+                for name, amount in wanted.items():
+                    self._levels[name] -= amount
+            return wait
+
+    def adjust_tokens(self, delta: float) -> None:
+        """
+        Debit (positive) or refund (negative) tokens once actual usage is known.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._levels["tokens"] = min(
+                self.capacity["tokens"], self._levels["tokens"] - delta
+            )
+
+
+class SqliteBucketStore:
+    """
+    Buckets stored in a SQLite file so every worker process on the host
+    shares the same budget.
+    """
+
+    def __init__(self, path: str, requests_per_minute: int, tokens_per_minute: int):
+        self.path = path
+        self.capacity = {
+            "requests": float(requests_per_minute),
+            "tokens": float(tokens_per_minute),
+        }
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            now = time.time()
+            conn.executemany(
+                "INSERT OR IGNORE INTO rate_limit_buckets (name, level, updated_at) "
+                "VALUES (?, ?, ?)",
+                [(name, capacity, now) for name, capacity in self.capacity.items()],
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def _update(self, wanted: Dict[str, float], force: bool) -> float:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            levels = {}
+            for name, level, updated_at in conn.execute(
+                "SELECT name, level, updated_at FROM rate_limit_buckets"
+            ):
+                capacity = self.capacity[name]
+                levels[name] = min(capacity, level + (now - updated_at) * capacity / 60)
+
+            wait = 0.0 if force else _wait_time(levels, self.capacity, wanted)
+            if wait == 0.0:
+                for name, amount in wanted.items():
+                    levels[name] = min(self.capacity[name], levels[name] - amount)
+            conn.executemany(
+                "UPDATE rate_limit_buckets SET level = ?, updated_at = ? WHERE name = ?",
+                [(level, now, name) for name, level in levels.items()],
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def try_consume(self, tokens: float) -> float:
+        return self._update({"requests": 1.0, "tokens": float(tokens)}, force=False)
+
+    def adjust_tokens(self, delta: float) -> None:
+        self._update({"tokens": float(delta)}, force=True)
+
+
+def _wait_time(
+    levels: Dict[str, float], capacity: Dict[str, float], wanted: Dict[str, float]
+) -> float:
+    wait = 0.0
+    for name, amount in wanted.items():
+        missing = amount - levels[name]
+        if missing > 0:
+            wait = max(wait, missing * 60 / capacity[name])
+    return wait
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for Gemini with a priority queue in front of it.
+
+    Callers wait in a heap ordered by (priority, arrival); only the head of
+    the queue may consume capacity, so interactive question generation is
+    always served before queued end-of-interview evaluations.
+    """
+
+    def __init__(self, store_factory, name: str = "gemini"):
+        """
+        Args:
+            store_factory: Builds the bucket store on first use.
+            name (str): Limiter name used in logs and metrics.
+        """
+        self._store = LazyResource(f"{name} rate limiter store", store_factory)
+        self.name = name
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def reset_after_fork(self) -> None:
+        """
+        Drop waiters inherited from the parent; their threads do not exist
+        in a forked child and would block the head of the queue forever.
+        """
+        self._waiters = []
+        self._cond = threading.Condition()
+
+    @property
+    def store(self):
+        return self._store.get()
+
+    def _depth_gauge(self, priority: int):
+        return metrics.gauge(
+            "rate_limiter_queue_depth",
+            limiter=self.name,
+            priority=PRIORITY_NAMES.get(priority, str(priority)),
+        )
+
+    def acquire(
+        self,
+        tokens: int,
+        priority: int = PRIORITY_INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """
+        Block until one request and ``tokens`` tokens are available.
+
+        Args:
+            tokens (int): Estimated tokens for the call.
+            priority (int): Lower values are served first.
+            timeout (Optional[float]): Maximum seconds to wait.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            RateLimitTimeout: If the timeout expires first.
+        """
+        tokens = min(tokens, self.store.capacity["tokens"])
+        entry: Tuple[int, int] = (priority, next(self._sequence))
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        depth = self._depth_gauge(priority)
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            depth.inc()
+            try:
+                while True:
+                    remaining = (
+                        None if deadline is None else deadline - time.monotonic()
+                    )
+                    if remaining is not None and remaining <= 0:
+                        raise RateLimitTimeout(
+                            f"Waited {timeout}s for {self.name} rate limit capacity"
+                        )
+                    if self._waiters[0] == entry:
+                        wait = self.store.try_consume(tokens)
+                        if wait == 0.0:
+                            break
+                    else:
+                        wait = None
+                    if remaining is not None:
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                depth.dec()
+                self._cond.notify_all()
+
+        waited = time.monotonic() - started
+        metrics.histogram(
+            "rate_limiter_wait_seconds",
+            limiter=self.name,
+            priority=PRIORITY_NAMES.get(priority, str(priority)),
+        ).observe(waited)
+        if waited > 1:
+            logger.info("Waited %.2fs for %s rate limit capacity", waited, self.name)
+        return waited
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """
+        Correct the token bucket once the real usage of a call is known.
+        """
+        if actual_tokens is None:
+            return
+        delta = actual_tokens - min(estimated_tokens, self.store.capacity["tokens"])
+        if delta:
+            self.store.adjust_tokens(delta)
+            if delta < 0:
+                with self._cond:
+                    self._cond.notify_all()
+
+
+def _create_store():
+    if settings.rate_limit_backend == "sqlite":
+        logger.info(
+            "Using shared SQLite rate limiter at '%s'", settings.rate_limit_db_path
+        )
+        return SqliteBucketStore(
+            settings.rate_limit_db_path, settings.gemini_rpm, settings.gemini_tpm
+        )
+    return LocalBucketStore(settings.gemini_rpm, settings.gemini_tpm)
+
+
+gemini_rate_limiter = RateLimiter(_create_store)
+register_after_fork(gemini_rate_limiter.reset_after_fork)
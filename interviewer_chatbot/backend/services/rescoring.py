@@ -0,0 +1,286 @@
+"""
+Offline re-scoring of past interviews with the current evaluation prompts.
+
+Transcripts are read from a JSONL file (one object per line with an ``id``
+or ``thread_id`` plus ``questions`` and ``answers``; ``content``,
+``messages``, ``topic`` and ``question_type`` are used when present) or from
+the stored checkpoints. Each one is scored by evaluate_question_node and
+final_evaluation_node, ignoring any feedback it already has. Results are
+appended to a JSONL file as they finish; a re-run with the same output file
+skips interviews already scored there, so an interrupted job just resumes.
+
+Every Gemini call goes through the shared rate limiter at background
+priority, so a job running next to the API yields to live interviews.
+
+Usage (from the backend directory):
+    python -m services.rescoring --input transcripts.jsonl --output scores.jsonl
+    python -m services.rescoring --from-checkpoints --output scores.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+
+from config.settings import settings
+from utils.concurrency import run_blocking
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+TRANSCRIPT_KEYS = (
+    "questions",
+    "answers",
+    "content",
+    "messages",
+    "topic",
+    "question_type",
+)
+
+# Page size when listing threads from the checkpoint registry.
+CHECKPOINT_PAGE_SIZE = 200
+
+
+def _transcript(transcript_id: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    record = {key: values[key] for key in TRANSCRIPT_KEYS if key in values}
+    record["id"] = str(transcript_id)
+    return record
+
+
+async def iter_jsonl(path: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield transcripts from a JSONL file, skipping (and logging) bad lines.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                values = json.loads(line)
+                transcript_id = values.get("id") or values["thread_id"]
+            except (ValueError, KeyError, AttributeError) as e:
+                logger.warning("Skipping %s:%d: %s", path, line_no, e)
+                continue
+            yield _transcript(transcript_id, values)
+
+
+async def iter_checkpoints(
+    statuses: Iterable[str] = ("completed",),
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield the latest state of every registered thread with one of
+    ``statuses``, paging through the retention registry by thread id.
+
+    Raises:
+        RuntimeError: If the checkpointer keeps no registry (in-memory).
+    """
+    from graph.graph import async_checkpointer
+    from services.checkpoint_retention import retention_store
+
+    store = await retention_store.get()
+    if store is None:
+        raise RuntimeError(
+            "Scoring stored interviews needs the PostgreSQL or SQLite checkpointer"
+        )
+    saver = await async_checkpointer.get()
+    statuses = list(statuses)
+    after = ""
+    while True:
+        thread_ids = await store.list_threads(statuses, after, CHECKPOINT_PAGE_SIZE)
+        for thread_id in thread_ids:
+            found = await saver.aget_tuple(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+            )
+            if found is not None:
+                yield _transcript(thread_id, found.checkpoint["channel_values"])
+        if len(thread_ids) < CHECKPOINT_PAGE_SIZE:
+            return
+        after = thread_ids[-1]
+
+
+def score_transcript(transcript: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Evaluate every turn and the whole interview from scratch.
+
+    Returns:
+        Dict[str, Any]: Per-turn feedback and the final evaluation.
+    """
+    from graph.nodes import evaluate_question_node, final_evaluation_node
+
+    # No thread_id and no turn_feedback: every turn is evaluated inline.
+    state = {key: value for key, value in transcript.items() if key != "id"}
+    state["turn_feedback"] = []
+    state = final_evaluation_node(evaluate_question_node(state))
+    feedback = state.get("feedback") or []
+    return {
+        "feedback": feedback,
+        "final_evaluation": state.get("final_evaluation"),
+        "fallback_turns": sum(
+            1
+            for item in feedback
+            if any(part.get("fallback") for part in item.values())
+        ),
+    }
+
+
+def fallback_error(scores: Dict[str, Any]) -> Optional[str]:
+    """
+    Why ``scores`` from ``score_transcript`` cannot be kept, if any of them
+    are fallback defaults rather than real evaluations (for example during
+    a Gemini outage or while its circuit is open).
+    """
+    reasons = []
+    if scores.get("fallback_turns"):
+        reasons.append(f"{scores['fallback_turns']} turn(s) fell back to defaults")
+    if (scores.get("final_evaluation") or {}).get("fallback"):
+        reasons.append("final evaluation fell back to defaults")
+    return "; ".join(reasons) or None
+
+
+def load_scored_ids(path: str) -> Set[str]:
+    """
+    Ids already scored successfully in an earlier run's output file.
+    """
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interruption; it is scored again.
+                continue
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+async def rescore(
+    transcripts: AsyncIterator[Dict[str, Any]],
+    output_path: str,
+    concurrency: int = settings.rescore_concurrency,
+    progress_every: int = 25,
+) -> Dict[str, float]:
+    """
+    Score ``transcripts`` with at most ``concurrency`` in flight, appending
+    one JSON line per interview to ``output_path`` as each finishes.
+
+    Interviews already scored in ``output_path`` are skipped; failures,
+    including interviews where any score is a fallback default, are
+    written with an ``error`` field and retried by the next run.
+
+    Returns:
+        Dict[str, float]: scored, failed, skipped, elapsed_s and
+        interviews_per_min.
+    """
+    done = load_scored_ids(output_path)
+    stats = {"scored": 0, "failed": 0, "skipped": 0}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    started = time.monotonic()
+
+    def rate() -> float:
+        elapsed = time.monotonic() - started
+        return stats["scored"] * 60 / elapsed if elapsed > 0 else 0.0
+
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        def write(record: Dict[str, Any]) -> None:
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+
+        async def worker() -> None:
+            while True:
+                transcript = await queue.get()
+                if transcript is None:
+                    return
+                record = {"id": transcript["id"], "scored_at": time.time()}
+                try:
+                    record.update(await run_blocking(score_transcript, transcript))
+                    error = fallback_error(record)
+                except Exception as e:
+                    error = str(e)
+                if error is None:
+                    stats["scored"] += 1
+                    result = "scored"
+                else:
+                    logger.warning("Scoring '%s' failed: %s", transcript["id"], error)
+                    record["error"] = error
+                    stats["failed"] += 1
+                    result = "failed"
+                metrics.counter("rescoring_interviews_total", result=result).inc()
+                write(record)
+                if result == "scored" and stats["scored"] % progress_every == 0:
+                    logger.info(
+                        "Scored %d interviews (%.1f/min)", stats["scored"], rate()
+                    )
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            async for transcript in transcripts:
+                if transcript["id"] in done:
+                    stats["skipped"] += 1
+                    continue
+                done.add(transcript["id"])
+                await queue.put(transcript)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    elapsed = time.monotonic() - started
+    summary = {
+        **stats,
+        "elapsed_s": round(elapsed, 1),
+        "interviews_per_min": round(rate(), 2),
+    }
+    logger.info("Re-scoring finished: %s", summary)
+    return summary
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, float]:
+    from utils.lazy import aclose_all_resources
+
+    transcripts = (
+        iter_checkpoints(args.status)
+        if args.from_checkpoints
+        else iter_jsonl(args.input)
+    )
+    try:
+        return await rescore(transcripts, args.output, args.concurrency)
+    finally:
+        await aclose_all_resources()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file of transcripts")
+    source.add_argument(
+        "--from-checkpoints",
+        action="store_true",
+        help="Score interviews stored by the checkpointer",
+    )
+    parser.add_argument(
+        "--status",
+        nargs="+",
+        default=["completed"],
+        help="Registry statuses to score with --from-checkpoints",
+    )
+    parser.add_argument("--output", required=True, help="JSONL file to append to")
+    parser.add_argument("--concurrency", type=int, default=settings.rescore_concurrency)
+    args = parser.parse_args()
+
+    summary = asyncio.run(_main(args))
+    print(json.dumps(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
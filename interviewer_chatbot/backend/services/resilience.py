@@ -0,0 +1,344 @@
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import settings
+from utils.lazy import LazyResource
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Calls run here so a hung socket cannot hold the caller past its deadline.
+# A call takes a slot before it is submitted and gives it back when the call
+# itself returns, so a submitted call always has a thread and an attempt's
+# deadline never includes time spent queueing behind other callers.
+_slots = threading.BoundedSemaphore(settings.resilience_pool_size)
+_executor = LazyResource(
+    "dependency call pool",
+    lambda: ThreadPoolExecutor(
+        max_workers=settings.resilience_pool_size, thread_name_prefix="dependency"
+    ),
+    closer=lambda pool: pool.shutdown(wait=False, cancel_futures=True),
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the dependency while its circuit is open."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a dependency call exceeds its adaptive deadline."""
+
+
+class DependencySaturated(RuntimeError):
+    """
+    Raised when no call slot frees up in time; a local capacity problem, so
+    it does not count against the dependency's circuit.
+    """
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    for candidate in (
+        getattr(error, "code", None),
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def is_dependency_failure(error: Exception) -> bool:
+    """
+    Whether an error says the dependency is unhealthy: a timeout, a
+    transport error, or a 429/5xx response. Errors about the request itself
+    (bad arguments, auth, a malformed prompt) do not.
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError, OSError))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    fail fast for ``reset_timeout`` seconds; then a single probe is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._gauge = metrics.gauge("circuit_state", dependency=name)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("Circuit for %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        self._gauge.set(_STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release_probe(self) -> None:
+        """
+        Give back a half-open probe slot that was granted but never used.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+
+class Dependency:
+    """
+    Resilience policy for one external dependency.
+
+    Each attempt gets a deadline derived from the observed latency
+    distribution (p99 x multiplier, clamped to [min_timeout, max_timeout]),
+    failed attempts are retried with jittered exponential backoff, and a
+    circuit breaker short-circuits calls while the dependency is unhealthy so
+    callers drop straight to their fallbacks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_timeout: float,
+        min_timeout: Optional[float] = None,
+        latency_multiplier: float = 3.0,
+        min_samples: int = 20,
+        retries: int = 2,
+        base_backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        failure_threshold: int = settings.circuit_failure_threshold,
+        reset_timeout: float = settings.circuit_reset_timeout,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout if min_timeout is not None else max_timeout / 10
+        self.latency_multiplier = latency_multiplier
+        self.min_samples = min_samples
+        self.retries = retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.latency = metrics.histogram("dependency_latency_seconds", dependency=name)
+
+    def deadline(self) -> float:
+        """
+        Current per-attempt timeout in seconds.
+        """
+        if self.latency.count < self.min_samples:
+            return self.max_timeout
+        adaptive = self.latency.percentile(99) * self.latency_multiplier
+        return min(self.max_timeout, max(self.min_timeout, adaptive))
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff for the given (1-based) retry.
+        """
+        return random.uniform(
+            0, min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1))
+        )
+
+    def _run(self, fn: Callable[..., Any], timeout: float) -> Tuple[Any, float]:
+        """
+        Run ``fn(timeout)`` on the call pool; returns its result and how
+        long it took. The deadline starts once a call slot is held.
+        """
+        if not _slots.acquire(timeout=timeout):
+            raise DependencySaturated(
+                f"No call slot for {self.name} within {timeout:.1f}s"
+            )
+        context = contextvars.copy_context()
+
+        def run():
+            try:
+                return context.run(fn, timeout)
+            finally:
+                _slots.release()
+
+        started = time.monotonic()
+        try:
+            future = _executor.get().submit(run)
+        except Exception:
+            _slots.release()
+            raise
+        try:
+            return future.result(timeout=timeout), time.monotonic() - started
+        except FutureTimeout:
+            if future.cancel():
+                _slots.release()
+            raise DeadlineExceeded(f"{self.name} call exceeded {timeout:.1f}s deadline")
+
+    def call(
+        self,
+        fn: Callable[[float], Any],
+        retries: Optional[int] = None,
+        before_attempt: Optional[Callable[[], None]] = None,
+        retry_if: Callable[[Exception], bool] = lambda e: True,
+        counts_as_failure: Callable[[Exception], bool] = is_dependency_failure,
+    ) -> Any:
+        """
+        Call ``fn(timeout)`` under this dependency's policy.
+
+        Args:
+            fn (Callable[[float], Any]): The call; receives the attempt deadline
+                so it can also pass it to the client's native timeout.
+            retries (Optional[int]): Override the number of retries.
+            before_attempt (Optional[Callable[[], None]]): Runs before each
+                attempt, outside the deadline (e.g. rate limiting).
+            retry_if (Callable[[Exception], bool]): Whether an error is retryable.
+            counts_as_failure (Callable[[Exception], bool]): Whether an error
+                counts against the circuit breaker; by default only
+                timeouts, transport errors and 429/5xx responses do.
+
+        Returns:
+            Any: Whatever ``fn`` returns.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            Exception: The last error once retries are exhausted.
+        """
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries + 1):
+            if not self.breaker.allow():
+                metrics.counter(
+                    "dependency_short_circuits_total", dependency=self.name
+                ).inc()
+                raise CircuitOpenError(f"{self.name} circuit is open")
+
+            if before_attempt is not None:
+                try:
+                    before_attempt()
+                except Exception:
+                    self.breaker.release_probe()
+                    raise
+
+            try:
+                result, elapsed = self._run(fn, self.deadline())
+            except DependencySaturated:
+                self.breaker.release_probe()
+                metrics.counter(
+                    "dependency_saturated_total", dependency=self.name
+                ).inc()
+                raise
+            except Exception as e:
+                if counts_as_failure(e):
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.release_probe()
+                metrics.counter(
+                    "dependency_failures_total",
+                    dependency=self.name,
+                    reason=type(e).__name__,
+                ).inc()
+                if attempt >= retries or not retry_if(e):
+                    raise
+                delay = self.backoff(attempt + 1)
+                logger.warning(
+                    "%s attempt %d/%d failed (%s); retrying in %.2fs",
+                    self.name,
+                    attempt + 1,
+                    retries + 1,
+                    type(e).__name__,
+                    delay,
+                )
+                time.sleep(delay)
+            else:
+                self.latency.observe(elapsed)
+                self.breaker.record_success()
+                return result
+
+
+dependencies: Dict[str, Dependency] = {
+    "gemini": Dependency("gemini", max_timeout=settings.gemini_timeout),
+    "embeddings": Dependency("embeddings", max_timeout=settings.embedding_timeout),
+    "chroma": Dependency("chroma", max_timeout=settings.chroma_timeout),
+    "tavily": Dependency("tavily", max_timeout=settings.tavily_timeout, retries=1),
+}
+
+
+_routes_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_dependency(name: str, route: Optional[str] = None) -> Dependency:
+    """
+    The policy for ``name``.
+
+    With ``route`` (``"<model>:<task>"``) the call gets a policy of its own,
+    created on first use from the ``name`` policy's settings. It keeps its
+    own latency histogram and deadline, so quick calls never set the
+    deadline of long ones, and shares one circuit breaker with every other
+    route on the same model.
+    """
+    if route is None:
+        return dependencies[name]
+    key = f"{name}:{route}"
+    dependency = dependencies.get(key)
+    if dependency is not None:
+        return dependency
+    with _routes_lock:
+        if key not in dependencies:
+            base = dependencies[name]
+            breaker_name = f"{name}:{route.split(':', 1)[0]}"
+            if breaker_name not in _breakers:
+                _breakers[breaker_name] = CircuitBreaker(
+                    breaker_name,
+                    base.breaker.failure_threshold,
+                    base.breaker.reset_timeout,
+                )
+            dependencies[key] = Dependency(
+                key,
+                max_timeout=base.max_timeout,
+                min_timeout=base.min_timeout,
+                latency_multiplier=base.latency_multiplier,
+                min_samples=base.min_samples,
+                retries=base.retries,
+                base_backoff=base.base_backoff,
+                max_backoff=base.max_backoff,
+                breaker=_breakers[breaker_name],
+            )
+        return dependencies[key]
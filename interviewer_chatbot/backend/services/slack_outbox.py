@@ -0,0 +1,368 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Slack rejects message text longer than ~40k characters.
+MAX_MESSAGE_CHARS = 39000
+BATCH_SEPARATOR = "\n\n" + "—" * 20 + "\n\n"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slack_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    webhook_url TEXT NOT NULL,
+    text TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_slack_outbox_due ON slack_outbox (next_attempt_at);
+CREATE TABLE IF NOT EXISTS slack_outbox_dead_letter (
+    id INTEGER PRIMARY KEY,
+    webhook_url TEXT NOT NULL,
+    text TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    failed_at REAL NOT NULL
+);
+"""
+
+
+class SlackOutbox:
+    """
+    Durable outbox for Slack webhook messages backed by a SQLite table.
+
+    Graph nodes only enqueue (a local insert); a background OutboxWorker
+    delivers messages in batches with timeouts, exponential backoff and a
+    dead-letter table for messages that keep failing.
+    """
+
+    def __init__(
+        self,
+        db_path: str = settings.outbox_db_path,
+        timeout: float = settings.slack_timeout,
+        batch_size: int = settings.outbox_batch_size,
+        max_attempts: int = settings.outbox_max_attempts,
+        base_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        lease_seconds: float = 60.0,
+        session=None,
+    ):
+        """
+        Args:
+            db_path (str): SQLite file holding the outbox tables.
+            timeout (float): Per-request timeout for the webhook POST, in seconds.
+            batch_size (int): Maximum messages claimed per drain.
+            max_attempts (int): Attempts before a message is dead-lettered.
+            base_backoff (float): First retry delay, doubled on each attempt.
+            max_backoff (float): Upper bound for the retry delay.
+            lease_seconds (float): How long a claimed message is hidden from
+                other workers before it can be claimed again.
+            session: Optional requests.Session used for delivery.
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self._session = session
+        self._schema_ready = False
+        self._wakeup = threading.Event()
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def enqueue(self, webhook_url: str, text: str) -> int:
+        """
+        Store a message for delivery and wake the worker.
+
+        Args:
+            webhook_url (str): Slack incoming-webhook URL.
+            text (str): Message text.
+
+        Returns:
+            int: Outbox row id.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "INSERT INTO slack_outbox (webhook_url, text, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (webhook_url, text, now, now),
+            )
+            row_id = cursor.lastrowid
+        finally:
+            conn.close()
+        self._wakeup.set()
+        logger.info("Queued Slack message %d (%d chars)", row_id, len(text))
+        return row_id
+
+    def _claim(self, conn: sqlite3.Connection) -> List[Dict]:
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT id, webhook_url, text, attempts, created_at FROM slack_outbox "
+                "WHERE next_attempt_at <= ? AND claimed_until <= ? ORDER BY id LIMIT ?",
+                (now, now, self.batch_size),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE slack_outbox SET claimed_until = ? WHERE id = ?",
+                [(now + self.lease_seconds, row[0]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [
+            {
+                "id": row[0],
+                "webhook_url": row[1],
+                "text": row[2],
+                "attempts": row[3],
+                "created_at": row[4],
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _group(messages: List[Dict]) -> List[List[Dict]]:
+        """
+        Merge messages for the same webhook into as few posts as Slack allows.
+        """
+        groups: List[List[Dict]] = []
+        open_group: Dict[str, List[Dict]] = {}
+        sizes: Dict[str, int] = {}
+        for message in messages:
+            url = message["webhook_url"]
+            size = len(message["text"]) + len(BATCH_SEPARATOR)
+            if url not in open_group or sizes[url] + size > MAX_MESSAGE_CHARS:
+                open_group[url] = []
+                sizes[url] = 0
+                groups.append(open_group[url])
+            open_group[url].append(message)
+            sizes[url] += size
+        return groups
+
+    def _post(self, webhook_url: str, text: str) -> Optional[float]:
+        """
+        Deliver one payload.
+
+        Returns:
+            Optional[float]: None on success, otherwise the Retry-After delay
+            requested by Slack (0 when none was given).
+
+        Raises:
+            RuntimeError: If Slack answers with a non-success status.
+        """
+        response = self.session.post(
+            webhook_url,
+            data=json.dumps({"text": text}),
+            headers={"Content-Type": "application/json"},
+            timeout=self.timeout,
+        )
+        if 200 <= response.status_code < 300:
+            return None
+        if response.status_code == 429:
+            return float(response.headers.get("Retry-After", 0) or 0)
+        raise RuntimeError(
+            f"Slack returned {response.status_code}: {response.text[:200]}"
+        )
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+        return random.uniform(delay / 2, delay)
+
+    def _mark_failed(
+        self,
+        conn: sqlite3.Connection,
+        messages: List[Dict],
+        error: str,
+    ) -> int:
+        now = time.time()
+        dead = 0
+        conn.execute("BEGIN IMMEDIATE")
+        for message in messages:
+            attempts = message["attempts"] + 1
+            if attempts >= self.max_attempts:
+                conn.execute(
+                    "INSERT OR REPLACE INTO slack_outbox_dead_letter "
+                    "(id, webhook_url, text, attempts, last_error, created_at, failed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        message["id"],
+                        message["webhook_url"],
+                        message["text"],
+                        attempts,
+                        error,
+                        message["created_at"],
+                        now,
+                    ),
+                )
+                conn.execute("DELETE FROM slack_outbox WHERE id = ?", (message["id"],))
+                dead += 1
+            else:
+                delay = self._backoff(attempts)
+                conn.execute(
+                    "UPDATE slack_outbox SET attempts = ?, next_attempt_at = ?, "
+                    "claimed_until = 0, last_error = ? WHERE id = ?",
+                    (attempts, now + delay, error, message["id"]),
+                )
+        conn.execute("COMMIT")
+        return dead
+
+    def _defer(
+        self, conn: sqlite3.Connection, messages: List[Dict], delay: float
+    ) -> None:
+        """
+        Release claimed messages that were throttled or never posted, due
+        again after ``delay`` seconds; no attempt is counted.
+        """
+        conn.executemany(
+            "UPDATE slack_outbox SET next_attempt_at = ?, claimed_until = 0 "
+            "WHERE id = ?",
+            [(time.time() + delay, m["id"]) for m in messages],
+        )
+
+    def drain_once(self) -> Dict[str, int]:
+        """
+        Claim one batch of due messages and try to deliver it.
+
+        A 429 ends the pass: the throttled group and the rest of the batch
+        become due again once the requested Retry-After (at least
+        ``base_backoff``) has passed, without counting an attempt.
+
+        Returns:
+            Dict[str, int]: Counts of sent, retried, dead-lettered and
+            deferred messages.
+        """
+        stats = {"sent": 0, "retried": 0, "dead": 0, "deferred": 0}
+        conn = self._connect()
+        try:
+            groups = self._group(self._claim(conn))
+            for position, group in enumerate(groups):
+                text = BATCH_SEPARATOR.join(m["text"] for m in group)
+                try:
+                    retry_after = self._post(group[0]["webhook_url"], text)
+                    if retry_after is None:
+                        conn.executemany(
+                            "DELETE FROM slack_outbox WHERE id = ?",
+                            [(m["id"],) for m in group],
+                        )
+                        stats["sent"] += len(group)
+                        continue
+                except Exception as e:
+                    error = str(e)[:500]
+                    dead = self._mark_failed(conn, group, error)
+                    stats["dead"] += dead
+                    stats["retried"] += len(group) - dead
+                    logger.warning(
+                        "Slack delivery of %d message(s) failed: %s", len(group), error
+                    )
+                    continue
+
+                # Throttled, not failed: this group and the rest of the batch
+                # wait out Retry-After without using up an attempt.
+                rest = [m for later in groups[position:] for m in later]
+                delay = max(retry_after, self.base_backoff)
+                self._defer(conn, rest, delay)
+                stats["deferred"] += len(rest)
+                logger.warning(
+                    "Slack rate limited; deferring %d message(s) for %.0fs",
+                    len(rest),
+                    delay,
+                )
+                break
+        finally:
+            conn.close()
+
+        if stats["sent"]:
+            logger.info("✅ Delivered %d Slack message(s).", stats["sent"])
+        if stats["dead"]:
+            logger.error("Moved %d Slack message(s) to dead letter.", stats["dead"])
+        return stats
+
+    def pending_count(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM slack_outbox").fetchone()[0]
+        finally:
+            conn.close()
+
+    def wait_for_work(self, timeout: float) -> None:
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+
+class OutboxWorker:
+    """
+    Background thread that drains a SlackOutbox until stopped.
+    """
+
+    def __init__(
+        self, outbox: SlackOutbox, poll_interval: float = settings.outbox_poll_interval
+    ):
+        self.outbox = outbox
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="slack-outbox", daemon=True
+        )
+        self._thread.start()
+        logger.info("Slack outbox worker started")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self.outbox._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                stats = self.outbox.drain_once()
+                if (
+                    stats["sent"] + stats["retried"] + stats["dead"]
+                    >= self.outbox.batch_size
+                ):
+                    continue
+            except Exception as e:
+                logger.error("Slack outbox drain failed: %s", e, exc_info=True)
+            self.outbox.wait_for_work(self.poll_interval)
+
+
+slack_outbox = SlackOutbox()
+outbox_worker = OutboxWorker(slack_outbox)
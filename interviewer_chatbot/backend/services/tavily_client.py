@@ -1,5 +1,6 @@
-from tavily import TavilyClient
 from config.settings import settings
+from services.resilience import get_dependency
+from utils.lazy import LazyResource
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -11,26 +12,52 @@ class TavilyService:
     """
 
     def __init__(self):
-        self.client = TavilyClient(api_key=settings.tavily_api_key)
+        self._client = LazyResource("Tavily client", self._create_client)
+
+    @staticmethod
+    def _create_client():
+        from tavily import TavilyClient
+
+        return TavilyClient(api_key=settings.tavily_api_key)
+
+    @property
+    def client(self):
+        """
+        The Tavily API client, created on first use.
+        """
+        return self._client.get()
 
     def search(self, query: str, top_k: int = 5) -> list[str]:
         """
         Perform a search query using Tavily and return a list of text snippets.
         """
         try:
-            response = self.client.search(query=query, top_k=top_k)
+            response = get_dependency("tavily").call(
+                lambda timeout: self.client.search(
+                    query=query, top_k=top_k, timeout=timeout
+                )
+            )
             results = response.get("results", [])
             snippets = [
                 r.get("snippet") or r.get("content") or r.get("title", "")
                 for r in results
             ][:top_k]
             logger.info(
-                f"Tavily search successful: {len(snippets)} results for query '{query}'"
+                "Tavily search successful: %d results for %d-char query",
+                len(snippets),
+                len(query),
             )
             return snippets
         except Exception as e:
-            logger.error(f"Tavily search failed for query '{query}': {e}")
+            logger.error("Tavily search failed: %s", e)
             return []
 
 
 tavily_service = TavilyService()
+
+
+def get_tavily_client():
+    """
+    Return the shared Tavily API client, creating it on first use.
+    """
+    return tavily_service.client
@@ -0,0 +1,168 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Mapping, Optional
+
+from config.prompts import get_evaluation_prompt
+from config.settings import settings
+from services.gemini_client import (
+    TASK_ITEM_EVALUATION,
+    AnswerFeedback,
+    QuestionFeedback,
+    gemini_client,
+)
+from services.rate_limiter import PRIORITY_BACKGROUND
+from utils.lazy import register_after_fork
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# Used when an evaluation could not be obtained; flagged so reports can tell.
+FALLBACK_FEEDBACK = {"rating": 6, "feedback": "Good effort.", "fallback": True}
+
+
+def evaluate_turn(state: Mapping[str, Any], index: int) -> Dict[str, Dict]:
+    """
+    Rate one question and its answer, using the conversation up to that turn.
+
+    Args:
+        state (Mapping[str, Any]): Interview state containing the turn.
+        index (int): Position of the turn in ``questions``/``answers``.
+
+    Returns:
+        Dict[str, Dict]: {"question_feedback": ..., "answer_feedback": ...}.
+    """
+    questions = state.get("questions", [])[: index + 1]
+    answers = state.get("answers", [])[: index + 1]
+    question, answer = questions[index], answers[index]
+    full_content = "\n".join(state.get("content", []))
+    transcript = "\n".join(f"Q: {q}\nA: {a}" for q, a in zip(questions, answers))
+    messages_text = "\n".join(m.get("content", "") for m in state.get("messages", []))
+
+    try:
+        q_parsed = gemini_client.generate_structured(
+            get_evaluation_prompt(
+                kind="question",
+                full_messages=messages_text,
+                full_content=full_content,
+                transcript=transcript,
+                last_question=question,
+                last_answer=answer,
+            ),
+            QuestionFeedback,
+            priority=PRIORITY_BACKGROUND,
+            task=TASK_ITEM_EVALUATION,
+        )
+
+        a_parsed = gemini_client.generate_structured(
+            get_evaluation_prompt(
+                kind="answer",
+                full_messages=messages_text,
+                full_content=full_content,
+                transcript=transcript,
+                last_question=question,
+                last_answer=answer,
+            ),
+            AnswerFeedback,
+            priority=PRIORITY_BACKGROUND,
+            task=TASK_ITEM_EVALUATION,
+        )
+    except Exception as e:
+        logger.error("Evaluation failed: %s", e)
+        q_parsed = a_parsed = None
+
+    return {
+        "question_feedback": (
+            q_parsed.model_dump() if q_parsed else dict(FALLBACK_FEEDBACK)
+        ),
+        "answer_feedback": (
+            a_parsed.model_dump() if a_parsed else dict(FALLBACK_FEEDBACK)
+        ),
+    }
+
+
+class TurnEvaluator:
+    """
+    Evaluates answers in the background as soon as they are recorded.
+
+    Futures are keyed by (thread_id, turn index). The route persists finished
+    results into the checkpoint; final evaluation picks up whatever is still
+    in flight and computes anything missing (e.g. after a restart) inline.
+    """
+
+    def __init__(self, max_workers: int = settings.eval_workers):
+        self.max_workers = max_workers
+        self.reset_after_fork()
+
+    def reset_after_fork(self) -> None:
+        """
+        Start with a fresh pool and no futures (also used by __init__); a
+        forked child inherits neither the parent's threads nor its results.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="turn-eval"
+        )
+        self._futures: Dict[str, Dict[int, Future]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, thread_id: str, index: int, state: Mapping[str, Any]) -> Future:
+        snapshot = {
+            key: list(state.get(key, []))
+            for key in ("questions", "answers", "content", "messages")
+        }
+        future = self._executor.submit(evaluate_turn, snapshot, index)
+        with self._lock:
+            self._futures.setdefault(thread_id, {})[index] = future
+        metrics.counter("turn_evaluations_total", mode="background").inc()
+        logger.info("Queued background evaluation of turn %d", index + 1)
+        return future
+
+    def pending(self, thread_id: str) -> List[Future]:
+        with self._lock:
+            return list(self._futures.get(thread_id, {}).values())
+
+    def pop_finished(self, thread_id: str) -> Dict[int, Dict[str, Dict]]:
+        """
+        Remove and return the results of every finished evaluation.
+        """
+        finished = {}
+        with self._lock:
+            futures = self._futures.get(thread_id, {})
+            for index, future in list(futures.items()):
+                if future.done():
+                    del futures[index]
+                    finished[index] = future.result()
+            if not futures:
+                self._futures.pop(thread_id, None)
+        return finished
+
+    def collect(
+        self, thread_id: str, index: int, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Dict]]:
+        """
+        Wait for an in-flight evaluation of a turn.
+
+        Returns:
+            Optional[Dict[str, Dict]]: The result, or None if this process has
+            no evaluation for the turn or it did not finish within ``timeout``.
+        """
+        with self._lock:
+            future = self._futures.get(thread_id, {}).pop(index, None)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            logger.warning("Background evaluation of turn %d timed out", index + 1)
+            return None
+
+    def discard(self, thread_id: str) -> None:
+        with self._lock:
+            futures = self._futures.pop(thread_id, {})
+        for future in futures.values():
+            future.cancel()
+
+
+turn_evaluator = TurnEvaluator()
+register_after_fork(turn_evaluator.reset_after_fork)
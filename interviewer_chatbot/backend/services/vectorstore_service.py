@@ -1,23 +1,70 @@
-from chromadb.api.models.Collection import Collection
-import chromadb
-from models.embedding_model import embeddings
-import logging
-from typing import Optional
-from langchain_core.documents import Document
-import os
+from __future__ import annotations
+
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from models.embedding_model import get_embeddings
 from config.settings import settings
+from services.embedding_store import QuantizedEmbeddingStore, embedding_stores
+from services.lexical_index import BM25Index, lexical_indexes
+from services.resilience import get_dependency
+from utils.lazy import LazyResource
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from chromadb.api.models.Collection import Collection
+    from langchain_core.documents import Document
 
-logger = logging.getLogger(__name__)
+logger = setup_logger(__name__)
 
 CHROMA_API_KEY = settings.chroma_api_key
 CHROMA_TENANT = settings.chroma_tenant
 CHROMA_DATABASE = settings.chroma_database
 
-client = chromadb.CloudClient(
-    api_key=CHROMA_API_KEY,
-    tenant=CHROMA_TENANT,
-    database=CHROMA_DATABASE,
-)
+# Collection metadata key naming the ingest its chunks came from. In-process
+# stores remember it, so a store built from an earlier CV can be detected.
+INGEST_ID_KEY = "ingest_id"
+
+
+def _create_chroma_client():
+    import chromadb
+
+    return chromadb.CloudClient(
+        api_key=CHROMA_API_KEY,
+        tenant=CHROMA_TENANT,
+        database=CHROMA_DATABASE,
+    )
+
+
+chroma_client = LazyResource("Chroma Cloud client", _create_chroma_client)
+
+
+def get_chroma_client():
+    """
+    Return the shared Chroma Cloud client, connecting on first use.
+    """
+    return chroma_client.get()
+
+
+def _get_or_create_collection(collection_name: str) -> Collection:
+    return get_dependency("chroma").call(
+        lambda timeout: get_chroma_client().get_or_create_collection(collection_name)
+    )
+
+
+def _ingest_id(collection: Optional[Collection]) -> Optional[str]:
+    metadata = getattr(collection, "metadata", None) or {}
+    return metadata.get(INGEST_ID_KEY)
+
+
+def embed_text(text: str) -> list[float]:
+    """
+    Embed a query or chunk under the "embeddings" resilience policy.
+    """
+    return get_dependency("embeddings").call(
+        lambda timeout: get_embeddings().embed_query(text)
+    )
 
 
 def create_vectorstore(
@@ -28,19 +75,220 @@ def create_vectorstore(
         return None
 
     collection_name = f"interviewer-chatbot-{user_id}"
-    collection = client.get_or_create_collection(collection_name)
+    collection = _get_or_create_collection(collection_name)
 
     doc_texts = [doc.page_content for doc in documents]
-    doc_embeddings = [embeddings.embed_query(text) for text in doc_texts]
+    doc_embeddings = [embed_text(text) for text in doc_texts]
     doc_ids = [f"{user_id}_{i}" for i in range(len(documents))]
 
-    collection.add(ids=doc_ids, documents=doc_texts, embeddings=doc_embeddings)
+    get_dependency("chroma").call(
+        lambda timeout: collection.add(
+            ids=doc_ids, documents=doc_texts, embeddings=doc_embeddings
+        )
+    )
+    # Tagged after the chunks are in, so a store built from a partial add
+    # never carries the new id.
+    ingest_id = uuid.uuid4().hex
+    get_dependency("chroma").call(
+        lambda timeout: collection.modify(metadata={INGEST_ID_KEY: ingest_id})
+    )
+    lexical_indexes.build(user_id, doc_texts, doc_ids, version=ingest_id)
+    if settings.local_dense_search:
+        embedding_stores.build(
+            user_id, doc_embeddings, doc_texts, doc_ids, version=ingest_id
+        )
     return collection
 
 
 def load_vectorstore(user_id: str = "default_user") -> Optional[Collection]:
     collection_name = f"interviewer-chatbot-{user_id}"
-    return client.get_or_create_collection(collection_name)
+    return _get_or_create_collection(collection_name)
+
+
+def query_collection(
+    user_id: str, query_text: str, n_results: int = 3
+) -> Optional[dict]:
+    """
+    Embed ``query_text`` and rank the user's chunks, with deadlines, retries
+    and circuit breaking on the embedding and Chroma calls.
+
+    With LOCAL_DENSE_SEARCH the ranking runs in process on the user's
+    quantized embedding store and only the embedding call leaves the
+    process; the result keeps Chroma's shape, with squared L2 distances
+    between the normalized vectors (Chroma's default space).
+
+    Returns:
+        Optional[dict]: Chroma-style query result ("ids", "documents",
+        "distances"), or None if there is no collection.
+    """
+    if settings.local_dense_search:
+        store = get_embedding_store(user_id)
+        if store is None:
+            return None
+        hits = store.search(embed_text(query_text), n_results)
+        return {
+            "ids": [[store.ids[pos] for pos, _ in hits]],
+            "documents": [[store.texts[pos] for pos, _ in hits]],
+            "distances": [[2.0 - 2.0 * score for _, score in hits]],
+        }
+
+    collection = load_vectorstore(user_id)
+    if not collection:
+        return None
+    query_emb = embed_text(query_text)
+    return get_dependency("chroma").call(
+        lambda timeout: collection.query(
+            query_embeddings=[query_emb], n_results=n_results
+        )
+    )
+
+
+def get_lexical_index(user_id: str = "default_user") -> Optional[BM25Index]:
+    """
+    Return the user's BM25 index, rebuilding it from the stored chunks when
+    this process did not ingest the CV itself (restart or another worker).
+
+    Like the embedding store, the index is versioned by the collection's
+    ingest id; with several workers it is rebuilt when the ids differ.
+
+    Returns:
+        Optional[BM25Index]: The index, or None if the user has no chunks.
+    """
+    index = lexical_indexes.get(user_id)
+    if index is not None and settings.workers <= 1:
+        return index or None
+
+    collection = load_vectorstore(user_id)
+    if index is not None:
+        if index.version == _ingest_id(collection):
+            return index or None
+        metrics.counter("lexical_index_stale_total").inc()
+
+    stored = get_dependency("chroma").call(
+        lambda timeout: collection.get(include=["documents"])
+    )
+    index = lexical_indexes.build(
+        user_id,
+        stored.get("documents") or [],
+        stored.get("ids") or [],
+        version=_ingest_id(collection),
+    )
+    return index or None
+
+
+def get_embedding_store(
+    user_id: str = "default_user",
+) -> Optional[QuantizedEmbeddingStore]:
+    """
+    Return the user's quantized embedding store, rebuilding it from the
+    stored chunks when this process did not ingest the CV itself.
+
+    A single worker sees every ingest and delete, so its store is always
+    current. With several workers another one may have re-ingested or
+    deleted the collection, so the store is only used while its version
+    matches the collection's ingest id, and rebuilt otherwise.
+
+    Returns:
+        Optional[QuantizedEmbeddingStore]: The store, or None if the user
+        has no chunks.
+    """
+    store = embedding_stores.get(user_id)
+    if store is not None and settings.workers <= 1:
+        return store or None
+
+    collection = load_vectorstore(user_id)
+    if store is not None:
+        if store.version == _ingest_id(collection):
+            return store or None
+        metrics.counter("embedding_store_stale_total").inc()
+
+    stored = get_dependency("chroma").call(
+        lambda timeout: collection.get(include=["embeddings", "documents"])
+    )
+    embeddings = stored.get("embeddings")
+    store = embedding_stores.build(
+        user_id,
+        embeddings if embeddings is not None else [],
+        stored.get("documents") or [],
+        stored.get("ids") or [],
+        version=_ingest_id(collection),
+    )
+    return store or None
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = settings.rrf_k
+) -> List[str]:
+    """
+    Fuse several ranked id lists: each id scores sum(1 / (k + rank)).
+
+    Args:
+        rankings (Sequence[Sequence[str]]): Ranked ids, best first, per retriever.
+        k (int): RRF constant; larger values flatten the rank differences.
+
+    Returns:
+        List[str]: Ids ordered by fused score.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def hybrid_search(
+    user_id: str,
+    query_text: str,
+    top_k: int = settings.retrieval_top_k,
+    candidates: int = settings.retrieval_candidates,
+) -> List[str]:
+    """
+    Retrieve CV chunks by fusing BM25 and dense rankings with reciprocal-rank
+    fusion. Exact technology names that embeddings match poorly still rank
+    through the keyword side. Either side alone is used if the other fails.
+
+    Args:
+        user_id (str): Owner of the CV collection.
+        query_text (str): The candidate's answer or topic.
+        top_k (int): Number of fused chunks to return.
+        candidates (int): Depth of each ranking fed into the fusion.
+
+    Returns:
+        List[str]: Up to ``top_k`` chunk texts, best first.
+    """
+    rankings: List[List[str]] = []
+    texts: Dict[str, str] = {}
+
+    try:
+        index = get_lexical_index(user_id)
+        if index is not None:
+            lexical = [
+                index.ids[pos] for pos, _ in index.search(query_text, candidates)
+            ]
+            texts.update(
+                {index.ids[pos]: index.texts[pos] for pos in range(len(index))}
+            )
+            rankings.append(lexical)
+    except Exception as e:
+        logger.warning("Lexical retrieval failed for '%s': %s", user_id, e)
+
+    try:
+        results = query_collection(user_id, query_text, n_results=candidates)
+        if results:
+            ids = results.get("ids", [[]])[0]
+            docs = results.get("documents", [[]])[0]
+            texts.update(zip(ids, docs))
+            rankings.append(list(ids))
+    except Exception as e:
+        logger.warning("Dense retrieval failed for '%s': %s", user_id, e)
+
+    fused = reciprocal_rank_fusion(rankings)[:top_k]
+    logger.info(
+        "Hybrid retrieval fused %d ranking(s) into %d chunk(s)",
+        len(rankings),
+        len(fused),
+    )
+    return [texts[doc_id] for doc_id in fused if texts.get(doc_id)]
 
 
 def delete_vectorstore(user_id: str = "default_user") -> bool:
@@ -55,7 +303,11 @@ def delete_vectorstore(user_id: str = "default_user") -> bool:
     """
     try:
         collection_name = f"interviewer-chatbot-{user_id}"
-        client.delete_collection(collection_name)
+        get_dependency("chroma").call(
+            lambda timeout: get_chroma_client().delete_collection(collection_name)
+        )
+        lexical_indexes.drop(user_id)
+        embedding_stores.drop(user_id)
         logger.info("Deleted Chroma Cloud collection: %s", collection_name)
         return True
     except Exception as e:
@@ -0,0 +1,5 @@
+import os
+
+# config.settings refuses to load without API keys; tests never call them.
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("TAVILY_API_KEY", "test")
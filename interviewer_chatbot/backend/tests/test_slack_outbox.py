@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.slack_outbox import BATCH_SEPARATOR, SlackOutbox
+
+
+class SlackStandIn(ThreadingHTTPServer):
+    """
+    Local stand-in for Slack incoming webhooks. Records every post and
+    answers with the next scripted (status, headers) for its path, or 200.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.posts = []
+        self.replies = {}
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+    def reply(self, path: str, *responses) -> None:
+        self.replies.setdefault(path, []).extend(responses)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.posts.append((self.path, json.loads(body)["text"]))
+        pending = self.server.replies.get(self.path)
+        status, headers = pending.pop(0) if pending else (200, {})
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slack():
+    server = SlackStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_outbox(tmp_path, **kwargs) -> SlackOutbox:
+    kwargs.setdefault("timeout", 5)
+    kwargs.setdefault("batch_size", 50)
+    return SlackOutbox(db_path=str(tmp_path / "outbox.sqlite"), **kwargs)
+
+
+def rows(outbox: SlackOutbox, table: str = "slack_outbox"):
+    conn = sqlite3.connect(outbox.db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(f"SELECT * FROM {table} ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_messages_are_batched_per_webhook(tmp_path, slack):
+    outbox = make_outbox(tmp_path)
+    for text in ("a1", "a2", "a3"):
+        outbox.enqueue(slack.url("/hook-a"), text)
+    for text in ("b1", "b2"):
+        outbox.enqueue(slack.url("/hook-b"), text)
+
+    stats = outbox.drain_once()
+
+    assert stats == {"sent": 5, "retried": 0, "dead": 0, "deferred": 0}
+    assert sorted(slack.posts) == [
+        ("/hook-a", BATCH_SEPARATOR.join(["a1", "a2", "a3"])),
+        ("/hook-b", BATCH_SEPARATOR.join(["b1", "b2"])),
+    ]
+    assert outbox.pending_count() == 0
+
+
+def test_rate_limit_ends_the_pass_until_retry_after(tmp_path, slack):
+    outbox = make_outbox(tmp_path)
+    slack.reply("/hook-a", (429, {"Retry-After": "30"}))
+    outbox.enqueue(slack.url("/hook-a"), "a1")
+    outbox.enqueue(slack.url("/hook-b"), "b1")
+
+    started = time.time()
+    stats = outbox.drain_once()
+
+    assert stats == {"sent": 0, "retried": 0, "dead": 0, "deferred": 2}
+    assert slack.posts == [("/hook-a", "a1")]
+    for row in rows(outbox):
+        assert row["attempts"] == 0
+        assert row["next_attempt_at"] >= started + 30
+        assert row["claimed_until"] == 0
+
+    assert outbox.drain_once()["deferred"] == 0
+    assert len(slack.posts) == 1
+
+
+def test_rate_limited_message_is_never_dead_lettered(tmp_path, slack):
+    outbox = make_outbox(tmp_path, max_attempts=2, base_backoff=0)
+    slack.reply("/hook", *[(429, {"Retry-After": "0"})] * 3)
+    outbox.enqueue(slack.url("/hook"), "hello")
+
+    for _ in range(3):
+        assert outbox.drain_once()["deferred"] == 1
+
+    assert rows(outbox, "slack_outbox_dead_letter") == []
+    assert outbox.drain_once()["sent"] == 1
+
+
+def test_failed_delivery_is_retried_with_backoff(tmp_path, slack):
+    outbox = make_outbox(tmp_path, base_backoff=10)
+    slack.reply("/hook", (500, {}), (500, {}))
+    outbox.enqueue(slack.url("/hook"), "hello")
+
+    started = time.time()
+    assert outbox.drain_once() == {"sent": 0, "retried": 1, "dead": 0, "deferred": 0}
+
+    (row,) = rows(outbox)
+    assert row["attempts"] == 1
+    assert "500" in row["last_error"]
+    # First retry: a jittered delay between half and all of base_backoff.
+    assert started + 5 <= row["next_attempt_at"] <= time.time() + 10
+    assert outbox.drain_once()["retried"] == 0
+
+
+def test_message_is_dead_lettered_after_max_attempts(tmp_path, slack):
+    outbox = make_outbox(tmp_path, max_attempts=3, base_backoff=0)
+    slack.reply("/hook", *[(500, {})] * 3)
+    outbox.enqueue(slack.url("/hook"), "hello")
+
+    results = [outbox.drain_once() for _ in range(3)]
+
+    assert [r["retried"] for r in results] == [1, 1, 0]
+    assert results[-1]["dead"] == 1
+    assert len(slack.posts) == 3
+    assert outbox.pending_count() == 0
+    (dead,) = rows(outbox, "slack_outbox_dead_letter")
+    assert dead["text"] == "hello"
+    assert dead["attempts"] == 3
+    assert "500" in dead["last_error"]
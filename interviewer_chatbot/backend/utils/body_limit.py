@@ -0,0 +1,61 @@
+from typing import Iterable
+
+from fastapi import HTTPException
+
+
+class BodySizeLimit:
+    """
+    ASGI middleware answering 413 to request bodies over ``max_bytes`` on
+    the given paths.
+
+    A declared Content-Length is checked before anything is read. Chunked
+    bodies are counted as they arrive and reading stops once the limit is
+    passed, so an oversized upload is never spooled in full.
+    """
+
+    def __init__(self, app, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside body parsing, which re-raises HTTPException.
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _detail(self) -> str:
+        return f"Request body exceeds the {self.max_bytes}-byte limit"
+
+    async def _reject(self, send) -> None:
+        body = f'{{"detail":"{self._detail()}"}}'.encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
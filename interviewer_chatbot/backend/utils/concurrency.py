@@ -0,0 +1,45 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from config.settings import settings
+from utils.lazy import LazyResource
+
+T = TypeVar("T")
+
+blocking_pool = LazyResource(
+    "blocking thread pool",
+    lambda: ThreadPoolExecutor(
+        max_workers=settings.blocking_pool_size, thread_name_prefix="blocking"
+    ),
+    closer=lambda pool: pool.shutdown(wait=False, cancel_futures=True),
+)
+
+
+def get_blocking_pool() -> ThreadPoolExecutor:
+    """
+    Return the sized pool that runs blocking work (sync SDK calls, PDF
+    parsing) for the async API, created on first use.
+    """
+    return blocking_pool.get()
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run ``fn`` on the blocking pool without holding up the event loop.
+
+    The caller's context variables (request_id, thread_id log context) are
+    carried into the worker thread.
+
+    Args:
+        fn (Callable[..., T]): Blocking callable.
+        *args, **kwargs: Passed to ``fn``.
+
+    Returns:
+        T: Whatever ``fn`` returns.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_blocking_pool(), call)
@@ -1,26 +1,126 @@
-import fitz
-from langchain_core.documents import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import os
+import tempfile
 
+from config.settings import settings
+from utils.concurrency import run_blocking
 
-def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
+PDF_MAGIC = b"%PDF-"
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+class CVRejected(ValueError):
+    """Raised when an uploaded CV is refused before its text is extracted."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def spool_upload(
+    upload,
+    max_bytes: int = settings.cv_max_bytes,
+    chunk_size: int = SPOOL_CHUNK_SIZE,
+) -> str:
+    """
+    Copy an uploaded CV to a temporary file one chunk at a time.
+
+    Reading stops at the first chunk that is not a PDF or that takes the
+    upload over ``max_bytes``, so at most one chunk is held in memory.
+
+    Args:
+        upload (UploadFile): The uploaded file.
+        max_bytes (int): Largest accepted upload.
+        chunk_size (int): Bytes read per chunk.
+
+    Returns:
+        str: Path of the spooled file; the caller removes it.
+
+    Raises:
+        CVRejected: 413 if the upload is too large, 415 if it is not a PDF.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise CVRejected(f"CV exceeds the {max_bytes}-byte limit", 413)
+
+    fd, path = tempfile.mkstemp(prefix="cv-", suffix=".pdf")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await upload.read(chunk_size):
+                if size == 0 and not chunk.startswith(PDF_MAGIC):
+                    raise CVRejected("CV must be a PDF file", 415)
+                size += len(chunk)
+                if size > max_bytes:
+                    raise CVRejected(f"CV exceeds the {max_bytes}-byte limit", 413)
+                await run_blocking(out.write, chunk)
+        if size == 0:
+            raise CVRejected("CV is empty", 415)
+        return path
+    except BaseException:
+        os.unlink(path)
+        raise
+
+
+def _extract_text(doc, max_pages: int) -> str:
+    with doc:
+        if not doc.is_pdf:
+            raise CVRejected("CV must be a PDF file", 415)
+        if doc.page_count > max_pages:
+            raise CVRejected(
+                f"CV has {doc.page_count} pages; the limit is {max_pages}", 413
+            )
+        try:
+            return "".join(page.get_text("text") + "\n" for page in doc)
+        except Exception as e:
+            raise RuntimeError(f"Failed to extract text from PDF: {e}")
+
+
+def extract_text_from_pdf_file(
+    path: str, max_pages: int = settings.cv_max_pages
+) -> str:
+    """
+    Extracts text from a PDF file using PyMuPDF (fitz), reading pages from
+    disk rather than from an in-memory copy of the document.
+
+    Args:
+        path (str): Path of the PDF file.
+        max_pages (int): Largest accepted page count, checked before any
+            page is parsed.
+
+    Returns:
+        str: Extracted plain text from the PDF.
+
+    Raises:
+        CVRejected: If the file is not a readable PDF or has too many pages.
+    """
+    import fitz
+
+    try:
+        doc = fitz.open(path, filetype="pdf")
+    except Exception as e:
+        raise CVRejected(f"CV is not a readable PDF: {e}", 415)
+    return _extract_text(doc, max_pages)
+
+
+def extract_text_from_pdf_bytes(
+    pdf_bytes: bytes, max_pages: int = settings.cv_max_pages
+) -> str:
     """
     Extracts text from PDF bytes using PyMuPDF (fitz).
 
     Args:
         pdf_bytes (bytes): PDF file content in bytes.
+        max_pages (int): Largest accepted page count.
 
     Returns:
         str: Extracted plain text from the PDF.
     """
+    import fitz
+
     try:
         doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text("text") + "\n"
-        return text
     except Exception as e:
-        raise RuntimeError(f"Failed to extract text from PDF: {e}")
+        raise CVRejected(f"CV is not a readable PDF: {e}", 415)
+    return _extract_text(doc, max_pages)
 
 
 def chunk_cv_text(cv_text: str, user_id: str = "default_user") -> list:
@@ -34,6 +134,9 @@ def chunk_cv_text(cv_text: str, user_id: str = "default_user") -> list:
     Returns:
         List[Document]: List of Document objects with chunked CV text.
     """
+    from langchain_core.documents import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
     try:
         chunk_size = 800
         chunk_overlap = 200
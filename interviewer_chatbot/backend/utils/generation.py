@@ -1,11 +1,9 @@
-import logging
 import textwrap
-from typing import Any, Dict
-import json
 from services.gemini_client import gemini_client
 from utils.prompt_template import safe_prompt
+from utils.logger import setup_logger
 
-logger = logging.getLogger(__name__)
+logger = setup_logger(__name__)
 
 
 def safe_text(text: str, max_len: int = 2000) -> str:
@@ -19,42 +17,42 @@ def safe_text(text: str, max_len: int = 2000) -> str:
     return sanitized[:max_len]
 
 
-def _safe_generate(prompt: str, fallback: str, gemini_client=gemini_client) -> str:
-    try:
-        return gemini_client.generate_content(prompt) or fallback
-    except Exception as e:
-        logger.error("Generation failed: %s", e)
-        return fallback
-
-
-def safe_parse_json(response: Any) -> Dict[str, Any]:
-    fallback = {"rating": 6, "feedback": "Good effort. Could elaborate more."}
-
-    if not response:
-        return fallback
+def _stream_writer():
+    """
+    LangGraph's writer for stream_mode="custom" when called from a graph
+    node, else None.
+    """
+    from langgraph.config import get_stream_writer
 
-    if isinstance(response, dict):
-        return response
+    try:
+        return get_stream_writer()
+    except (RuntimeError, KeyError):
+        return None
 
-    text = None
-    if hasattr(response, "text"):
-        text = response.text
-    elif hasattr(response, "content"):
-        text = response.content
-    elif isinstance(response, str):
-        text = response
 
-    if not text:
-        return fallback
+def _safe_generate(
+    prompt: str,
+    fallback: str,
+    gemini_client=gemini_client,
+    task: str = None,
+    stream: bool = False,
+) -> str:
+    """
+    Generate text, returning ``fallback`` on any failure.
 
+    With ``stream``, text chunks are also written to the graph's custom
+    stream as {"delta": text} while they arrive.
+    """
+    writer = _stream_writer() if stream else None
+    on_text = (lambda text: writer({"delta": text})) if writer else None
     try:
-        return json.loads(text)
-    except Exception:
-        try:
-            start, end = text.find("{"), text.rfind("}") + 1
-            return json.loads(text[start:end])
-        except Exception:
-            return {**fallback, "raw_text": text[:500]}
+        return (
+            gemini_client.generate_content(prompt, task=task, on_text=on_text)
+            or fallback
+        )
+    except Exception as e:
+        logger.error("Generation failed: %s", e)
+        return fallback
 
 
 def build_prompt(role_desc: str, content: str, body: str) -> str:
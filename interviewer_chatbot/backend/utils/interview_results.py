@@ -1,6 +1,5 @@
-import requests
-import json
-import os
+from config.settings import settings
+from services.slack_outbox import slack_outbox
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -10,6 +9,10 @@ def render_interview_results(state: dict, destination: str = "both"):
     """
     Render interview results to console, Slack, or both.
 
+    Slack delivery is asynchronous: the message is written to the durable
+    outbox and sent by the background worker, so a slow webhook never delays
+    the graph.
+
     Args:
         state (dict): Interview state containing questions, answers, feedback, final_evaluation.
         destination (str): "console", "slack", or "both"
@@ -57,23 +60,12 @@ def render_interview_results(state: dict, destination: str = "both"):
         print("=" * 70)
 
     if destination in ("slack", "both"):
-        webhook_url = os.getenv("SLACK_WEBHOOK_URL")
+        webhook_url = settings.slack_webhook_url
         if not webhook_url:
             logger.error("SLACK_WEBHOOK_URL not set. Skipping Slack send.")
         else:
             text = f"*📋 Interview Results for {user_id} on {topic}:*\n\n{qna_section}\n{final_section}"
-            payload = {"text": text}
             try:
-                response = requests.post(
-                    webhook_url,
-                    data=json.dumps(payload),
-                    headers={"Content-Type": "application/json"},
-                )
-                if response.status_code == 200:
-                    logger.info("✅ Slack message sent successfully.")
-                else:
-                    logger.error(
-                        f"Slack message failed: {response.status_code} - {response.text}"
-                    )
+                slack_outbox.enqueue(webhook_url, text)
             except Exception as e:
-                logger.error(f"Slack send failed: {e}")
+                logger.error("Failed to queue Slack message: %s", e)
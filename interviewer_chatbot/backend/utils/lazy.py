@@ -0,0 +1,249 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Generic, List, Optional, TypeVar
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+_registry: List["LazyResource"] = []
+_async_registry: List["AsyncLazyResource"] = []
+_registry_lock = threading.Lock()
+_fork_hooks: List[Callable[[], None]] = []
+
+
+class LazyResource(Generic[T]):
+    """
+    Process-wide singleton that is only created on first use.
+
+    Heavy clients (Gemini, embeddings, Tavily, Chroma, the checkpointer) are
+    wrapped in a LazyResource so that importing a module never opens a network
+    connection. The application lifespan warms and closes them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], T],
+        closer: Optional[Callable[[T], Any]] = None,
+    ):
+        """
+        Args:
+            name (str): Human readable name used in logs.
+            factory (Callable[[], T]): Builds the resource on first access.
+            closer (Optional[Callable[[T], Any]]): Releases the resource on shutdown.
+        """
+        self.name = name
+        self._factory = factory
+        self._closer = closer
+        self._value: Optional[T] = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+        with _registry_lock:
+            _registry.append(self)
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def get(self) -> T:
+        """
+        Return the resource, creating it on first call.
+
+        Returns:
+            T: The shared resource instance.
+        """
+        if self._initialized:
+            return self._value
+
+        with self._lock:
+            if not self._initialized:
+                logger.info("Initializing %s", self.name)
+                self._value = self._factory()
+                self._initialized = True
+        return self._value
+
+    def reset_after_fork(self) -> None:
+        """
+        Forget the parent's instance in a forked child without closing it;
+        the parent still owns its sockets and threads.
+        """
+        self._lock = threading.Lock()
+        self._value, self._initialized = None, False
+
+    def close(self) -> None:
+        """
+        Release the resource (if created) so the next get() builds a new one.
+        """
+        with self._lock:
+            if not self._initialized:
+                return
+            value, self._value, self._initialized = self._value, None, False
+
+        if self._closer is not None:
+            try:
+                self._closer(value)
+                logger.info("Closed %s", self.name)
+            except Exception as e:
+                logger.warning("Failed to close %s: %s", self.name, e)
+
+
+class AsyncLazyResource(Generic[T]):
+    """
+    LazyResource for clients that must be created and closed on the event
+    loop that uses them (async checkpointers, async connection pools).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Awaitable[T]],
+        closer: Optional[Callable[[T], Awaitable[Any]]] = None,
+    ):
+        """
+        Args:
+            name (str): Human readable name used in logs.
+            factory (Callable[[], Awaitable[T]]): Coroutine function building
+                the resource on first access.
+            closer (Optional[Callable[[T], Awaitable[Any]]]): Coroutine function
+                releasing the resource on shutdown.
+        """
+        self.name = name
+        self._factory = factory
+        self._closer = closer
+        self._value: Optional[T] = None
+        self._initialized = False
+        self._lock: Optional[asyncio.Lock] = None
+
+        with _registry_lock:
+            _async_registry.append(self)
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    async def get(self) -> T:
+        """
+        Return the resource, creating it on first call.
+
+        Returns:
+            T: The shared resource instance.
+        """
+        if self._initialized:
+            return self._value
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._initialized:
+                logger.info("Initializing %s", self.name)
+                self._value = await self._factory()
+                self._initialized = True
+        return self._value
+
+    def reset_after_fork(self) -> None:
+        """
+        Forget the parent's instance in a forked child without closing it.
+        """
+        self._lock = None
+        self._value, self._initialized = None, False
+
+    async def close(self) -> None:
+        """
+        Release the resource (if created) so the next get() builds a new one.
+        """
+        if not self._initialized:
+            return
+        value, self._value, self._initialized = self._value, None, False
+
+        if self._closer is not None:
+            try:
+                await self._closer(value)
+                logger.info("Closed %s", self.name)
+            except Exception as e:
+                logger.warning("Failed to close %s: %s", self.name, e)
+
+
+def warm_up(*getters: Callable[[], Any]) -> None:
+    """
+    Eagerly create resources, logging failures instead of raising.
+
+    A dependency that is slow or down must not prevent the API from serving;
+    the resource will simply be retried on first use.
+    """
+    for getter in getters:
+        try:
+            getter()
+        except Exception as e:
+            logger.warning(
+                "Warm-up of %s failed: %s", getattr(getter, "__name__", getter), e
+            )
+
+
+async def awarm_up(*getters: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Async counterpart of warm_up for AsyncLazyResource getters.
+    """
+    for getter in getters:
+        try:
+            await getter()
+        except Exception as e:
+            logger.warning(
+                "Warm-up of %s failed: %s", getattr(getter, "__name__", getter), e
+            )
+
+
+def close_all_resources() -> None:
+    """
+    Close every initialized resource, most recently registered first.
+    """
+    with _registry_lock:
+        resources = list(reversed(_registry))
+    for resource in resources:
+        resource.close()
+
+
+async def aclose_all_resources() -> None:
+    """
+    Close every initialized async resource, most recently registered first.
+    """
+    with _registry_lock:
+        resources = list(reversed(_async_registry))
+    for resource in resources:
+        await resource.close()
+
+
+def register_after_fork(hook: Callable[[], None]) -> None:
+    """
+    Run ``hook`` in every forked child, after lazy resources were reset.
+
+    For process-local state that is not a LazyResource (thread pools,
+    caches, queues whose worker threads do not survive a fork).
+    """
+    _fork_hooks.append(hook)
+
+
+def _reset_after_fork() -> None:
+    """
+    Make a forked worker build its own clients on first use.
+
+    Threads, sockets and gRPC channels created by the parent (e.g. when a
+    server preloads the app) are not usable from the child.
+    """
+    global _registry_lock
+    _registry_lock = threading.Lock()
+    for resource in _registry + _async_registry:
+        resource.reset_after_fork()
+    for hook in _fork_hooks:
+        try:
+            hook()
+        except Exception as e:
+            logger.warning("After-fork reset %s failed: %s", hook, e)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
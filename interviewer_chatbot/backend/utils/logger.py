@@ -1,25 +1,184 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from config.settings import settings
+
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s]%(context)s %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_log_context: ContextVar[Dict[str, str]] = ContextVar("log_context", default={})
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+class ContextFilter(logging.Filter):
+    """
+    Attach correlation fields (request_id, thread_id, ...) to every record.
+
+    Runs in the calling thread, before the record is queued, so the values of
+    the caller's context variables are captured.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = _log_context.get()
+        record.correlation = dict(fields)
+        record.context = (
+            " [" + " ".join(f"{k}={v}" for k, v in fields.items()) + "]"
+            if fields
+            else ""
+        )
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG/INFO records; warnings and errors always pass.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Render records as one JSON object per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "correlation", {}),
+        }
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _build_output_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    if settings.log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT))
+    return handler
+
+
+def _ensure_listener() -> None:
+    global _listener
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = logging.handlers.QueueListener(
+                _queue, _build_output_handler(), respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the background writer thread.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _restart_listener_after_fork() -> None:
+    """
+    The writer thread does not survive a fork; start a new one in the child
+    so its queued records are not lost.
+    """
+    global _listener, _listener_lock
+    _listener_lock = threading.Lock()
+    if _listener is not None:
+        _listener = None
+        _ensure_listener()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
+def _setting_for(name: str, mapping: Dict[str, str]) -> Optional[str]:
+    """
+    Return the most specific value configured for a dotted logger name.
+    """
+    parts = name.split(".")
+    for i in range(len(parts), 0, -1):
+        value = mapping.get(".".join(parts[:i]))
+        if value is not None:
+            return value
+    return None
 
 
 def setup_logger(name: str = "interview_bot") -> logging.Logger:
     """
     Creates or returns a logger with a standard format across the project.
+
+    Records are handed to a queue and written by a background thread, so a
+    slow stdout never adds latency to the caller. Levels and sampling rates
+    can be tuned per logger via LOG_LEVELS / LOG_SAMPLE_RATES.
     """
     logger = logging.getLogger(name)
 
     if not logger.handlers:
-        logger.setLevel(logging.INFO)
+        _ensure_listener()
+        level = _setting_for(name, settings.log_levels) or settings.log_level
+        logger.setLevel(level.upper())
 
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter(
-            "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        handler.setFormatter(formatter)
+        handler = logging.handlers.QueueHandler(_queue)
+        handler.addFilter(ContextFilter())
+        rate = _setting_for(name, settings.log_sample_rates)
+        if rate is not None and float(rate) < 1.0:
+            handler.addFilter(SamplingFilter(float(rate)))
         logger.addHandler(handler)
+        logger.propagate = False
 
     return logger
 
 
+def bind_log_context(**fields: str) -> None:
+    """
+    Add correlation fields to all records logged from the current context.
+    """
+    _log_context.set({**_log_context.get(), **{k: str(v) for k, v in fields.items()}})
+
+
+@contextmanager
+def log_context(**fields: str) -> Iterator[None]:
+    """
+    Temporarily add correlation fields to records logged inside the block.
+    """
+    token = _log_context.set(
+        {**_log_context.get(), **{k: str(v) for k, v in fields.items()}}
+    )
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
 logger = setup_logger()
@@ -0,0 +1,145 @@
+import threading
+from collections import deque
+from typing import Dict, Iterable, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """
+    Nearest-rank percentile of ``values`` (0.0 when empty).
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> float:
+        return self._value
+
+
+class Gauge:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> float:
+        return self._value
+
+
+class Histogram:
+    """
+    Count/sum/max plus a bounded reservoir of recent samples for percentiles.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._samples = deque(maxlen=window)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def recent(self) -> list:
+        with self._lock:
+            return list(self._samples)
+
+    def percentile(self, q: float) -> float:
+        return percentile(self.recent(), q)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def snapshot(self) -> Dict[str, float]:
+        samples = self.recent()
+        return {
+            "count": self._count,
+            "sum": round(self._sum, 6),
+            "max": round(self._max, 6),
+            "p50": round(percentile(samples, 50), 6),
+            "p95": round(percentile(samples, 95), 6),
+            "p99": round(percentile(samples, 99), 6),
+        }
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics registry exposed through GET /metrics.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, LabelKey], object] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, kind, name: str, labels: Dict[str, str]):
+        key = (name, _label_key(labels))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, kind())
+        return metric
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        return self._get(Counter, name, labels)
+
+    def gauge(self, name: str, **labels: str) -> Gauge:
+        return self._get(Gauge, name, labels)
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        return self._get(Histogram, name, labels)
+
+    def snapshot(self) -> Dict[str, list]:
+        """
+        Return every metric grouped by name, with its labels and current value.
+        """
+        with self._lock:
+            items = list(self._metrics.items())
+        result: Dict[str, list] = {}
+        for (name, labels), metric in sorted(items, key=lambda item: item[0]):
+            result.setdefault(name, []).append(
+                {"labels": dict(labels), "value": metric.snapshot()}
+            )
+        return result
+
+
+metrics = MetricsRegistry()
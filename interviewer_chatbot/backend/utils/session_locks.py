@@ -0,0 +1,181 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from config.settings import settings
+from utils.lazy import AsyncLazyResource
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+
+LEASE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS session_leases (
+    thread_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    lease_until TIMESTAMPTZ NOT NULL
+)
+"""
+
+# Takes the lease if it is free or expired; returns a row only on success.
+CLAIM_LEASE_SQL = """
+INSERT INTO session_leases (thread_id, owner, lease_until)
+VALUES (%(thread_id)s, %(owner)s, now() + %(ttl)s * interval '1 second')
+ON CONFLICT (thread_id) DO UPDATE
+    SET owner = EXCLUDED.owner, lease_until = EXCLUDED.lease_until
+    WHERE session_leases.lease_until < now()
+RETURNING owner
+"""
+
+RENEW_LEASE_SQL = """
+UPDATE session_leases SET lease_until = now() + %(ttl)s * interval '1 second'
+WHERE thread_id = %(thread_id)s AND owner = %(owner)s
+"""
+
+RELEASE_LEASE_SQL = """
+DELETE FROM session_leases WHERE thread_id = %(thread_id)s AND owner = %(owner)s
+"""
+
+
+class SessionLockUnavailable(RuntimeError):
+    """
+    Raised when a thread's lease could not be taken in time, or the lock
+    database could not be reached; the caller should answer 503.
+    """
+
+
+async def _create_lock_pool():
+    from psycopg_pool import AsyncConnectionPool
+
+    pool = AsyncConnectionPool(
+        settings.database_url,
+        min_size=1,
+        max_size=settings.db_pool_size,
+        kwargs={"autocommit": True, "connect_timeout": settings.db_connect_timeout},
+        open=False,
+    )
+    await pool.open(wait=True, timeout=settings.db_connect_timeout)
+    async with pool.connection() as conn:
+        await conn.execute(LEASE_TABLE_SQL)
+    return pool
+
+
+async def _close_lock_pool(pool) -> None:
+    await pool.close()
+
+
+# Separate from the checkpointer pool, so lease statements never queue
+# behind checkpoint reads and writes.
+lock_pool = AsyncLazyResource(
+    "session lock pool", _create_lock_pool, closer=_close_lock_pool
+)
+
+
+async def _execute(sql: str, params: dict) -> int:
+    """
+    Run one lease statement on a briefly borrowed connection; returns the
+    number of rows it affected or returned.
+    """
+    pool = await lock_pool.get()
+    try:
+        async with pool.connection(timeout=settings.db_connect_timeout) as conn:
+            cursor = await conn.execute(sql, params)
+            return cursor.rowcount
+    except Exception as e:
+        raise SessionLockUnavailable(f"Session lock database unavailable: {e}") from e
+
+
+@asynccontextmanager
+async def lease_lock(
+    thread_id: str,
+    ttl: float = settings.session_lease_seconds,
+    wait: float = settings.session_lock_wait,
+):
+    """
+    Hold a lease row on ``thread_id`` in PostgreSQL.
+
+    Serializes a thread's turns across worker processes without pinning a
+    connection: claiming, renewing and releasing the lease each borrow a
+    pooled connection for one statement. A waiter polls with backoff. The
+    holder renews the lease every ``ttl / 3`` seconds, so a lease only
+    expires if its worker dies, and then another worker can claim it.
+
+    Raises:
+        SessionLockUnavailable: If the lease is not free within ``wait``
+            seconds or the database cannot be reached.
+    """
+    params = {"thread_id": thread_id, "owner": uuid.uuid4().hex, "ttl": ttl}
+    deadline = time.monotonic() + wait
+    delay = 0.02
+    while not await _execute(CLAIM_LEASE_SQL, params):
+        if time.monotonic() >= deadline:
+            metrics.counter("session_lease_timeouts_total").inc()
+            raise SessionLockUnavailable(
+                f"Session {thread_id} is busy; lease not free after {wait:g}s"
+            )
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+    async def renew() -> None:
+        while True:
+            await asyncio.sleep(ttl / 3)
+            try:
+                await _execute(RENEW_LEASE_SQL, params)
+            except SessionLockUnavailable as e:
+                logger.warning("Renewing the lease on %s failed: %s", thread_id, e)
+
+    renewer = asyncio.create_task(renew())
+    try:
+        yield
+    finally:
+        renewer.cancel()
+        try:
+            await _execute(RELEASE_LEASE_SQL, params)
+        except SessionLockUnavailable as e:
+            # The lease expires on its own after ttl seconds.
+            logger.warning("Releasing the lease on %s failed: %s", thread_id, e)
+
+
+class SessionLocks:
+    """
+    One asyncio lock per interview thread.
+
+    Requests and background tasks that read-modify-write a thread's
+    checkpoint hold its lock, so a background update can never interleave
+    with the next turn of the same interview. Locks are dropped once nobody
+    holds or waits for them. With several workers the asyncio lock is backed
+    by a PostgreSQL lease row (``lease_lock``), since the next turn may be
+    served by a different process.
+    """
+
+    def __init__(self, distributed: bool = settings.workers > 1):
+        self.distributed = distributed
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, thread_id: str):
+        lock = self._locks.setdefault(thread_id, asyncio.Lock())
+        self._users[thread_id] = self._users.get(thread_id, 0) + 1
+        try:
+            async with lock:
+                if self.distributed:
+                    async with lease_lock(thread_id):
+                        yield
+                else:
+                    yield
+        finally:
+            self._users[thread_id] -= 1
+            if not self._users[thread_id]:
+                del self._users[thread_id]
+                self._locks.pop(thread_id, None)
+
+    def locked(self, thread_id: str) -> bool:
+        lock = self._locks.get(thread_id)
+        return bool(lock and lock.locked())
+
+
+session_locks = SessionLocks()
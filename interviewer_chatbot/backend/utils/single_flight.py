@@ -0,0 +1,51 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs at most one coroutine per key at a time.
+
+    Callers that arrive while a key is in flight attach to the running task
+    and receive its result (or exception) instead of starting the work again.
+    The task is shielded, so a caller that disconnects does not cancel the
+    work for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await the in-flight task for ``key``, starting ``factory()`` if none.
+
+        Args:
+            key (Hashable): Identifies duplicate work.
+            factory (Callable[[], Awaitable[T]]): Creates the coroutine to run.
+
+        Returns:
+            T: The shared result.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            metrics.counter("single_flight_shared_total", key_space=self.name).inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when every caller went away.
+            task.exception()
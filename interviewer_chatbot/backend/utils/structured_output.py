@@ -0,0 +1,151 @@
+import re
+from typing import Any, Dict, Optional, Type, TypeVar
+
+import orjson
+from pydantic import BaseModel, ValidationError
+
+from utils.logger import setup_logger
+from utils.metrics import metrics
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+# Keys of a JSON schema that Gemini's response_schema understands.
+SCHEMA_KEYS = {"type", "format", "description", "nullable", "enum", "items"}
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_DANGLING_KEY = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+
+
+def response_schema_for(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Build a Gemini response_schema from a pydantic model.
+
+    References are inlined, unsupported keywords (defaults, bounds, titles)
+    are dropped and every property is marked required so the model always
+    returns complete objects.
+    """
+    schema = model.model_json_schema()
+    definitions = schema.get("$defs", {})
+
+    def convert(node: Dict[str, Any]) -> Dict[str, Any]:
+        if "$ref" in node:
+            node = definitions[node["$ref"].rsplit("/", 1)[-1]]
+        if "anyOf" in node:
+            options = [opt for opt in node["anyOf"] if opt.get("type") != "null"]
+            converted = convert(options[0])
+            converted["nullable"] = len(options) < len(node["anyOf"])
+            return converted
+        converted = {key: value for key, value in node.items() if key in SCHEMA_KEYS}
+        if "items" in node:
+            converted["items"] = convert(node["items"])
+        if "properties" in node:
+            converted["properties"] = {
+                name: convert(prop) for name, prop in node["properties"].items()
+            }
+            converted["required"] = list(node["properties"])
+        return converted
+
+    return convert(schema)
+
+
+def repair_truncated_json(text: str) -> str:
+    """
+    Close whatever a truncated JSON document left open.
+
+    A single scan tracks strings and brackets; a string cut off part way is
+    dropped rather than closed (a half-written question or feedback is not a
+    finished one), then a dangling key or trailing comma is dropped and the
+    missing closing brackets are appended. Values cut mid-token are not
+    recovered; an object left without its required fields fails validation.
+    """
+    stack = []
+    in_string = escaped = False
+    string_start = 0
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            string_start = position
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    repaired = text[:string_start] if in_string else text
+    repaired = repaired.rstrip()
+    if stack and stack[-1] == "}":
+        repaired = _DANGLING_KEY.sub(r"\1", repaired)
+    repaired = repaired.rstrip().rstrip(",").rstrip(":")
+    return repaired + "".join(reversed(stack))
+
+
+def _candidates(text: str):
+    """
+    Cheapest-first decodings of a response: as-is, the extracted object
+    (code fences and surrounding prose removed), then the repaired object.
+    """
+    yield text, "ok"
+    text = _FENCE.sub("", text.strip())
+    start = text.find("{")
+    text = text[start:] if start != -1 else text
+    yield text, "extracted"
+    end = text.rfind("}")
+    if 0 < end < len(text) - 1:
+        yield text[: end + 1], "extracted"
+    yield repair_truncated_json(text), "repaired"
+
+
+def parse_model(raw: Any, model: Type[T]) -> Optional[T]:
+    """
+    Parse and validate a model response against ``model`` in one pass.
+
+    Schema-constrained responses parse directly with orjson; otherwise the
+    JSON object is extracted from the text and, if it was cut off, repaired.
+    Outcomes are counted in ``llm_json_parse_total`` instead of being hidden
+    behind defaults.
+
+    Args:
+        raw (Any): Response text (or an already-decoded dict).
+        model (Type[T]): Pydantic model to validate against.
+
+    Returns:
+        Optional[T]: The validated model, or None if parsing failed.
+    """
+    name = model.__name__
+    if isinstance(raw, dict):
+        data, outcome = raw, "ok"
+    elif not raw or not str(raw).strip():
+        metrics.counter("llm_json_parse_total", schema=name, outcome="empty").inc()
+        return None
+    else:
+        data = outcome = None
+        for candidate, outcome in _candidates(str(raw)):
+            try:
+                decoded = orjson.loads(candidate)
+            except orjson.JSONDecodeError:
+                continue
+            # A bare string or list decodes too; keep looking for the object.
+            if isinstance(decoded, dict):
+                data = decoded
+                break
+
+    if data is not None:
+        try:
+            parsed = model.model_validate(data)
+            metrics.counter("llm_json_parse_total", schema=name, outcome=outcome).inc()
+            return parsed
+        except ValidationError as e:
+            logger.warning("%s response failed validation: %s", name, e)
+    else:
+        logger.warning("Unparseable %s response (%d chars)", name, len(str(raw)))
+
+    metrics.counter("llm_json_parse_total", schema=name, outcome="failed").inc()
+    return None
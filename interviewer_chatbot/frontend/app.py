@@ -2,7 +2,11 @@ import streamlit as st
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+import json
 import os
+import time
+import uuid
 
 load_dotenv()
 
@@ -11,7 +15,188 @@ BACKEND_URL = os.getenv("BACKEND_URL")
 st.set_page_config(page_title="AI Interviewer", page_icon="brain")
 
 BACKEND_START_ENDPOINT = f"{BACKEND_URL}/start_interview"
-BACKEND_CONTINUE_ENDPOINT = f"{BACKEND_URL}/continue_interview"
+BACKEND_STREAM_ENDPOINT = f"{BACKEND_URL}/continue_interview/stream"
+BACKEND_REPORT_ENDPOINT = f"{BACKEND_URL}/interviews/{{thread_id}}/report"
+
+# (connect, read) seconds; the read timeout is the longest silence allowed
+# between streamed events, not a cap on the whole turn.
+REQUEST_TIMEOUT = (
+    float(os.getenv("BACKEND_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("BACKEND_READ_TIMEOUT", "120")),
+)
+
+# Attempts to deliver one answer before giving up until the next rerun.
+ANSWER_ATTEMPTS = max(1, int(os.getenv("BACKEND_ANSWER_ATTEMPTS", "3")))
+
+
+class StreamEnded(Exception):
+    """The backend closed a turn's stream before its result arrived."""
+
+
+# Failures after which the turn may still be running, or already finished,
+# on the backend; the answer is sent again under the same idempotency key.
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    StreamEnded,
+)
+
+# Status shown while a turn runs, keyed by the graph node that just finished.
+PROGRESS_LABELS = {
+    "get_answer": "Reviewing your answer",
+    "retrieval_decision": "Looking up context",
+    "retrieval": "Preparing the next question",
+    "tavily_search": "Preparing the next question",
+    "evaluate_question": "Writing feedback",
+    "final_evaluation": "Writing your final report",
+}
+
+
+def render_stream(resp: requests.Response, placeholder) -> tuple:
+    """
+    Show a streamed turn in ``placeholder`` as its NDJSON events arrive.
+
+    Progress events update the status line until question text starts;
+    deltas are appended to a live preview. The ``result`` event's body
+    replaces the preview, since a retried generation streams its text again.
+
+    Returns:
+        tuple: (reply markdown, whether the interview completed)
+
+    Raises:
+        StreamEnded: If the stream closed without a result or error event.
+    """
+    preview = ""
+    for line in resp.iter_lines():
+        if not line:
+            continue
+        event = json.loads(line)
+        kind = event.get("event")
+        if kind == "progress" and not preview:
+            label = PROGRESS_LABELS.get(event.get("node"), "Thinking")
+            placeholder.markdown(f"*{label}...*")
+        elif kind == "delta":
+            preview += event.get("text", "")
+            placeholder.markdown(preview + "▌")
+        elif kind == "result":
+            return build_reply(event["response"])
+        elif kind == "error":
+            return f"Backend error: {event.get('detail')}", False
+    raise StreamEnded("the response ended early")
+
+
+def submit_answer(answer: str, key: str, placeholder) -> tuple:
+    """
+    Send an answer and show its streamed turn in ``placeholder``.
+
+    Transport failures are retried with the same idempotency key, so the
+    backend attaches the retry to the turn in flight (or replays its result)
+    instead of running the turn twice.
+
+    Returns:
+        tuple: (reply markdown, whether the interview completed); completed
+        is None if every attempt failed in transit and the answer is still
+        pending.
+    """
+    for attempt in range(1, ANSWER_ATTEMPTS + 1):
+        try:
+            with get_http_session().post(
+                BACKEND_STREAM_ENDPOINT,
+                json={
+                    "user_response": answer,
+                    "thread_id": st.session_state.thread_id,
+                    "idempotency_key": key,
+                },
+                stream=True,
+                timeout=REQUEST_TIMEOUT,
+            ) as resp:
+                if resp.status_code != 200:
+                    return f"Backend error: {resp.status_code}", False
+                return render_stream(resp, placeholder)
+        except TRANSIENT_ERRORS as e:
+            error = e
+            if attempt < ANSWER_ATTEMPTS:
+                placeholder.markdown(
+                    f"*Connection lost, retrying ({attempt}/{ANSWER_ATTEMPTS - 1})...*"
+                )
+                time.sleep(min(2**attempt, 8))
+        except Exception as e:
+            return f"Error: {e}", False
+    return f"Could not reach the backend: {error}", None
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    One keep-alive session shared by every script run, so turns reuse the
+    pooled connection to the backend instead of opening a new one.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def format_feedback(fb: dict) -> str:
+    qf = fb.get("question_feedback", {})
+    af = fb.get("answer_feedback", {})
+    text = f"**Question Rating:** {qf.get('rating', 'N/A')}\n"
+    qf_dict = qf.get("feedback", {})
+    if isinstance(qf_dict, dict):
+        for k, v in qf_dict.items():
+            text += f"- **{k.title()}**: {v}\n"
+    else:
+        text += f"{qf_dict}\n"
+    text += "\n"
+    text += f"**Your Answer Rating:** {af.get('rating', 'N/A')}\n"
+    text += f"{af.get('feedback', 'No feedback')}\n\n"
+    return text
+
+
+def fetch_report(thread_id: str) -> str:
+    """
+    Markdown report of a finished interview, rendered and cached by the
+    backend from the checkpointed state.
+    """
+    r = get_http_session().get(
+        BACKEND_REPORT_ENDPOINT.format(thread_id=thread_id),
+        params={"format": "markdown"},
+        timeout=REQUEST_TIMEOUT,
+    )
+    r.raise_for_status()
+    return r.text
+
+
+def build_reply(data: dict) -> tuple:
+    """
+    Chat reply for a /continue_interview response body; stores the final
+    report when the interview is over.
+
+    Returns:
+        tuple: (reply markdown, whether the interview completed)
+    """
+    reply = ""
+    feedback_list = data.get("feedback_list", [])
+    if feedback_list:
+        reply += f"### Feedback for Your Last Answer\n"
+        reply += format_feedback(feedback_list[-1])
+        reply += "---\n"
+
+    if msg := data.get("message"):
+        reply += f"{msg}\n\n"
+
+    if data.get("final_evaluation"):
+        try:
+            st.session_state.final_report = fetch_report(st.session_state.thread_id)
+        except Exception as e:
+            st.session_state.final_report = f"Could not load the report: {e}"
+        st.session_state.show_report = True
+        reply += "\n**Interview complete. View your full report.**"
+        return reply, True
+    return reply, False
+
 
 for key in [
     "interview_started",
@@ -23,27 +208,26 @@ for key in [
     "job_title",
     "cv_filename",
     "question_style",
-    "qa_pairs",
+    "pending_answer",
+    "answer_key",
 ]:
     if key not in st.session_state:
         st.session_state[key] = (
             False
-            if key != "messages" and key != "final_report" and key != "qa_pairs"
-            else [] if key in ["messages", "qa_pairs"] else ""
+            if key != "messages" and key != "final_report"
+            else [] if key == "messages" else ""
         )
 
 if st.session_state.show_report:
     st.title(f"Final Report: {st.session_state.job_title}")
 
-    st.markdown(
-        f"""
+    st.markdown(f"""
     **Candidate:** {st.session_state.candidate_name or 'Not Provided'}  
     **Position:** {st.session_state.job_title}  
     **CV:** {st.session_state.cv_filename or 'Not uploaded'}  
     **Question Style:** {st.session_state.question_style}  
     **Date:** {datetime.now().strftime('%B %d, %Y')}
-    """
-    )
+    """)
     st.divider()
 
     st.markdown(st.session_state.final_report, unsafe_allow_html=True)
@@ -109,7 +293,12 @@ elif not st.session_state.interview_started:
             }
 
             try:
-                r = requests.post(BACKEND_START_ENDPOINT, data=data, files=files)
+                r = get_http_session().post(
+                    BACKEND_START_ENDPOINT,
+                    data=data,
+                    files=files,
+                    timeout=REQUEST_TIMEOUT,
+                )
                 if r.status_code == 200:
                     d = r.json()
                     st.session_state.interview_started = True
@@ -123,7 +312,6 @@ elif not st.session_state.interview_started:
                             "content": d.get("message", "Let's begin!"),
                         }
                     ]
-                    st.session_state.qa_pairs = []
                     st.rerun()
                 else:
                     st.error(f"Error: {r.status_code}")
@@ -133,144 +321,44 @@ elif not st.session_state.interview_started:
 else:
     st.title(f"Interview: {st.session_state.job_title}")
 
-    st.info(
-        f"""
+    st.info(f"""
     **Candidate:** {st.session_state.candidate_name or 'Not set'}  
     **CV:** {st.session_state.cv_filename}  
     **Question Style:** {st.session_state.question_style}
-    """
-    )
+    """)
 
     for msg in st.session_state.messages:
         with st.chat_message(msg["role"]):
             st.markdown(msg["content"])
 
-    if user_input := st.chat_input("Type your answer..."):
-        last_q = None
-        for m in reversed(st.session_state.messages):
-            if m["role"] == "assistant" and m["content"] != "*Thinking...*":
-                last_q = m["content"]
-                break
-        if last_q:
-            st.session_state.qa_pairs.append(
-                {"question": last_q.strip(), "answer": user_input.strip()}
-            )
-
+    # An answer stays pending, with its idempotency key, until its reply
+    # arrives. A rerun that cut the stream short sends it again under the
+    # same key, so the backend runs the turn only once.
+    user_input = st.chat_input(
+        "Type your answer...", disabled=bool(st.session_state.pending_answer)
+    )
+    if user_input and not st.session_state.pending_answer:
         st.session_state.messages.append({"role": "user", "content": user_input})
-        st.session_state.messages.append(
-            {"role": "assistant", "content": "*Thinking...*"}
-        )
-        st.rerun()
-
-    elif (
-        st.session_state.messages
-        and st.session_state.messages[-1]["content"] == "*Thinking...*"
-    ):
-        user_msg = [
-            m["content"]
-            for m in reversed(st.session_state.messages[:-1])
-            if m["role"] == "user"
-        ][0]
-
-        try:
-            resp = requests.post(
-                BACKEND_CONTINUE_ENDPOINT,
-                json={
-                    "user_response": user_msg,
-                    "thread_id": st.session_state.thread_id,
-                },
+        with st.chat_message("user"):
+            st.markdown(user_input)
+        st.session_state.pending_answer = user_input
+        st.session_state.answer_key = uuid.uuid4().hex
+
+    if st.session_state.pending_answer:
+        with st.chat_message("assistant"):
+            placeholder = st.empty()
+            placeholder.markdown("*Thinking...*")
+            reply, completed = submit_answer(
+                st.session_state.pending_answer,
+                st.session_state.answer_key,
+                placeholder,
             )
-            if resp.status_code == 200:
-                data = resp.json()
-                reply = ""
-
-                feedback_list = data.get("feedback_list", [])
-                if feedback_list:
-                    fb = feedback_list[-1]
-                    qf = fb.get("question_feedback", {})
-                    af = fb.get("answer_feedback", {})
-
-                    reply += f"### Feedback for Your Last Answer\n"
-                    reply += f"**Question Rating:** {qf.get('rating', 'N/A')}\n"
-                    qf_dict = qf.get("feedback", {})
-                    if isinstance(qf_dict, dict):
-                        for k, v in qf_dict.items():
-                            reply += f"- **{k.title()}**: {v}\n"
-                    else:
-                        reply += f"{qf_dict}\n"
-                    reply += "\n"
-                    reply += f"**Your Answer Rating:** {af.get('rating', 'N/A')}\n"
-                    reply += f"{af.get('feedback', 'No feedback')}\n\n"
-                    reply += "---\n"
-
-                if msg := data.get("message"):
-                    reply += f"{msg}\n\n"
-
-                if final := data.get("final_evaluation"):
-                    report = f"# Final Interview Report\n\n"
-                    report += f"**Candidate:** {st.session_state.candidate_name or 'Not Provided'}\n"
-                    report += f"**Position:** {st.session_state.job_title}\n"
-                    report += f"**CV:** {st.session_state.cv_filename}\n"
-                    report += f"**Question Style:** {st.session_state.question_style}\n"
-                    report += f"**Date:** {datetime.now().strftime('%B %d, %Y')}\n\n"
-                    report += "---\n\n"
-
-                    report += "## Interview Transcript & Feedback\n\n"
-                    for i, pair in enumerate(st.session_state.qa_pairs, 1):
-                        fb = feedback_list[i - 1] if i <= len(feedback_list) else {}
-                        qf = fb.get("question_feedback", {})
-                        af = fb.get("answer_feedback", {})
-
-                        report += f"### Question {i}\n"
-                        report += f"**Q:** {pair['question']}\n\n"
-                        report += f"**A:** {pair['answer']}\n\n"
-
-                        report += f"**Question Rating:** {qf.get('rating', 'N/A')}\n"
-                        qf_dict = qf.get("feedback", {})
-                        if isinstance(qf_dict, dict):
-                            for k, v in qf_dict.items():
-                                report += f"- **{k.title()}**: {v}\n"
-                        else:
-                            report += f"{qf_dict}\n"
-                        report += "\n"
-
-                        report += f"**Your Answer Rating:** {af.get('rating', 'N/A')}\n"
-                        report += f"{af.get('feedback', 'No feedback')}\n\n"
-                        report += "---\n\n"
-
-                    report += "## Final Evaluation\n\n"
-                    report += f"**Overall Quality:** {final.get('overall_quality', 'N/A')}\n\n"
-                    report += f"**Strengths:**\n"
-                    for s in final.get("strengths", []):
-                        report += f"- {s}\n"
-                    report += "\n"
-                    report += f"**Areas for Improvement:**\n"
-                    for a in final.get("areas_for_improvement", []):
-                        report += f"- {a}\n"
-                    report += "\n"
-                    report += (
-                        f"**Recommendation:** {final.get('recommendation', 'N/A')}\n\n"
-                    )
-                    report += (
-                        f"**Final Feedback:**\n\n{final.get('final_feedback', 'N/A')}\n"
-                    )
-
-                    st.session_state.final_report = report
-                    st.session_state.show_report = True
-                    reply += "\n**Interview complete. View your full report.**"
-
-                st.session_state.messages.pop()
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": reply}
-                )
-            else:
-                st.session_state.messages.pop()
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": "Backend error"}
-                )
-        except Exception as e:
-            st.session_state.messages.pop()
-            st.session_state.messages.append(
-                {"role": "assistant", "content": f"Error: {e}"}
-            )
-        st.rerun()
+            placeholder.markdown(reply)
+
+        if completed is None:
+            # Clicking reruns the script, which sends the answer again.
+            st.button("Retry")
+        else:
+            st.session_state.pending_answer = False
+            st.session_state.messages.append({"role": "assistant", "content": reply})
+            st.rerun()
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Dict, Optional, Set
+
+from aiortc import RTCPeerConnection
+from aiortc.contrib.media import MediaRecorder
+
+
+class PeersExhausted(Exception):
+    """Raised when a new peer would exceed the concurrent-peer limit."""
+
+
+class PeerSession:
+    """One peer connection and everything it owns."""
+
+    def __init__(self, conn_id: str, pc: RTCPeerConnection, recording_path: str):
+        self.conn_id = conn_id
+        self.pc = pc
+        self.recording_path = recording_path
+        self.recorder = MediaRecorder(recording_path)
+        self.recorder_started = False
+        self.tasks: Set[asyncio.Task] = set()
+        self.expiry: Optional[asyncio.Task] = None
+        self.opened_at = time.monotonic()
+
+    def track_task(self, task: asyncio.Task) -> None:
+        """Cancel ``task`` when the connection goes away."""
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+
+class ConnectionManager:
+    """
+    Owns every peer connection from offer to teardown.
+
+    Each connection records to its own file in ``recordings_dir``. When its
+    state becomes ``failed`` or ``closed`` (or the server shuts down), its
+    recorder is stopped, its frame tasks are cancelled, the connection is
+    closed and forgotten. A connection that is not connected within
+    ``connect_timeout`` seconds of its offer is released the same way. At
+    most ``max_peers`` connections are open at a time; ``open`` raises
+    ``PeersExhausted`` beyond that.
+    """
+
+    def __init__(
+        self,
+        max_peers: int = 4,
+        recordings_dir: str = "recordings",
+        connect_timeout: float = 30,
+    ):
+        self.max_peers = max_peers
+        self.recordings_dir = recordings_dir
+        self.connect_timeout = connect_timeout
+        self.sessions: Dict[str, PeerSession] = {}
+        self.opened_total = 0
+        self.closed_total = 0
+        self.failed_total = 0
+        self.rejected_total = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.sessions) >= self.max_peers
+
+    def open(self) -> PeerSession:
+        """Create a connection and its recorder, and start tracking its state."""
+        if self.full:
+            self.rejected_total += 1
+            raise PeersExhausted(f"{self.max_peers} peers already connected")
+
+        os.makedirs(self.recordings_dir, exist_ok=True)
+        conn_id = uuid.uuid4().hex[:8]
+        session = PeerSession(
+            conn_id,
+            RTCPeerConnection(),
+            os.path.join(self.recordings_dir, f"received-{conn_id}.mp4"),
+        )
+        self.sessions[conn_id] = session
+        self.opened_total += 1
+
+        @session.pc.on("connectionstatechange")
+        async def on_connectionstatechange():
+            state = session.pc.connectionState
+            print(f"🔌 {conn_id} connection state: {state}")
+            if state == "connected" and session.expiry is not None:
+                session.expiry.cancel()
+            if state == "failed":
+                self.failed_total += 1
+            if state in ("failed", "closed"):
+                await self.close(session)
+
+        session.expiry = asyncio.ensure_future(self._expire_unconnected(session))
+        return session
+
+    async def _expire_unconnected(self, session: PeerSession) -> None:
+        await asyncio.sleep(self.connect_timeout)
+        if session.pc.connectionState != "connected":
+            print(f"⌛ {session.conn_id} did not connect in time")
+            self.failed_total += 1
+            await self.close(session)
+
+    async def start_recording(self, session: PeerSession) -> None:
+        """Start the recorder once the remote tracks have been added to it."""
+        await session.recorder.start()
+        session.recorder_started = True
+
+    async def close(self, session: PeerSession) -> None:
+        """Release everything ``session`` holds; safe to call more than once."""
+        if self.sessions.pop(session.conn_id, None) is None:
+            return
+        self.closed_total += 1
+        current = asyncio.current_task()
+        for task in [*session.tasks, session.expiry]:
+            if task is not None and task is not current:
+                task.cancel()
+        try:
+            await session.recorder.stop()
+        except Exception as e:
+            print(f"Error stopping recorder for {session.conn_id}: {e}")
+        await session.pc.close()
+        lifetime = time.monotonic() - session.opened_at
+        print(f"🧹 Released {session.conn_id} after {lifetime:.0f}s")
+
+    async def close_all(self) -> None:
+        await asyncio.gather(*(self.close(s) for s in list(self.sessions.values())))
+
+    def gauges(self) -> Dict:
+        """Live connection and resource counts, plus lifetime totals."""
+        sessions = list(self.sessions.values())
+        return {
+            "connections": len(sessions),
+            "max_peers": self.max_peers,
+            "recorders_open": len(sessions),
+            "recorders_running": sum(s.recorder_started for s in sessions),
+            "frame_tasks": sum(len(s.tasks) for s in sessions),
+            "connections_opened_total": self.opened_total,
+            "connections_closed_total": self.closed_total,
+            "connections_failed_total": self.failed_total,
+            "connections_rejected_total": self.rejected_total,
+        }
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Called on the worker thread with (connection id, BGR image as an ndarray).
+Analyzer = Callable[[str, Any], None]
+
+
+class ConnectionStats:
+    """Frame and event-loop counters for one peer connection."""
+
+    def __init__(self, conn_id: str):
+        self.conn_id = conn_id
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.decoded_fps = 0.0
+        self.processed_fps = 0.0
+        self.loop_lag_ms = 0.0
+        self.max_loop_lag_ms = 0.0
+        self._received_window = _RateWindow()
+        self._processed_window = _RateWindow()
+
+    def record_received(self) -> None:
+        self.received += 1
+        rate = self._received_window.tick()
+        if rate is not None:
+            self.decoded_fps = rate
+
+    def record_processed(self) -> None:
+        self.processed += 1
+        rate = self._processed_window.tick()
+        if rate is not None:
+            self.processed_fps = rate
+
+    def record_loop_lag(self, lag: float) -> None:
+        self.loop_lag_ms = max(lag, 0.0) * 1000
+        self.max_loop_lag_ms = max(self.max_loop_lag_ms, self.loop_lag_ms)
+
+    def as_dict(self) -> Dict:
+        return {
+            "connection": self.conn_id,
+            "frames_received": self.received,
+            "frames_processed": self.processed,
+            "frames_dropped": self.dropped,
+            "decoded_fps": round(self.decoded_fps, 1),
+            "processed_fps": round(self.processed_fps, 1),
+            "loop_lag_ms": round(self.loop_lag_ms, 1),
+            "max_loop_lag_ms": round(self.max_loop_lag_ms, 1),
+        }
+
+
+class _RateWindow:
+    """Events per second, recomputed once per ``window`` seconds."""
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self.count = 0
+        self.started = time.monotonic()
+
+    def tick(self) -> Optional[float]:
+        self.count += 1
+        elapsed = time.monotonic() - self.started
+        if elapsed < self.window:
+            return None
+        rate = self.count / elapsed
+        self.count = 0
+        self.started = time.monotonic()
+        return rate
+
+
+class FrameWorker(threading.Thread):
+    """
+    Converts, analyzes and displays video frames on one background thread,
+    so the event loop only hands frames over.
+
+    Every connection gets a bounded queue. When it is full, the oldest frame
+    is dropped (and counted) so the worker always shows the latest picture
+    and a slow consumer never backs up into the event loop. Frames of
+    different connections are taken round-robin.
+
+    With ``display`` off nothing touches the OpenCV GUI (cv2 is not even
+    imported), so the server runs headless; ``analyze`` still receives every
+    frame the worker takes.
+    """
+
+    def __init__(
+        self,
+        display: bool = True,
+        queue_size: int = 2,
+        analyze: Optional[Analyzer] = None,
+    ):
+        super().__init__(name="frame-worker", daemon=True)
+        self.display = display
+        self.queue_size = queue_size
+        self.analyze = analyze
+        self.stats: Dict[str, ConnectionStats] = {}
+        self._queues: Dict[str, deque] = {}
+        self._closed_windows: List[str] = []
+        self._cond = threading.Condition()
+        self._stopped = False
+
+    def add(self, conn_id: str) -> ConnectionStats:
+        """Register a connection; returns its stats."""
+        with self._cond:
+            self._queues[conn_id] = deque(maxlen=self.queue_size)
+            self.stats[conn_id] = ConnectionStats(conn_id)
+            return self.stats[conn_id]
+
+    def remove(self, conn_id: str) -> None:
+        """Forget a connection and drop its queued frames."""
+        with self._cond:
+            if self._queues.pop(conn_id, None) is not None:
+                self._closed_windows.append(conn_id)
+                self._cond.notify()
+            self.stats.pop(conn_id, None)
+
+    def submit(self, conn_id: str, frame) -> None:
+        """Queue a frame without blocking; called from the event loop."""
+        with self._cond:
+            queue = self._queues.get(conn_id)
+            if queue is None:
+                return
+            stats = self.stats[conn_id]
+            stats.record_received()
+            if len(queue) == queue.maxlen:
+                stats.dropped += 1
+            queue.append(frame)
+            self._cond.notify()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self.is_alive():
+            self.join(timeout=2)
+
+    def _take(self):
+        """
+        Wait for work; returns one frame per non-empty queue. While
+        displaying, returns empty-handed every 100 ms so the GUI keeps
+        processing its events.
+        """
+        timeout = 0.1 if self.display else None
+        with self._cond:
+            while not self._stopped and not self._closed_windows:
+                if any(self._queues.values()):
+                    break
+                if not self._cond.wait(timeout) and self.display:
+                    break
+            closed, self._closed_windows = self._closed_windows, []
+            batch = [
+                (conn_id, queue.popleft(), self.stats[conn_id])
+                for conn_id, queue in self._queues.items()
+                if queue
+            ]
+            return batch, closed
+
+    def run(self) -> None:
+        cv2 = None
+        if self.display:
+            import cv2
+
+        while not self._stopped:
+            batch, closed = self._take()
+            for conn_id, frame, stats in batch:
+                try:
+                    if self.display or self.analyze:
+                        img = frame.to_ndarray(format="bgr24")
+                        if self.analyze:
+                            self.analyze(conn_id, img)
+                        if self.display:
+                            cv2.imshow(f"Remote Stream {conn_id}", img)
+                    stats.record_processed()
+                except Exception as e:
+                    print(f"Error processing frame from {conn_id}: {e}")
+
+            if self.display:
+                for conn_id in closed:
+                    try:
+                        cv2.destroyWindow(f"Remote Stream {conn_id}")
+                    except cv2.error:
+                        pass  # never shown
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    print("🙈 Display closed; frames are still processed headless.")
+                    cv2.destroyAllWindows()
+                    self.display = False
+
+        if self.display:
+            cv2.destroyAllWindows()
+
+
+async def monitor_loop_lag(stats: ConnectionStats, interval: float = 0.1) -> None:
+    """
+    Sample how late the event loop wakes up from a sleep of ``interval``
+    seconds and record it on ``stats``; runs until cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        stats.record_loop_lag(loop.time() - started - interval)
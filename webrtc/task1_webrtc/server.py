@@ -1,11 +1,21 @@
+import argparse
 import asyncio
 import json
-import cv2
+import os
+import sys
 from aiohttp import web
-from aiortc import RTCPeerConnection, RTCSessionDescription
-from aiortc.contrib.media import MediaRecorder
+from aiortc import RTCSessionDescription
+from aiortc.contrib.media import MediaRelay
+from aiortc.mediastreams import MediaStreamError
 
-pcs = set()
+from connection_manager import ConnectionManager, PeersExhausted
+from frame_worker import FrameWorker, monitor_loop_lag
+
+stats_logger = web.AppKey("stats_logger", asyncio.Task)
+# Lets the recorder and the frame consumer each read every video track.
+relay = MediaRelay()
+frame_worker = FrameWorker(display=False)
+peers = ConnectionManager()
 
 
 async def index(request: web.Request) -> web.Response:
@@ -20,48 +30,96 @@ async def index(request: web.Request) -> web.Response:
         return web.Response(text=f"Error loading client.html: {e}", status=500)
 
 
+def display_available() -> bool:
+    """Whether an OpenCV window can be opened here."""
+    if sys.platform.startswith("linux"):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+
+async def consume_frames(conn_id: str, track) -> None:
+    """
+    Hand each frame of ``track`` to the frame worker. Nothing here blocks:
+    conversion and display happen on the worker thread, and a full queue
+    drops its oldest frame instead of waiting.
+    """
+    stats = frame_worker.add(conn_id)
+    lag_monitor = asyncio.ensure_future(monitor_loop_lag(stats))
+    try:
+        while True:
+            frame = await track.recv()
+            frame_worker.submit(conn_id, frame)
+    except MediaStreamError:
+        pass
+    except Exception as e:
+        print(f"Error receiving frames: {e}")
+    finally:
+        lag_monitor.cancel()
+        print(f"📊 Final stats: {stats.as_dict()}")
+        frame_worker.remove(conn_id)
+
+
+async def stats(request: web.Request) -> web.Response:
+    """Connection and resource gauges, and per-connection frame stats."""
+    return web.json_response(
+        {
+            "peers": peers.gauges(),
+            "frames": [s.as_dict() for s in list(frame_worker.stats.values())],
+        }
+    )
+
+
+async def log_stats(interval: float) -> None:
+    """Print the gauges and every connection's stats every ``interval`` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        print(f"📊 {peers.gauges()}")
+        for s in list(frame_worker.stats.values()):
+            print(f"📊 {s.as_dict()}")
+
+
 async def offer(request: web.Request) -> web.Response:
     """Handle offer from browser and return answer."""
     try:
         params = await request.json()
         offer = RTCSessionDescription(sdp=params["sdp"], type=params["type"])
 
-        pc = RTCPeerConnection()
-        pcs.add(pc)
-        print("📡 Created peer connection")
-
-        recorder = MediaRecorder("received.mp4")
+        session = peers.open()
+        pc, conn_id = session.pc, session.conn_id
+        print(f"📡 Created peer connection {conn_id}")
 
         @pc.on("track")
         def on_track(track):
             """Handle incoming media tracks."""
             print(f"🎥 Track received: {track.kind}")
             if track.kind == "video":
-                recorder.addTrack(track)
-
-                async def show_frames():
-                    try:
-                        while True:
-                            frame = await track.recv()
-                            img = frame.to_ndarray(format="bgr24")
-                            cv2.imshow("Remote Stream", img)
-                            if cv2.waitKey(1) & 0xFF == ord("q"):
-                                break
-                    except Exception as e:
-                        print(f"Error displaying frames: {e}")
-
-                asyncio.ensure_future(show_frames())
-
-        await recorder.start()
-        await pc.setRemoteDescription(offer)
-        answer = await pc.createAnswer()
-        await pc.setLocalDescription(answer)
+                session.recorder.addTrack(relay.subscribe(track))
+                session.track_task(
+                    asyncio.ensure_future(
+                        consume_frames(conn_id, relay.subscribe(track))
+                    )
+                )
+
+        try:
+            await pc.setRemoteDescription(offer)
+            # Tracks are added while the remote description is applied; the
+            # recorder only records the tracks it has when it starts.
+            await peers.start_recording(session)
+            answer = await pc.createAnswer()
+            await pc.setLocalDescription(answer)
+        except Exception:
+            await peers.close(session)
+            raise
 
         print("✅ SDP exchange completed.")
         return web.json_response(
             {"sdp": pc.localDescription.sdp, "type": pc.localDescription.type}
         )
 
+    except PeersExhausted as e:
+        return web.Response(
+            text=f"{e}; try again later.", status=503, headers={"Retry-After": "5"}
+        )
     except json.JSONDecodeError:
         return web.Response(text="Invalid JSON in offer.", status=400)
     except KeyError:
@@ -74,18 +132,76 @@ async def offer(request: web.Request) -> web.Response:
 async def on_shutdown(app: web.Application) -> None:
     """Clean up peer connections."""
     try:
-        coros = [pc.close() for pc in pcs]
-        await asyncio.gather(*coros)
-        cv2.destroyAllWindows()
+        await peers.close_all()
+        frame_worker.stop()
         print("✅ Cleanup complete.")
     except Exception as e:
         print(f"Error during cleanup: {e}")
 
 
-app = web.Application()
-app.on_shutdown.append(on_shutdown)
-app.router.add_get("/", index)
-app.router.add_post("/offer", offer)
-
-print("🚀 Server running on http://localhost:8080")
-web.run_app(app, port=8080)
+def main() -> None:
+    global frame_worker, peers
+
+    parser = argparse.ArgumentParser(description="WebRTC → Python demo server")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--headless", action="store_true", help="Process frames without a window"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=2,
+        help="Frames queued per connection before the oldest is dropped",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=10,
+        help="Seconds between stats lines (0 disables them)",
+    )
+    parser.add_argument(
+        "--max-peers", type=int, default=4, help="Concurrent peers before 503"
+    )
+    parser.add_argument(
+        "--recordings-dir",
+        default="recordings",
+        help="Directory for the per-connection recordings",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=30,
+        help="Seconds a peer may take to connect before it is released",
+    )
+    args = parser.parse_args()
+
+    peers = ConnectionManager(args.max_peers, args.recordings_dir, args.connect_timeout)
+
+    display = not args.headless and display_available()
+    if not args.headless and not display:
+        print("🖥️ No display found; running headless.")
+    frame_worker = FrameWorker(display=display, queue_size=args.queue_size)
+    frame_worker.start()
+
+    async def on_startup(app: web.Application) -> None:
+        if args.stats_interval > 0:
+            app[stats_logger] = asyncio.ensure_future(log_stats(args.stats_interval))
+
+    async def on_cleanup(app: web.Application) -> None:
+        if stats_logger in app:
+            app[stats_logger].cancel()
+
+    app = web.Application()
+    app.on_startup.append(on_startup)
+    app.on_shutdown.append(on_shutdown)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_get("/", index)
+    app.router.add_post("/offer", offer)
+    app.router.add_get("/stats", stats)
+
+    print(f"🚀 Server running on http://localhost:{args.port}")
+    web.run_app(app, port=args.port)
+
+
+if __name__ == "__main__":
+    main()